@@ -1,11 +1,31 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from .routes import sync, courses, recommendations, auto_sync
+from .routes import sync, courses, recommendations, auto_sync, search, metrics, admin, teachers
+from .services.logging_service import get_logger, set_request_debug, reset_request_debug
+from .services.profiling_service import SamplingProfiler, PROFILING_ENABLED, ADMIN_TOKEN, is_admin_token
+from .services.entity_store import entity_store
+
+logger = get_logger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Migración de las entidades de documentos sincronizados con versiones
+    # anteriores: se persiste aquí para que los requests sólo lean de SQL
+    try:
+        entity_store.backfill(recommendations.db_service)
+    except Exception as e:
+        logger.error("❌ ERROR al migrar las entidades guardadas: %s", e)
+    yield
+
 
 app = FastAPI(
     title="Sistema de Emparejamiento Docente-Curso",
     description="API para procesar documentos y encontrar las mejores coincidencias usando NER + SBERT.",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
 # Configurar CORS para permitir el frontend
@@ -25,11 +45,83 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Depuración por request: `X-Debug: 1` o `?debug=1`, con `X-Admin-Token`, emite
+# los logs DEBUG sólo de ese request aunque el nivel global (LOG_LEVEL) sea INFO.
+# Esos logs incluyen metadatos y texto de CVs y sílabos: sin ADMIN_TOKEN el
+# middleware no se registra
+if ADMIN_TOKEN:
+    @app.middleware("http")
+    async def request_debug_middleware(request: Request, call_next):
+        flag = request.headers.get("x-debug") or request.query_params.get("debug") or ""
+        if flag.lower() not in ("1", "true", "yes"):
+            return await call_next(request)
+        if not is_admin_token(request.headers.get("x-admin-token")):
+            logger.warning("Depuración rechazada para %s %s: token de administración ausente o incorrecto",
+                           request.method, request.url.path)
+            return await call_next(request)
+        token = set_request_debug(True)
+        try:
+            return await call_next(request)
+        finally:
+            reset_request_debug(token)
+
+# Perfilado bajo demanda: `X-Profile: 1` o `?profile=1`, con `X-Admin-Token`,
+# captura un perfil por muestreo de ese request (ver profiling_service.py y
+# /api/admin/profiles). Sin PROFILING_ENABLED=1 y ADMIN_TOKEN el middleware no
+# se registra y los requests no pasan por él
+if PROFILING_ENABLED and ADMIN_TOKEN:
+    @app.middleware("http")
+    async def request_profiling_middleware(request: Request, call_next):
+        flag = request.headers.get("x-profile") or request.query_params.get("profile") or ""
+        if flag.lower() not in ("1", "true", "yes"):
+            return await call_next(request)
+        if not is_admin_token(request.headers.get("x-admin-token")):
+            logger.warning("Perfilado rechazado para %s %s: token de administración ausente o incorrecto",
+                           request.method, request.url.path)
+            return await call_next(request)
+
+        profiler = SamplingProfiler(f"{request.method} {request.url.path}")
+        token = profiler.start()
+
+        def finish():
+            profiler.stop()
+            profiler.save()
+            logger.info("Perfil de %s %s guardado: %s (%d muestras, %.1f ms)", request.method, request.url.path,
+                        profiler.profile_id, profiler.sample_count, profiler.duration * 1000)
+
+        try:
+            response = await call_next(request)
+        except Exception:
+            finish()
+            raise
+        finally:
+            SamplingProfiler.deactivate(token)
+
+        # El perfil se cierra cuando termina de enviarse el cuerpo: en las respuestas
+        # en streaming el trabajo ocurre al generarlo, después de call_next
+        body_iterator = response.body_iterator
+
+        async def profiled_body():
+            try:
+                async for chunk in body_iterator:
+                    yield chunk
+            finally:
+                finish()
+
+        response.body_iterator = profiled_body()
+        response.headers["X-Profile-Id"] = profiler.profile_id
+        return response
+
 # Incluir las rutas de los controladores
 app.include_router(sync.router, prefix="/api")
 app.include_router(courses.router, prefix="/api")
 app.include_router(recommendations.router, prefix="/api")
+app.include_router(teachers.router, prefix="/api")
 app.include_router(auto_sync.router, prefix="/api")
+app.include_router(search.router, prefix="/api")
+app.include_router(admin.router, prefix="/api")
+# /metrics sin prefijo, donde lo espera Prometheus
+app.include_router(metrics.router)
 
 @app.get("/")
 def read_root():
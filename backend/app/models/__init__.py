@@ -6,7 +6,8 @@ para requests y responses de la API.
 """
 
 from .sync_models import SyncRequest, SyncResponse
-from .recommendation_models import RecommendationRequest, RecommendationResponse, TeacherRecommendation
+from .recommendation_models import RecommendationRequest, RecommendationResponse, TeacherRecommendation, BatchRecommendationRequest
+from .search_models import TeacherSearchRequest, TeacherSearchResponse, TeacherSearchResult, TeacherSearchFilters
 from .common_models import DocumentMetadata, EmbeddingInfo, ErrorResponse
 
 __all__ = [
@@ -18,6 +19,13 @@ __all__ = [
     "RecommendationRequest",
     "RecommendationResponse",
     "TeacherRecommendation",
+    "BatchRecommendationRequest",
+    
+    # Search models
+    "TeacherSearchRequest",
+    "TeacherSearchResponse",
+    "TeacherSearchResult",
+    "TeacherSearchFilters",
     
     # Common models
     "DocumentMetadata",
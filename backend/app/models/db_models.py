@@ -5,7 +5,7 @@ Este módulo define las tablas relacionales para almacenar información
 estructurada de docentes, cursos y habilidades.
 """
 
-from sqlalchemy import create_engine, Column, Integer, String, Float, Table, ForeignKey
+from sqlalchemy import create_engine, Column, Integer, String, Float, Table, ForeignKey, JSON, LargeBinary
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 
@@ -103,3 +103,72 @@ class MatchingResult(Base):
     
     def __repr__(self):
         return f"<MatchingResult(teacher_id={self.teacher_id}, course_id={self.course_id}, score={self.final_score})>"
+
+
+class EntityProfile(Base):
+    """
+    Entidades NER tipadas de un documento (CV o sílabo).
+
+    Sustituye a las cadenas separadas por comas de los metadatos de ChromaDB
+    como fuente para el scoring: las listas se guardan como listas y los números
+    como números (ver services/entity_store.py).
+    """
+    
+    __tablename__ = 'entity_profiles'
+    
+    embedding_id = Column(String(255), primary_key=True)  # ID en ChromaDB
+    collection = Column(String(20), nullable=False, index=True)  # 'cvs' o 'syllabi'
+    name = Column(String(255))
+    entities = Column(JSON, nullable=False)
+    updated_at = Column(String(50))  # Timestamp
+    
+    def __repr__(self):
+        return f"<EntityProfile(embedding_id='{self.embedding_id}', collection='{self.collection}')>"
+
+
+class SyllabusRequirement(Base):
+    """
+    Perfil de requisitos de un sílabo, calculado al sincronizarlo
+    (ver services/profiles.py: build_requirement_profile).
+    """
+    
+    __tablename__ = 'syllabus_requirements'
+    
+    embedding_id = Column(String(255), primary_key=True)  # ID en ChromaDB
+    version = Column(Integer, nullable=False)  # REQUIREMENTS_VERSION con la que se calculó
+    level = Column(String(20), nullable=False)  # basic, intermediate, advanced
+    required_experience = Column(Integer, nullable=False)  # Años
+    required_skills = Column(JSON, nullable=False)  # Skills normalizadas, en orden y con repetidos
+    course_topics = Column(JSON, nullable=False)
+    skill_weights = Column(JSON, nullable=False)  # {skill: peso}
+    updated_at = Column(String(50))  # Timestamp
+    
+    def to_dict(self) -> dict:
+        return {
+            'version': self.version,
+            'level': self.level,
+            'required_experience': self.required_experience,
+            'required_skills': self.required_skills,
+            'course_topics': self.course_topics,
+            'skill_weights': self.skill_weights,
+        }
+    
+    def __repr__(self):
+        return f"<SyllabusRequirement(embedding_id='{self.embedding_id}', level='{self.level}')>"
+
+
+class SkillEmbedding(Base):
+    """
+    Embedding de una skill normalizada, calculado una sola vez al sincronizar
+    (ver services/skill_embeddings.py).
+    """
+    
+    __tablename__ = 'skill_embeddings'
+    
+    name = Column(String(255), primary_key=True)  # Skill normalizada (minúsculas, sin espacios extremos)
+    dim = Column(Integer, nullable=False)
+    vector = Column(LargeBinary, nullable=False)  # float32 normalizado
+    updated_at = Column(String(50))  # Timestamp
+    
+    def __repr__(self):
+        return f"<SkillEmbedding(name='{self.name}', dim={self.dim})>"
@@ -5,6 +5,12 @@ Modelos para el sistema de recomendaciones de docentes.
 from pydantic import BaseModel, Field
 from typing import List, Dict, Optional
 
+# Máximo de candidatos que se puede pedir a la cascada de recomendaciones
+MAX_CANDIDATES = 2000
+
+# Máximo de cursos por request de recomendaciones por lotes
+MAX_BATCH_COURSES = 200
+
 
 class RecommendationRequest(BaseModel):
     """Request para generar recomendaciones de docentes para un curso."""
@@ -29,6 +35,21 @@ class RecommendationRequest(BaseModel):
         description="ID de la carpeta de Google Drive con sílabos",
         example="1xyz987wvu654tsr321qpo"
     )
+    n_candidates: Optional[int] = Field(
+        None,
+        ge=1, le=MAX_CANDIDATES,
+        description="Candidatos recuperados por similitud vectorial (N). Por defecto CASCADE_CANDIDATES"
+    )
+    n_rerank: Optional[int] = Field(
+        None,
+        ge=1, le=MAX_CANDIDATES,
+        description="Candidatos que pasan el filtro de skills y se puntúan con el matching completo (M)"
+    )
+    top_k: Optional[int] = Field(
+        None,
+        ge=1, le=MAX_CANDIDATES,
+        description="Recomendaciones devueltas (k)"
+    )
     
     class Config:
         json_schema_extra = {
@@ -41,6 +62,58 @@ class RecommendationRequest(BaseModel):
         }
 
 
+class CourseRef(BaseModel):
+    """Curso identificado por ciclo y nombre, como en RecommendationRequest."""
+
+    cycle_name: str = Field(..., description="Nombre del ciclo académico", example="Ciclo 01")
+    course_name: str = Field(..., description="Nombre del curso", example="Programación Orientada a Objetos")
+
+
+class BatchRecommendationRequest(BaseModel):
+    """
+    Request para generar recomendaciones de varios cursos a la vez.
+
+    Se indica una lista de cursos (`courses`), un ciclo completo (`cycle_name`)
+    o ambos; los parámetros de la cascada se aplican a todos los cursos.
+    """
+
+    courses: List[CourseRef] = Field(
+        default_factory=list,
+        max_length=MAX_BATCH_COURSES,
+        description="Cursos a recomendar"
+    )
+    cycle_name: Optional[str] = Field(
+        None,
+        description="Recomendar todos los cursos sincronizados de este ciclo",
+        example="Ciclo 01"
+    )
+    n_candidates: Optional[int] = Field(
+        None,
+        ge=1, le=MAX_CANDIDATES,
+        description="Candidatos recuperados por similitud vectorial (N). Por defecto CASCADE_CANDIDATES"
+    )
+    n_rerank: Optional[int] = Field(
+        None,
+        ge=1, le=MAX_CANDIDATES,
+        description="Candidatos que pasan el filtro de skills y se puntúan con el matching completo (M)"
+    )
+    top_k: Optional[int] = Field(
+        None,
+        ge=1, le=MAX_CANDIDATES,
+        description="Recomendaciones devueltas por curso (k)"
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "courses": [
+                    {"cycle_name": "Ciclo 01", "course_name": "Programación Orientada a Objetos"},
+                    {"cycle_name": "Ciclo 01", "course_name": "Matemática Discreta"}
+                ]
+            }
+        }
+
+
 class ComponentScores(BaseModel):
     """Scores detallados de cada componente del algoritmo de matching."""
     
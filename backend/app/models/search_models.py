@@ -0,0 +1,117 @@
+"""
+Modelos para la búsqueda de docentes por texto libre.
+"""
+
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+
+class TeacherSearchFilters(BaseModel):
+    """Filtros sobre los metadatos de los CVs, aplicados dentro de la búsqueda vectorial."""
+
+    skills_any: Optional[List[str]] = Field(
+        default=None,
+        description="El docente debe tener al menos una de estas habilidades",
+        example=["python", "java"]
+    )
+    skills_all: Optional[List[str]] = Field(
+        default=None,
+        description="El docente debe tener todas estas habilidades",
+        example=["sql"]
+    )
+    min_experience: Optional[int] = Field(default=None, ge=0, description="Años de experiencia mínimos")
+    max_experience: Optional[int] = Field(default=None, ge=0, description="Años de experiencia máximos")
+    department: Optional[List[str]] = Field(
+        default=None,
+        description="Departamentos admitidos (sólo documentos sincronizados con departamento)"
+    )
+    text: Optional[str] = Field(
+        default=None,
+        description="Texto que debe aparecer en el CV (se busca en el texto completo; los CVs "
+                    "sincronizados antes de esta versión sólo guardan sus primeros 1000 caracteres "
+                    "hasta que se vuelvan a sincronizar)"
+    )
+
+    class Config:
+        # Un filtro mal escrito se rechaza (422) en lugar de ignorarse en silencio
+        extra = "forbid"
+
+
+class TeacherSearchRequest(BaseModel):
+    """Request para buscar docentes a partir de un texto arbitrario."""
+
+    query: str = Field(
+        ...,
+        min_length=1,
+        description="Texto libre a comparar con los CVs (ej: descripción de un curso)",
+        example="Docente con experiencia en machine learning y Python"
+    )
+    top_k: int = Field(
+        default=10,
+        description="Número máximo de docentes a devolver",
+        ge=1,
+        le=100
+    )
+    skills: Optional[List[str]] = Field(
+        default=None,
+        description="Filtro opcional: habilidades que deben tener los docentes (SQL)",
+        example=["python", "machine learning"]
+    )
+    min_skill_matches: int = Field(
+        default=1,
+        description="Número mínimo de habilidades del filtro que debe tener cada docente",
+        ge=1
+    )
+    filters: Optional[TeacherSearchFilters] = Field(
+        default=None,
+        description="Filtros opcionales sobre los metadatos del CV (habilidad, experiencia, departamento, texto)"
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "query": "Docente con experiencia en machine learning y Python",
+                "top_k": 10,
+                "skills": ["python"],
+                "min_skill_matches": 1,
+                "filters": {"min_experience": 3}
+            }
+        }
+
+
+class TeacherSearchResult(BaseModel):
+    """Docente encontrado por la búsqueda."""
+
+    teacher_name: str = Field(..., description="Nombre del docente", example="Dr. Juan Pérez")
+    embedding_id: str = Field(..., description="ID del CV en ChromaDB", example="1abc123def456")
+    similarity_score: float = Field(
+        ...,
+        description="Similitud semántica con la consulta (0-100)",
+        ge=0.0,
+        le=100.0,
+        example=72.4
+    )
+    matching_skills: Optional[int] = Field(
+        default=None,
+        description="Habilidades del filtro que tiene el docente (solo si se filtró por skills)"
+    )
+    rank: int = Field(..., description="Posición en el ranking (1 = mejor)", ge=1)
+
+
+class SearchTiming(BaseModel):
+    """Desglose de la latencia de una búsqueda."""
+
+    embed_ms: float = Field(..., description="Tiempo de generación del embedding de la consulta")
+    filter_ms: float = Field(..., description="Tiempo del filtro SQL por habilidades")
+    search_ms: float = Field(..., description="Tiempo de la búsqueda top-k en el índice vectorial")
+    total_ms: float = Field(..., description="Tiempo total de la búsqueda")
+    embedding_cached: bool = Field(..., description="El embedding se obtuvo de la caché")
+
+
+class TeacherSearchResponse(BaseModel):
+    """Response de la búsqueda de docentes por texto libre."""
+
+    query: str = Field(..., description="Texto consultado")
+    results: List[TeacherSearchResult] = Field(..., description="Docentes ordenados por similitud")
+    total_results: int = Field(..., description="Número de docentes devueltos", ge=0)
+    timing: SearchTiming = Field(..., description="Latencia de la búsqueda por etapa")
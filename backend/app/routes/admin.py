@@ -0,0 +1,35 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import FileResponse
+
+from ..services.profiling_service import list_profiles, get_profile_path, is_admin_token, PROFILE_DIR
+
+
+def require_admin_token(x_admin_token: Optional[str] = Header(None)):
+    """Exige la cabecera `X-Admin-Token` igual a ADMIN_TOKEN (403 si falta, no coincide o no hay token)."""
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(status_code=403, detail="Se requiere un token de administración válido.")
+
+
+router = APIRouter(dependencies=[Depends(require_admin_token)])
+
+
+@router.get("/admin/profiles", tags=["Admin"])
+async def get_profiles():
+    """
+    Lista los perfiles capturados con `X-Profile: 1` o `?profile=1` (ver profiling_service.py).
+    """
+    return {"directory": PROFILE_DIR, "profiles": list_profiles()}
+
+
+@router.get("/admin/profiles/{filename}", tags=["Admin"])
+async def download_profile(filename: str):
+    """
+    Descarga un perfil (`.collapsed.txt` o `.speedscope.json`).
+    """
+    path = get_profile_path(filename)
+    if path is None:
+        raise HTTPException(status_code=404, detail=f"Perfil '{filename}' no encontrado.")
+    media_type = "application/json" if filename.endswith(".json") else "text/plain"
+    return FileResponse(path, media_type=media_type, filename=filename)
@@ -2,16 +2,22 @@ from fastapi import APIRouter, HTTPException
 from ..services.database_service import DatabaseService
 from ..services.drive_service import DriveService
 from ..services.pdf_service import PDFService
-from ..services.nlp_service import NLPService
+from ..services.nlp_service import EMBEDDING_CHUNKING
+from ..services.embedding_worker import create_embedding_service
 from ..services.ner_service import NERService
+from ..services.recommendation_cache import recommendation_cache
+from ..services.entity_store import entity_store
+from ..services.skill_embeddings import skill_embedding_index
+from ..services.logging_service import get_logger
 
 router = APIRouter()
+logger = get_logger(__name__)
 
 # Servicios
 db_service = DatabaseService()
 drive_service = DriveService()
 pdf_service = PDFService()
-nlp_service = NLPService()
+nlp_service = create_embedding_service()
 ner_service = NERService()
 
 @router.post("/auto-sync", tags=["Sync"])
@@ -19,7 +25,7 @@ async def auto_sync():
     """
     Sincronización automática usando las carpetas configuradas en el servicio de Drive.
     """
-    print("Iniciando sincronización automática...")
+    logger.info("Iniciando sincronización automática...")
     
     if not drive_service.CV_FOLDER_ID or not drive_service.SYLLABUS_FOLDER_ID:
         raise HTTPException(
@@ -28,7 +34,7 @@ async def auto_sync():
         )
     
     # Procesar CVs
-    print("\n--- Procesando CVs ---")
+    logger.info("--- Procesando CVs ---")
     cv_files = drive_service.list_files_in_folder(drive_service.CV_FOLDER_ID)
     processed_cvs = 0
     for cv_file in cv_files:
@@ -37,7 +43,7 @@ async def auto_sync():
                 processed_cvs += 1
     
     # Procesar Sílabos recursivamente
-    print("\n--- Procesando Sílabos ---")
+    logger.info("--- Procesando Sílabos ---")
     processed_syllabi = 0
     
     def recurse_and_process(folder_id):
@@ -51,6 +57,7 @@ async def auto_sync():
                     processed_syllabi += 1
     
     recurse_and_process(drive_service.SYLLABUS_FOLDER_ID)
+    db_service.flush_vector_indexes()
     
     return {
         "status": "completed",
@@ -64,31 +71,37 @@ async def process_document(file_info, collection_name):
 
 def process_document_sync(file_info, collection_name):
     """Procesa un documento de forma síncrona."""
-    print(f"Procesando: {file_info['name']} ({file_info['id']})")
+    logger.info("Procesando: %s (%s)", file_info['name'], file_info['id'])
     
     # Verificar si ya existe en la base de datos
     try:
         collection = db_service.cv_collection if collection_name == "cvs" else db_service.syllabus_collection
         existing = collection.get(ids=[file_info['id']])
         if existing and existing.get('ids'):
-            print(f"  -> Ya procesado. Saltando.")
+            logger.info("  -> Ya procesado. Saltando.")
             return False
     except:
         pass  # Si hay error, continuar con el procesamiento
     
     content = drive_service.download_file(file_info['id'])
     if not content:
-        print(f"  -> Error al descargar. Saltando.")
+        logger.warning("  -> Error al descargar. Saltando.")
         return False
 
     text = pdf_service.extract_text_from_pdf(content)
     if not text:
-        print(f"  -> No se pudo extraer texto. Saltando.")
+        logger.warning("  -> No se pudo extraer texto. Saltando.")
         return False
     
-    embedding = nlp_service.generate_embedding(text)
+    # Igual que en sync: con fragmentos, el vector del documento es su promedio
+    chunk_embeddings = None
+    if EMBEDDING_CHUNKING:
+        chunk_embeddings = nlp_service.generate_chunk_embeddings(text)
+        embedding = nlp_service.pool_embeddings(chunk_embeddings, "mean")
+    else:
+        embedding = nlp_service.generate_embedding(text)
     if not embedding:
-        print(f"  -> Error al generar embedding. Saltando.")
+        logger.warning("  -> Error al generar embedding. Saltando.")
         return False
 
     # Extraer entidades con NER
@@ -103,6 +116,22 @@ def process_document_sync(file_info, collection_name):
         "entities": entities
     }
     
-    db_service.add_embedding(collection_name, embedding, file_info['id'], metadata)
-    print(f"  -> ✅ Procesado y guardado en '{collection_name}'.")
+    db_service.add_embedding(collection_name, embedding, file_info['id'], metadata, document=text)
+    if chunk_embeddings is not None:
+        db_service.add_chunk_embeddings(collection_name, file_info['id'], chunk_embeddings)
+    try:
+        skill_embedding_index.ensure(
+            entities.get('technical_skills' if collection_name == "cvs" else 'required_skills', []),
+            nlp_service.generate_embeddings
+        )
+    except Exception as e:
+        # El documento ya está guardado: un fallo aquí no debe cortar la sincronización
+        logger.warning("  -> ⚠️ Error al guardar los embeddings de skills: %s", e)
+    entity_store.put(collection_name, file_info['id'], metadata["name"], entities,
+                     filename=file_info['name'], embedding=embedding)
+    if collection_name == "syllabi":
+        recommendation_cache.invalidate_syllabus(file_info['id'])
+    else:
+        recommendation_cache.invalidate_cvs()
+    logger.info("  -> ✅ Procesado y guardado en '%s'.", collection_name)
     return True
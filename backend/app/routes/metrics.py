@@ -0,0 +1,42 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from ..services.database_service import DatabaseService, CHUNK_COLLECTIONS
+from ..services.recommendation_cache import recommendation_cache
+from ..services.metrics import registry, COLLECTION_DOCUMENTS
+
+router = APIRouter()
+
+db_service = DatabaseService()  # ChromaDB (vectorial)
+
+RECOMMENDATION_CACHE_ENTRIES = registry.gauge(
+    "recommendation_cache_entries", "Resultados guardados en la caché de recomendaciones")
+
+
+def _collection_sizes() -> dict:
+    """Tamaño de las colecciones en el momento del scrape."""
+    if not db_service.client:
+        return {}
+    sizes = {
+        ("cvs",): db_service.cv_collection.count(),
+        ("syllabi",): db_service.syllabus_collection.count(),
+    }
+    for name, chunk_name in CHUNK_COLLECTIONS.items():
+        collection = db_service.chunk_collections.get(name)
+        if collection is not None:
+            sizes[(chunk_name,)] = collection.count()
+    return sizes
+
+
+COLLECTION_DOCUMENTS.set_function(_collection_sizes)
+RECOMMENDATION_CACHE_ENTRIES.set_function(
+    lambda: {(): recommendation_cache.get_statistics()["entries"]}
+)
+
+
+@router.get("/metrics", response_class=PlainTextResponse, tags=["Metrics"])
+def get_metrics():
+    """
+    Métricas de la aplicación en el formato de texto de Prometheus.
+    """
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,8 +1,25 @@
-from fastapi import APIRouter, HTTPException
-from ..models.recommendation_models import RecommendationRequest, RecommendationResponse, TeacherRecommendation, ComponentScores
-from ..services.database_service import DatabaseService
+import json
+import os
+import time
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from ..models.recommendation_models import (
+    RecommendationRequest, RecommendationResponse, TeacherRecommendation, ComponentScores,
+    BatchRecommendationRequest, MAX_CANDIDATES
+)
+from ..services.database_service import DatabaseService, CHUNK_SCORING
 from ..services.sql_database_service import SQLDatabaseService
-from ..services.advanced_matching_service import AdvancedMatchingService
+from ..services.advanced_matching_service import AdvancedMatchingService, HYBRID_WEIGHTS
+from ..services.recommendation_cache import recommendation_cache
+from ..services.entity_store import entity_store
+from ..services.similarity import distance_to_similarity, cosine_similarity
+from ..services.logging_service import get_logger, debug_enabled
+from ..services.metrics import RECOMMENDATION_STAGE_SECONDS, RECOMMENDATION_REQUESTS, StageTimings
+from ..services.profiling_service import profile_current_thread
+
+logger = get_logger(__name__)
 
 router = APIRouter()
 
@@ -10,6 +27,174 @@ db_service = DatabaseService()  # ChromaDB (vectorial)
 sql_db_service = SQLDatabaseService()  # SQLite (relacional)
 matching_service = AdvancedMatchingService()
 
+# Cascada de los endpoints semánticos: N candidatos por similitud vectorial,
+# M tras el filtro de skills que se puntúan con el matching completo, k devueltos
+CASCADE_CANDIDATES = int(os.getenv("CASCADE_CANDIDATES", "200"))
+CASCADE_RERANK = int(os.getenv("CASCADE_RERANK", "50"))
+CASCADE_TOP_K = int(os.getenv("CASCADE_TOP_K", "10"))
+
+
+def _cascade_params(n_candidates: Optional[int], n_rerank: Optional[int], top_k: Optional[int]):
+    """(N, M, k) efectivos: valores del request o por defecto, con k <= M <= N."""
+    n = n_candidates or CASCADE_CANDIDATES
+    m = min(n_rerank or CASCADE_RERANK, n)
+    k = min(top_k or CASCADE_TOP_K, m)
+    return n, m, k
+
+
+def _run_cascade(endpoint: str, syllabus_embedding, syllabus_profile, n: int, m: int, k: int):
+    """
+    Ranking de docentes para un sílabo en tres etapas:
+
+    1. vector_search: los N CVs más similares al embedding del sílabo.
+    2. skill_filter: los M con mejor score semántico + skills (por lotes).
+    3. scoring: matching avanzado completo de los M; explicación sólo para los k devueltos.
+
+    Returns:
+        (lista de (metadatos del CV, resultado del matching) ordenada,
+         dict con el tamaño y la duración en ms de cada etapa)
+    """
+    start = time.perf_counter()
+    search = db_service.search_similar("cvs", syllabus_embedding, n_results=n, return_ids=True)
+    if search is None:
+        raise HTTPException(status_code=500, detail="Error al realizar la búsqueda vectorial.")
+    timings = {'vector_search': time.perf_counter() - start}
+    RECOMMENDATION_STAGE_SECONDS.observe(timings['vector_search'], endpoint=endpoint, stage="vector_search")
+    return _rank_candidates(endpoint, syllabus_profile, search, m, k, timings)
+
+
+def _rank_candidates(endpoint: str, syllabus_profile, search, m: int, k: int,
+                     timings: dict, teacher_profiles: Optional[dict] = None):
+    """
+    Etapas 2 y 3 de la cascada sobre el resultado de la búsqueda vectorial.
+
+    Args:
+        search: (ids, metadatos, distancias) de los N CVs recuperados.
+        timings: Duración en segundos de las etapas ya ejecutadas (se completa).
+        teacher_profiles: Perfiles de CV ya resueltos por id, compartidos entre
+            los sílabos de un mismo request (se completa).
+    """
+    cv_ids, cv_results, semantic_distances = search
+    if teacher_profiles is None:
+        teacher_profiles = {}
+
+    start = time.perf_counter()
+    # Perfiles ya construidos (entity_store): sin parsear metadatos por candidato
+    candidates = []
+    for cv_id, cv_metadata in zip(cv_ids, cv_results):
+        profile = teacher_profiles.get(cv_id)
+        if profile is None:
+            profile = teacher_profiles[cv_id] = entity_store.get("cvs", cv_id, cv_metadata)
+        candidates.append(profile)
+    # Convertir distancia coseno (1 - cos) a similitud [0, 1]
+    semantic_similarities = [distance_to_similarity(distance) for distance in semantic_distances]
+    selected = matching_service.select_for_rerank(syllabus_profile, candidates, semantic_similarities, m)
+    stage_timings = {'skill_filter': time.perf_counter() - start}
+
+    if debug_enabled():
+        for i in selected:
+            logger.debug("🔍 CV %s - distancia: %.6f, similitud: %.6f, perfil: %s", candidates[i].name,
+                         semantic_distances[i], semantic_similarities[i], candidates[i])
+
+    start = time.perf_counter()
+    matches = matching_service.calculate_advanced_match_batch(
+        syllabus_profile,
+        [candidates[i] for i in selected],
+        [semantic_similarities[i] for i in selected],
+        top_k=k
+    )
+    stage_timings['scoring'] = time.perf_counter() - start
+
+    for stage, seconds in stage_timings.items():
+        RECOMMENDATION_STAGE_SECONDS.observe(seconds, endpoint=endpoint, stage=stage)
+    timings.update(stage_timings)
+
+    ranked = [(cv_results[selected[i]], advanced_match) for i, advanced_match in matches]
+    cascade = {
+        "candidates": len(cv_ids),
+        "reranked": len(selected),
+        "returned": len(ranked),
+        "timings_ms": {stage: round(seconds * 1000, 3) for stage, seconds in timings.items()},
+    }
+    return ranked, cascade
+
+
+def _generate_result(cycle_name: str, course_name: str, syllabus_metadata: dict,
+                     syllabus_profile, ranked, cascade) -> dict:
+    """Respuesta de /recommendations/generate (también cada curso de /generate-batch)."""
+    return {
+        "cycle_name": cycle_name,
+        "course_name": course_name,
+        "syllabus_info": {
+            "name": syllabus_metadata.get("name", "N/A"),
+            "cycle": syllabus_metadata.get("cycle", "N/A"),
+            "level": syllabus_profile.level,
+            "required_skills": list(syllabus_profile.required_skills),
+            "course_topics": list(syllabus_profile.course_topics)
+        },
+        "recommendations": [
+            {
+                "teacher_name": cv_metadata.get("name", "N/A"),
+                "cv_filename": cv_metadata.get("filename", "N/A"),
+                "score": advanced_match['final_score'],
+                "component_scores": advanced_match['component_scores'],
+                "explanation": advanced_match['explanation']
+            }
+            for cv_metadata, advanced_match in ranked
+        ],
+        "total_analyzed": cascade['candidates'],
+        "cascade": cascade
+    }
+
+
+def _names_match(requested: str, stored: str) -> bool:
+    """Comparación flexible de nombres de ciclo o curso (uno contenido en el otro)."""
+    requested, stored = requested.lower(), stored.lower()
+    return requested in stored or stored in requested
+
+
+def _cache_key(endpoint: str, syllabus_id: str, **params):
+    """
+    Clave de caché para un resultado: (endpoint, sílabo, pesos, versión del
+    algoritmo, modo de scoring de fragmentos).
+    """
+    weights = {f"advanced.{k}": v for k, v in matching_service.weights.items()}
+    weights.update({f"hybrid.{k}": v for k, v in HYBRID_WEIGHTS.items()})
+    return recommendation_cache.make_key(
+        endpoint, syllabus_id, weights, matching_service.ALGORITHM_VERSION,
+        chunk_scoring=CHUNK_SCORING, **params
+    )
+
+
+def _save_history(history: Optional[tuple]):
+    """Registra en el historial de matching las coincidencias (curso, filas) de un ranking híbrido."""
+    if not history:
+        return
+    course_id, rows = history
+    with RECOMMENDATION_STAGE_SECONDS.time(endpoint="hybrid", stage="history_write"):
+        for row in rows:
+            sql_db_service.save_matching_result(course_id=course_id, **row)
+
+
+def _get_cached_hybrid(cache_key) -> Optional[dict]:
+    """
+    Resultado híbrido cacheado, o None. Un acierto también escribe el historial
+    de matching, igual que un request que recalcula el ranking.
+    """
+    cached = recommendation_cache.get(cache_key)
+    if cached is None:
+        return None
+    _save_history(cached["history"])
+    RECOMMENDATION_REQUESTS.inc(endpoint="hybrid", cache="hit")
+    return cached["result"]
+
+
+def _set_cached_hybrid(cache_key, result: dict, history: Optional[tuple] = None):
+    """Cachea un resultado híbrido junto con las filas de historial que genera."""
+    RECOMMENDATION_REQUESTS.inc(endpoint="hybrid", cache="miss")
+    recommendation_cache.set(cache_key, {"result": result, "history": history})
+
+
 @router.post("/recommendations/reset-database", tags=["Recommendations"])
 async def reset_database():
     """
@@ -17,6 +202,7 @@ async def reset_database():
     """
     try:
         db_service._reinitialize_database()
+        recommendation_cache.clear()
         return {"status": "success", "message": "Base de datos reinicializada exitosamente"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al resetear base de datos: {str(e)}")
@@ -26,53 +212,59 @@ async def generate_recommendations(request: RecommendationRequest):
     """
     Genera recomendaciones de docentes para un curso específico basado en el nombre del ciclo y curso.
     """
-    print(f"Generando recomendaciones para: {request.cycle_name} - {request.course_name}")
+    logger.info("Generando recomendaciones para: %s - %s", request.cycle_name, request.course_name)
+    cascade_params = _cascade_params(request.n_candidates, request.n_rerank, request.top_k)
+    
+    # 0. Servir desde caché si el sílabo ya fue resuelto y calculado tras la última sincronización
+    cached_syllabus_id = recommendation_cache.resolve_alias(request.cycle_name, request.course_name)
+    if cached_syllabus_id:
+        cached = recommendation_cache.get(_cache_key(
+            "generate", cached_syllabus_id,
+            cycle_name=request.cycle_name, course_name=request.course_name, cascade=cascade_params
+        ))
+        if cached is not None:
+            RECOMMENDATION_REQUESTS.inc(endpoint="generate", cache="hit")
+            return cached
     
+    stage_timings = StageTimings(RECOMMENDATION_STAGE_SECONDS, endpoint="generate")
     try:
         # 1. Buscar el sílabo en la base de datos usando cycle_name y course_name
-        syllabus_results = db_service.syllabus_collection.get(
-            include=["metadatas", "embeddings"]
-        )
-        
-        if not syllabus_results or not syllabus_results.get('metadatas'):
-            raise HTTPException(
-                status_code=404, 
-                detail="No se encontraron sílabos en la base de datos. Ejecute la sincronización primero."
+        # (sólo metadatos; el embedding se obtiene después únicamente para el sílabo encontrado)
+        with stage_timings.time("syllabus_lookup"):
+            syllabus_results = db_service.syllabus_collection.get(
+                include=["metadatas"]
             )
         
-        # Debug: Mostrar todos los sílabos disponibles
-        print(f"Total de sílabos en la base de datos: {len(syllabus_results['metadatas'])}")
-        for i, metadata in enumerate(syllabus_results['metadatas']):
-            print(f"🔍 DEBUG Sílabo {i} - Metadata completa: {metadata}")
-            print(f"Sílabo {i}: cycle='{metadata.get('cycle', '')}', course='{metadata.get('course', '')}', name='{metadata.get('name', '')}', filename='{metadata.get('filename', '')}'")
+            if not syllabus_results or not syllabus_results.get('metadatas'):
+                raise HTTPException(
+                    status_code=404, 
+                    detail="No se encontraron sílabos en la base de datos. Ejecute la sincronización primero."
+                )
         
-        print(f"Buscando: cycle_name='{request.cycle_name}', course_name='{request.course_name}'")
+            logger.debug("Buscando cycle_name='%s', course_name='%s' entre %d sílabos",
+                         request.cycle_name, request.course_name, len(syllabus_results['metadatas']))
         
-        # Buscar el sílabo que coincida con el ciclo y curso
-        target_syllabus = None
-        target_syllabus_id = None
-        target_embedding = None
+            # Buscar el sílabo que coincida con el ciclo y curso
+            target_syllabus = None
+            target_syllabus_id = None
         
-        for i, metadata in enumerate(syllabus_results['metadatas']):
-            syllabus_cycle = metadata.get('cycle', '')
-            syllabus_course = metadata.get('course', '')
-            
-            print(f"Comparando con sílabo {i}: cycle='{syllabus_cycle}', course='{syllabus_course}'")
+            for i, metadata in enumerate(syllabus_results['metadatas']):
+                syllabus_cycle = metadata.get('cycle', '')
+                syllabus_course = metadata.get('course', '')
             
-            # Comparación flexible de nombres
-            cycle_match = (request.cycle_name.lower() in syllabus_cycle.lower() or 
-                          syllabus_cycle.lower() in request.cycle_name.lower())
-            course_match = (request.course_name.lower() in syllabus_course.lower() or 
-                           syllabus_course.lower() in request.course_name.lower())
+                # Comparación flexible de nombres
+                cycle_match = (request.cycle_name.lower() in syllabus_cycle.lower() or 
+                              syllabus_cycle.lower() in request.cycle_name.lower())
+                course_match = (request.course_name.lower() in syllabus_course.lower() or 
+                               syllabus_course.lower() in request.course_name.lower())
             
-            print(f"  - cycle_match: {cycle_match}")
-            print(f"  - course_match: {course_match}")
+                logger.debug("Sílabo %d: cycle='%s' (%s), course='%s' (%s)",
+                             i, syllabus_cycle, cycle_match, syllabus_course, course_match)
             
-            if cycle_match and course_match:
-                target_syllabus = metadata
-                target_syllabus_id = syllabus_results['ids'][i]
-                target_embedding = syllabus_results['embeddings'][i]
-                break
+                if cycle_match and course_match:
+                    target_syllabus = metadata
+                    target_syllabus_id = syllabus_results['ids'][i]
+                    break
         
         if not target_syllabus:
             raise HTTPException(
@@ -80,121 +272,232 @@ async def generate_recommendations(request: RecommendationRequest):
                 detail=f"No se encontró un sílabo para {request.cycle_name} - {request.course_name}. Verifique que el archivo existe y ha sido sincronizado."
             )
         
-        print(f"Sílabo encontrado: {target_syllabus.get('name', 'N/A')} (ID: {target_syllabus_id})")
-        
-        # 2. Buscar CVs similares semánticamente
-        cv_results, semantic_distances = db_service.search_similar("cvs", target_embedding, n_results=20)
-        if cv_results is None:
-            raise HTTPException(status_code=500, detail="Error al realizar la búsqueda vectorial.")
-        
-        # 3. Aplicar matching avanzado a cada candidato
-        syllabus_entities = target_syllabus.get('entities', {})
-        advanced_recommendations = []
-        
-        for cv_metadata, semantic_distance in zip(cv_results, semantic_distances):
-            # Debugging detallado de la distancia semántica
-            print(f"\n🔍 DEBUG CV - {cv_metadata.get('name', 'Unknown')}")
-            print(f"   Semantic distance (raw): {semantic_distance}")
-            print(f"   Distance range interpretation (for normalized vectors):")
-            print(f"     - 0.0 = identical vectors")
-            print(f"     - 1.0 = moderate difference") 
-            print(f"     - 1.414 ≈ maximum for normalized vectors (orthogonal)")
-            print(f"     - 2.0 = maximum possible distance for normalized vectors")
-            
-            # Convertir distancia L2 a similitud para vectores normalizados
-            # Para vectores normalizados: distancia máxima = 2.0 (vectores opuestos)
-            # Fórmula: similarity = 1 - (distance / 2.0)
-            
-            if semantic_distance > 2.5:
-                # Distancias anómalamente altas - problema con embeddings
-                semantic_similarity = 0.0
-                print(f"   ⚠️  WARNING: Very high distance - may indicate non-normalized vectors")
-            else:
-                # Fórmula estándar para vectores normalizados
-                semantic_similarity = max(0.0, 1.0 - (semantic_distance / 2.0))
-                print(f"   ✅ Normal distance for normalized vectors")
-                
-            print(f"   Semantic similarity (calculated): {semantic_similarity:.6f}")
-            print(f"   Metadata keys: {list(cv_metadata.keys())}")
-            
-            # Obtener entidades del CV - reconstruir desde metadatos aplanados
-            if 'entities' in cv_metadata:
-                cv_entities = cv_metadata['entities']
-                print(f"   Found 'entities' key directly")
-            else:
-                print(f"   Reconstructing entities from flattened metadata...")
-                cv_entities = {
-                    'name': cv_metadata.get('name', 'Unknown'),  # Agregar nombre del profesor
-                    'technical_skills': cv_metadata.get('entities_technical_skills', '').split(', ') if cv_metadata.get('entities_technical_skills') else [],
-                    'experience_years': int(cv_metadata.get('entities_experience_years', 0)) if cv_metadata.get('entities_experience_years', '').isdigit() else 0,
-                    'education': cv_metadata.get('entities_education', '').split(', ') if cv_metadata.get('entities_education') else [],
-                    'organizations': cv_metadata.get('entities_organizations', '').split(', ') if cv_metadata.get('entities_organizations') else [],
-                    'certifications': cv_metadata.get('entities_certifications', '').split(', ') if cv_metadata.get('entities_certifications') else [],
-                    'languages': cv_metadata.get('entities_languages', '').split(', ') if cv_metadata.get('entities_languages') else []
-                }
-                # Limpiar entradas vacías
-                cv_entities['technical_skills'] = [skill.strip() for skill in cv_entities['technical_skills'] if skill.strip()]
-                cv_entities['education'] = [edu.strip() for edu in cv_entities['education'] if edu.strip()]
-                cv_entities['organizations'] = [org.strip() for org in cv_entities['organizations'] if org.strip()]
-                cv_entities['certifications'] = [cert.strip() for cert in cv_entities['certifications'] if cert.strip()]
-                cv_entities['languages'] = [lang.strip() for lang in cv_entities['languages'] if lang.strip()]
-            
-            print(f"   Final CV entities: {cv_entities}")
-            
-            # Obtener entidades del sílabo - también necesitan reconstrucción
-            if 'entities' in target_syllabus:
-                syllabus_entities = target_syllabus['entities']
-            else:
-                syllabus_entities = {
-                    'required_skills': target_syllabus.get('entities_required_skills', '').split(', ') if target_syllabus.get('entities_required_skills') else [],
-                    'tools_required': target_syllabus.get('entities_tools_required', '').split(', ') if target_syllabus.get('entities_tools_required') else [],
-                    'course_topics': target_syllabus.get('entities_course_topics', '').split(', ') if target_syllabus.get('entities_course_topics') else [],
-                    'methodologies': target_syllabus.get('entities_methodologies', '').split(', ') if target_syllabus.get('entities_methodologies') else [],
-                    'prerequisites': target_syllabus.get('entities_prerequisites', '').split(', ') if target_syllabus.get('entities_prerequisites') else []
-                }
-                # Limpiar entradas vacías
-                for key in syllabus_entities:
-                    if isinstance(syllabus_entities[key], list):
-                        syllabus_entities[key] = [item.strip() for item in syllabus_entities[key] if item.strip()]
-            
-            print(f"   Syllabus entities: {syllabus_entities}")
-            
-            # Calcular matching avanzado
-            advanced_match = matching_service.calculate_advanced_match(
-                cv_entities, syllabus_entities, semantic_similarity
-            )
-            
-            recommendation = {
-                "teacher_name": cv_metadata.get("name", "N/A"),
-                "cv_filename": cv_metadata.get("filename", "N/A"),
-                "score": advanced_match['final_score'],
-                "component_scores": advanced_match['component_scores'],
-                "explanation": advanced_match['explanation']
-            }
-            
-            advanced_recommendations.append(recommendation)
-        
-        # 4. Ordenar por score final y tomar top 10
-        final_recommendations = matching_service.rank_candidates(advanced_recommendations)[:10]
+        logger.info("Sílabo encontrado: %s (ID: %s)", target_syllabus.get('name', 'N/A'), target_syllabus_id)
+        recommendation_cache.set_alias(request.cycle_name, request.course_name, target_syllabus_id)
         
-        return {
-            "cycle_name": request.cycle_name,
-            "course_name": request.course_name,
-            "syllabus_info": {
-                "name": target_syllabus.get("name", "N/A"),
-                "cycle": target_syllabus.get("cycle", "N/A"),
-                "required_skills": syllabus_entities.get('required_skills', []),
-                "course_topics": syllabus_entities.get('course_topics', [])
-            },
-            "recommendations": final_recommendations,
-            "total_analyzed": len(advanced_recommendations)
-        }
+        cache_key = _cache_key(
+            "generate", target_syllabus_id,
+            cycle_name=request.cycle_name, course_name=request.course_name, cascade=cascade_params
+        )
+        cached = recommendation_cache.get(cache_key)
+        if cached is not None:
+            RECOMMENDATION_REQUESTS.inc(endpoint="generate", cache="hit")
+            return cached
+        
+        with stage_timings.time("syllabus_lookup"):
+            target_embedding = db_service.get_embedding("syllabi", target_syllabus_id)
+            if target_embedding is None:
+                raise HTTPException(status_code=404, detail="El sílabo no tiene embedding. Ejecute la sincronización.")
+            syllabus_profile = entity_store.get("syllabi", target_syllabus_id, target_syllabus)
+        
+        # 2-3. Cascada: búsqueda vectorial (N), filtro de skills (M) y matching avanzado (top k)
+        ranked, cascade = _run_cascade("generate", target_embedding, syllabus_profile, *cascade_params)
+        result = _generate_result(
+            request.cycle_name, request.course_name, target_syllabus, syllabus_profile, ranked, cascade
+        )
+        RECOMMENDATION_REQUESTS.inc(endpoint="generate", cache="miss")
+        recommendation_cache.set(cache_key, result)
+        return result
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error inesperado: {e}")
+        logger.exception("Error inesperado: %s", e)
         raise HTTPException(status_code=500, detail=f"Error al generar recomendaciones: {str(e)}")
+    finally:
+        stage_timings.observe()
+
+def _resolve_batch_courses(request: BatchRecommendationRequest, cascade_params) -> list:
+    """
+    Resuelve los cursos de un request por lotes a sílabos.
+
+    Los cursos con alias conocido y resultado en caché no tocan ChromaDB. Para
+    el resto se leen los metadatos de todos los sílabos una sola vez y se
+    indexan por ciclo, así cada curso sólo se compara con los sílabos de los
+    ciclos que coinciden. Se conserva la regla de /generate (primer sílabo,
+    en orden de almacenamiento, cuyo ciclo y curso coinciden de forma
+    flexible), de modo que ambos endpoints comparten alias y caché.
+
+    Returns:
+        Un dict por curso (sin repetidos) con 'cycle_name', 'course_name',
+        'syllabus_id', 'metadata', 'cache_key' y 'result' (si venía de caché).
+    """
+    items, seen = [], set()
+
+    def add(cycle_name: str, course_name: str, syllabus_id=None, metadata=None):
+        key = (cycle_name.lower(), course_name.lower())
+        if key in seen:
+            return None
+        seen.add(key)
+        item = {"cycle_name": cycle_name, "course_name": course_name, "syllabus_id": syllabus_id,
+                "metadata": metadata, "cache_key": None, "result": None}
+        items.append(item)
+        return item
+
+    pending = []
+    for course in request.courses:
+        item = add(course.cycle_name, course.course_name)
+        if item is None:
+            continue
+        syllabus_id = recommendation_cache.resolve_alias(course.cycle_name, course.course_name)
+        if syllabus_id:
+            item["syllabus_id"] = syllabus_id
+            item["result"] = recommendation_cache.get(_cache_key(
+                "generate", syllabus_id,
+                cycle_name=course.cycle_name, course_name=course.course_name, cascade=cascade_params
+            ))
+        if item["result"] is None:
+            pending.append(item)
+
+    if not pending and not request.cycle_name:
+        return items
+
+    syllabus_results = db_service.syllabus_collection.get(include=["metadatas"])
+    if not syllabus_results or not syllabus_results.get('metadatas'):
+        raise HTTPException(
+            status_code=404,
+            detail="No se encontraron sílabos en la base de datos. Ejecute la sincronización primero."
+        )
+    ids, metadatas = syllabus_results['ids'], syllabus_results['metadatas']
+
+    # Índice ciclo -> posiciones de sus sílabos (en orden de almacenamiento)
+    by_cycle = {}
+    for i, metadata in enumerate(metadatas):
+        by_cycle.setdefault(metadata.get('cycle', '').lower(), []).append(i)
+    cycle_positions = {}
+
+    def positions_for_cycle(cycle_name: str) -> list:
+        key = cycle_name.lower()
+        if key not in cycle_positions:
+            cycle_positions[key] = sorted(
+                i for cycle, positions in by_cycle.items() if _names_match(key, cycle) for i in positions
+            )
+        return cycle_positions[key]
+
+    for item in pending:
+        for i in positions_for_cycle(item["cycle_name"]):
+            if _names_match(item["course_name"], metadatas[i].get('course', '')):
+                item["syllabus_id"], item["metadata"] = ids[i], metadatas[i]
+                recommendation_cache.set_alias(item["cycle_name"], item["course_name"], ids[i])
+                break
+
+    if request.cycle_name:
+        # Ciclo completo: coincidencia exacta si existe ("Ciclo I" no debe incluir "Ciclo II")
+        resolved = {item["syllabus_id"] for item in items}
+        for i in by_cycle.get(request.cycle_name.lower()) or positions_for_cycle(request.cycle_name):
+            if ids[i] in resolved:
+                continue
+            metadata = metadatas[i]
+            add(metadata.get('cycle', request.cycle_name), metadata.get('course', ''), ids[i], metadata)
+
+    for item in items:
+        if item["result"] is None and item["syllabus_id"] is not None:
+            item["cache_key"] = _cache_key(
+                "generate", item["syllabus_id"],
+                cycle_name=item["cycle_name"], course_name=item["course_name"], cascade=cascade_params
+            )
+            item["result"] = recommendation_cache.get(item["cache_key"])
+    return items
+
+
+def _ndjson(payload: dict) -> str:
+    return json.dumps(payload, ensure_ascii=False) + "\n"
+
+
+@router.post("/recommendations/generate-batch", tags=["Recommendations"])
+async def generate_batch_recommendations(request: BatchRecommendationRequest):
+    """
+    Genera recomendaciones para varios cursos (una lista o un ciclo completo) en un solo request.
+
+    Los sílabos se resuelven con una sola lectura de metadatos, los CVs
+    candidatos de todos los cursos se recuperan con una sola búsqueda vectorial
+    por lotes y los perfiles de los CVs se comparten entre cursos.
+
+    La respuesta es NDJSON: una línea por curso, en el orden del request, con
+    `status` 'ok' (y en `result` la misma respuesta que /recommendations/generate),
+    'not_found' o 'error'; y una línea final con `status` 'done' y el resumen.
+    """
+    if not request.courses and not request.cycle_name:
+        raise HTTPException(status_code=400, detail="Indique 'courses' o 'cycle_name'.")
+    logger.info("Generando recomendaciones por lotes: %d cursos, ciclo=%s",
+                len(request.courses), request.cycle_name)
+    cascade_params = _cascade_params(request.n_candidates, request.n_rerank, request.top_k)
+    n, m, k = cascade_params
+    total_start = time.perf_counter()
+
+    # 1. Resolver todos los sílabos
+    start = time.perf_counter()
+    items = _resolve_batch_courses(request, cascade_params)
+    lookup_seconds = time.perf_counter() - start
+    RECOMMENDATION_STAGE_SECONDS.observe(lookup_seconds, endpoint="batch", stage="syllabus_lookup")
+
+    # 2. Embeddings de los sílabos sin resultado en caché y búsqueda vectorial por lotes
+    to_score = [item for item in items if item["result"] is None and item["syllabus_id"] is not None]
+    syllabus_ids = list(dict.fromkeys(item["syllabus_id"] for item in to_score))
+    searches = {}
+    start = time.perf_counter()
+    if syllabus_ids:
+        data = db_service.syllabus_collection.get(ids=syllabus_ids, include=["embeddings"])
+        # Chroma devuelve los embeddings como arrays de NumPy y no garantiza el orden de los ids
+        embedding_ids = list(data['ids']) if data and data.get('embeddings') is not None else []
+        if embedding_ids:
+            batch = db_service.search_similar_batch(
+                "cvs", [list(map(float, vector)) for vector in data['embeddings']], n_results=n, return_ids=True
+            )
+            if batch is None:
+                raise HTTPException(status_code=500, detail="Error al realizar la búsqueda vectorial.")
+            searches = dict(zip(embedding_ids, batch))
+    search_seconds = time.perf_counter() - start
+    RECOMMENDATION_STAGE_SECONDS.observe(search_seconds, endpoint="batch", stage="vector_search")
+
+    def stream():
+        teacher_profiles = {}
+        counts = {"ok": 0, "not_found": 0, "error": 0, "cache_hits": 0}
+        for item in items:
+            line = {"cycle_name": item["cycle_name"], "course_name": item["course_name"],
+                    "syllabus_id": item["syllabus_id"]}
+            # Starlette ejecuta cada paso del generador en un hilo del pool
+            with profile_current_thread():
+                try:
+                    if item["result"] is not None:
+                        counts["cache_hits"] += 1
+                        RECOMMENDATION_REQUESTS.inc(endpoint="batch", cache="hit")
+                        line.update(status="ok", result=item["result"])
+                    elif item["syllabus_id"] is None or item["syllabus_id"] not in searches:
+                        line.update(status="not_found", detail=(
+                            "No se encontró un sílabo para el curso." if item["syllabus_id"] is None
+                            else "El sílabo no tiene embedding. Ejecute la sincronización."
+                        ))
+                    else:
+                        syllabus_profile = entity_store.get("syllabi", item["syllabus_id"], item["metadata"])
+                        ranked, cascade = _rank_candidates(
+                            "batch", syllabus_profile, searches[item["syllabus_id"]], m, k, {}, teacher_profiles
+                        )
+                        result = _generate_result(item["cycle_name"], item["course_name"], item["metadata"],
+                                                  syllabus_profile, ranked, cascade)
+                        recommendation_cache.set(item["cache_key"], result)
+                        RECOMMENDATION_REQUESTS.inc(endpoint="batch", cache="miss")
+                        line.update(status="ok", result=result)
+                except Exception as e:
+                    logger.exception("Error en el curso %s - %s: %s", item["cycle_name"], item["course_name"], e)
+                    line.update(status="error", detail=str(e))
+            counts[line["status"]] += 1
+            yield _ndjson(line)
+
+        logger.info("✅ Recomendaciones por lotes: %d cursos (%d desde caché)", len(items), counts["cache_hits"])
+        yield _ndjson({
+            "status": "done",
+            "total": len(items),
+            **counts,
+            "timings_ms": {
+                "syllabus_lookup": round(lookup_seconds * 1000, 3),
+                "vector_search": round(search_seconds * 1000, 3),
+                "total": round((time.perf_counter() - total_start) * 1000, 3)
+            }
+        })
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
 
 @router.post("/recommendations/generate-hybrid", tags=["Recommendations"])
 async def generate_hybrid_recommendations(request: RecommendationRequest):
@@ -206,38 +509,49 @@ async def generate_hybrid_recommendations(request: RecommendationRequest):
     2. Obtiene teachers que tengan al menos 1 skill requerida (filtro SQL)
     3. Para cada candidato filtrado, calcula similitud semántica con ChromaDB
     4. Combina scores: 40% SQL (skill match) + 60% ChromaDB (semantic similarity)
-    5. Retorna top 10 ordenados por score final
+    5. Retorna los top_k (CASCADE_TOP_K por defecto) ordenados por score final
     """
-    print(f"\n🔀 HYBRID MATCHING: {request.cycle_name} - {request.course_name}")
+    logger.info("🔀 HYBRID MATCHING: %s - %s", request.cycle_name, request.course_name)
+    # Los fallbacks a /generate dependen de la cascada pedida: forma parte de la clave
+    cascade_params = _cascade_params(request.n_candidates, request.n_rerank, request.top_k)
+    
+    cached_syllabus_id = recommendation_cache.resolve_alias(request.cycle_name, request.course_name)
+    if cached_syllabus_id:
+        cached = _get_cached_hybrid(_cache_key(
+            "hybrid", cached_syllabus_id,
+            cycle_name=request.cycle_name, course_name=request.course_name, cascade=cascade_params
+        ))
+        if cached is not None:
+            return cached
     
+    stage_timings = StageTimings(RECOMMENDATION_STAGE_SECONDS, endpoint="hybrid")
     try:
-        # === PASO 1: Buscar sílabo en ChromaDB para obtener embedding ===
-        syllabus_results = db_service.syllabus_collection.get(
-            include=["metadatas", "embeddings"]
-        )
-        
-        if not syllabus_results or not syllabus_results.get('metadatas'):
-            raise HTTPException(
-                status_code=404,
-                detail="No hay sílabos sincronizados en ChromaDB"
+        # === PASO 1: Buscar sílabo en ChromaDB (sólo metadatos) ===
+        with stage_timings.time("syllabus_lookup"):
+            syllabus_results = db_service.syllabus_collection.get(
+                include=["metadatas"]
             )
         
-        # Buscar el sílabo que coincida
-        target_syllabus = None
-        target_embedding = None
-        target_embedding_id = None
-        
-        for i, metadata in enumerate(syllabus_results['metadatas']):
-            cycle_match = (request.cycle_name.lower() in metadata.get('cycle', '').lower() or 
-                          metadata.get('cycle', '').lower() in request.cycle_name.lower())
-            course_match = (request.course_name.lower() in metadata.get('course', '').lower() or 
-                           metadata.get('course', '').lower() in request.course_name.lower())
+            if not syllabus_results or not syllabus_results.get('metadatas'):
+                raise HTTPException(
+                    status_code=404,
+                    detail="No hay sílabos sincronizados en ChromaDB"
+                )
+        
+            # Buscar el sílabo que coincida
+            target_syllabus = None
+            target_embedding_id = None
+        
+            for i, metadata in enumerate(syllabus_results['metadatas']):
+                cycle_match = (request.cycle_name.lower() in metadata.get('cycle', '').lower() or 
+                              metadata.get('cycle', '').lower() in request.cycle_name.lower())
+                course_match = (request.course_name.lower() in metadata.get('course', '').lower() or 
+                               metadata.get('course', '').lower() in request.course_name.lower())
             
-            if cycle_match and course_match:
-                target_syllabus = metadata
-                target_embedding = syllabus_results['embeddings'][i]
-                target_embedding_id = syllabus_results['ids'][i]
-                break
+                if cycle_match and course_match:
+                    target_syllabus = metadata
+                    target_embedding_id = syllabus_results['ids'][i]
+                    break
         
         if not target_syllabus:
             raise HTTPException(
@@ -245,35 +559,54 @@ async def generate_hybrid_recommendations(request: RecommendationRequest):
                 detail=f"No se encontró sílabo para {request.cycle_name} - {request.course_name}"
             )
         
-        print(f"✅ Sílabo encontrado: {target_syllabus.get('name')} (ID: {target_embedding_id})")
+        logger.info("✅ Sílabo encontrado: %s (ID: %s)", target_syllabus.get('name'), target_embedding_id)
+        recommendation_cache.set_alias(request.cycle_name, request.course_name, target_embedding_id)
+        
+        cache_key = _cache_key(
+            "hybrid", target_embedding_id,
+            cycle_name=request.cycle_name, course_name=request.course_name, cascade=cascade_params
+        )
+        cached = _get_cached_hybrid(cache_key)
+        if cached is not None:
+            return cached
+        
+        target_embedding = db_service.get_embedding("syllabi", target_embedding_id)
+        if target_embedding is None:
+            raise HTTPException(status_code=404, detail="El sílabo no tiene embedding en ChromaDB")
         
         # === PASO 2: Buscar curso en SQL para obtener required_skills ===
-        sql_courses = sql_db_service.get_all_courses()
-        target_course_sql = None
+        with stage_timings.time("sql_filter"):
+            sql_courses = sql_db_service.get_all_courses()
+            target_course_sql = None
         
-        for course in sql_courses:
-            if course.embedding_id == target_embedding_id:
-                target_course_sql = course
-                break
+            for course in sql_courses:
+                if course.embedding_id == target_embedding_id:
+                    target_course_sql = course
+                    break
         
         if not target_course_sql:
-            print("⚠️  Curso no encontrado en SQL, usando solo ChromaDB")
+            logger.warning("⚠️ Curso no encontrado en SQL, usando solo ChromaDB")
             # Fallback al endpoint antiguo
-            return await generate_recommendations(request)
+            result = await generate_recommendations(request)
+            _set_cached_hybrid(cache_key, result)
+            return result
         
         required_skill_names = [skill.name for skill in target_course_sql.required_skills]
-        print(f"📋 Required skills (SQL): {required_skill_names}")
+        logger.debug("📋 Required skills (SQL): %s", required_skill_names)
         
         if not required_skill_names:
-            print("⚠️  No hay required skills en SQL, usando solo ChromaDB")
-            return await generate_recommendations(request)
+            logger.warning("⚠️ No hay required skills en SQL, usando solo ChromaDB")
+            result = await generate_recommendations(request)
+            _set_cached_hybrid(cache_key, result)
+            return result
         
         # === PASO 3: Filtrar teachers con SQL (al menos 1 skill match) ===
-        sql_candidates = sql_db_service.find_teachers_by_skills(required_skill_names, min_matches=1)
-        print(f"🔍 SQL filtró {len(sql_candidates)} teachers con skills coincidentes")
+        with stage_timings.time("sql_filter"):
+            sql_candidates = sql_db_service.find_teachers_by_skills(required_skill_names, min_matches=1)
+        logger.debug("🔍 SQL filtró %d teachers con skills coincidentes", len(sql_candidates))
         
         if not sql_candidates:
-            return {
+            result = {
                 "cycle_name": request.cycle_name,
                 "course_name": request.course_name,
                 "syllabus_info": {
@@ -285,9 +618,12 @@ async def generate_hybrid_recommendations(request: RecommendationRequest):
                 "total_analyzed": 0,
                 "message": "No se encontraron docentes con las skills requeridas"
             }
+            _set_cached_hybrid(cache_key, result)
+            return result
         
         # === PASO 4: Para cada candidato SQL, obtener similitud semántica de ChromaDB ===
         hybrid_recommendations = []
+        history_rows = []
         
         for teacher, sql_matches_count in sql_candidates:
             # Calcular SQL score (porcentaje de skills que coinciden)
@@ -297,45 +633,45 @@ async def generate_hybrid_recommendations(request: RecommendationRequest):
             )
             sql_score = sql_score_detail['score']
             
-            # Obtener embedding del teacher desde ChromaDB
-            teacher_data = db_service.cv_collection.get(
-                ids=[teacher.embedding_id],
-                include=["embeddings", "metadatas"]
-            )
-            
-            if not teacher_data or not teacher_data.get('embeddings'):
-                print(f"  ⚠️  Teacher {teacher.name} no tiene embedding en ChromaDB")
-                continue
-            
-            teacher_embedding = teacher_data['embeddings'][0]
-            teacher_metadata = teacher_data['metadatas'][0]
-            
-            # Calcular similitud semántica (distancia L2 → similarity)
-            from numpy import dot
-            from numpy.linalg import norm
+            # Embedding del teacher: del perfil en memoria si ya se conoce, si no de ChromaDB
+            teacher_profile = entity_store.get("cvs", teacher.embedding_id)
+            if teacher_profile is not None and teacher_profile.embedding is not None:
+                teacher_embedding = teacher_profile.embedding
+                teacher_filename = teacher_profile.filename
+            else:
+                with stage_timings.time("vector_search"):
+                    teacher_data = db_service.cv_collection.get(
+                        ids=[teacher.embedding_id],
+                        include=["embeddings", "metadatas"]
+                    )
+                
+                # Chroma devuelve los embeddings como arrays de NumPy: comprobar por longitud
+                teacher_embeddings = teacher_data.get('embeddings') if teacher_data else None
+                if teacher_embeddings is None or len(teacher_embeddings) == 0:
+                    logger.warning("⚠️ Teacher %s no tiene embedding en ChromaDB", teacher.name)
+                    continue
+                
+                teacher_embedding = teacher_data['embeddings'][0]
+                teacher_metadata = teacher_data['metadatas'][0]
+                teacher_filename = teacher_metadata.get("filename")
+                # Guardarlo en el perfil para los siguientes requests
+                teacher_profile = entity_store.get("cvs", teacher.embedding_id, teacher_metadata)
+                teacher_profile.set_embedding(teacher_embedding)
+                teacher_profile.filename = teacher_filename
             
-            # Cosine similarity (más preciso para vectores normalizados)
-            semantic_similarity = dot(target_embedding, teacher_embedding) / (
-                norm(target_embedding) * norm(teacher_embedding)
-            )
-            semantic_similarity = max(0.0, min(1.0, semantic_similarity))
+            # Calcular similitud semántica (misma convención coseno que la búsqueda vectorial)
+            semantic_similarity = cosine_similarity(target_embedding, teacher_embedding)
             
             # === PASO 5: Combinar scores ===
             # Pesos: 40% SQL (skill match) + 60% semántico (SBERT)
-            final_score = (0.4 * sql_score) + (0.6 * semantic_similarity)
-            
-            # Reconstruir entidades para explanation
-            if 'entities' in teacher_metadata:
-                cv_entities = teacher_metadata['entities']
-            else:
-                cv_entities = {
-                    'technical_skills': teacher_metadata.get('entities_technical_skills', '').split(', ') if teacher_metadata.get('entities_technical_skills') else [],
-                    'experience_years': int(teacher_metadata.get('entities_experience_years', 0)) if teacher_metadata.get('entities_experience_years', '').isdigit() else 0
-                }
+            final_score = (
+                HYBRID_WEIGHTS['sql_skill_match'] * sql_score +
+                HYBRID_WEIGHTS['semantic_similarity'] * semantic_similarity
+            )
             
             recommendation = {
                 "teacher_name": teacher.name,
-                "cv_filename": teacher_metadata.get("filename", "N/A"),
+                "cv_filename": teacher_filename or "N/A",
                 "score": final_score,
                 "component_scores": {
                     "sql_score": sql_score,
@@ -352,27 +688,30 @@ async def generate_hybrid_recommendations(request: RecommendationRequest):
             }
             
             hybrid_recommendations.append(recommendation)
-            
-            # Guardar en historial
-            sql_db_service.save_matching_result(
-                teacher_id=teacher.id,
-                course_id=target_course_sql.id,
-                sql_score=sql_score,
-                semantic_score=semantic_similarity,
-                final_score=final_score,
-                matched_skills_count=sql_matches_count
-            )
-        
-        # === PASO 6: Ordenar por final_score y retornar top 10 ===
-        final_recommendations = sorted(
-            hybrid_recommendations, 
-            key=lambda x: x['score'], 
-            reverse=True
-        )[:10]
-        
-        print(f"✅ Generadas {len(final_recommendations)} recomendaciones híbridas")
-        
-        return {
+            history_rows.append({
+                "teacher_id": teacher.id,
+                "sql_score": sql_score,
+                "semantic_score": semantic_similarity,
+                "final_score": final_score,
+                "matched_skills_count": sql_matches_count
+            })
+        
+        # Guardar en historial (también se repite en cada acierto de caché)
+        history = (target_course_sql.id, history_rows)
+        _save_history(history)
+        
+        # === PASO 6: Ordenar por final_score y retornar los k mejores ===
+        top_k = cascade_params[2]
+        with stage_timings.time("scoring"):
+            final_recommendations = sorted(
+                hybrid_recommendations, 
+                key=lambda x: x['score'], 
+                reverse=True
+            )[:top_k]
+        
+        logger.info("✅ Generadas %d recomendaciones híbridas", len(final_recommendations))
+        
+        result = {
             "cycle_name": request.cycle_name,
             "course_name": request.course_name,
             "matching_method": "hybrid_sql_chromadb",
@@ -384,34 +723,51 @@ async def generate_hybrid_recommendations(request: RecommendationRequest):
             "recommendations": final_recommendations,
             "total_analyzed": len(hybrid_recommendations),
             "weights": {
-                "sql_skill_match": "40%",
-                "semantic_similarity": "60%"
+                "sql_skill_match": f"{HYBRID_WEIGHTS['sql_skill_match']:.0%}",
+                "semantic_similarity": f"{HYBRID_WEIGHTS['semantic_similarity']:.0%}"
             }
         }
+        _set_cached_hybrid(cache_key, result, history)
+        return result
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error en hybrid matching: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ Error en hybrid matching: %s", e)
         raise HTTPException(status_code=500, detail=f"Error en matching híbrido: {str(e)}")
+    finally:
+        stage_timings.observe()
 
 
 @router.get("/recommendations/{syllabus_id}", tags=["Recommendations"])
-async def get_recommendations(syllabus_id: str):
+async def get_recommendations(
+    syllabus_id: str,
+    n_candidates: Optional[int] = Query(None, ge=1, le=MAX_CANDIDATES, description="Candidatos por similitud vectorial (N)"),
+    n_rerank: Optional[int] = Query(None, ge=1, le=MAX_CANDIDATES, description="Candidatos puntuados con el matching completo (M)"),
+    top_k: Optional[int] = Query(None, ge=1, le=MAX_CANDIDATES, description="Recomendaciones devueltas (k)")
+):
     """
     Genera un ranking avanzado de docentes para un sílabo usando NER + SBERT.
     """
-    print(f"Generando recomendaciones avanzadas para el sílabo ID: {syllabus_id}")
+    logger.info("Generando recomendaciones avanzadas para el sílabo ID: %s", syllabus_id)
+    cascade_params = _cascade_params(n_candidates, n_rerank, top_k)
+
+    cache_key = _cache_key("syllabus", syllabus_id, cascade=cascade_params)
+    cached = recommendation_cache.get(cache_key)
+    if cached is not None:
+        RECOMMENDATION_REQUESTS.inc(endpoint="syllabus", cache="hit")
+        return cached
 
     # 1. Obtener el sílabo completo (embedding + metadata con entidades)
     try:
-        syllabus_data = db_service.syllabus_collection.get(
-            ids=[syllabus_id], 
-            include=["embeddings", "metadatas"]
-        )
-        if not syllabus_data or not syllabus_data.get('embeddings'):
+        with RECOMMENDATION_STAGE_SECONDS.time(endpoint="syllabus", stage="syllabus_lookup"):
+            syllabus_data = db_service.syllabus_collection.get(
+                ids=[syllabus_id], 
+                include=["embeddings", "metadatas"]
+            )
+        # Chroma devuelve los embeddings como arrays de NumPy: comprobar por longitud
+        syllabus_embeddings = syllabus_data.get('embeddings') if syllabus_data else None
+        if syllabus_embeddings is None or len(syllabus_embeddings) == 0:
             raise HTTPException(
                 status_code=404, 
                 detail="El sílabo no ha sido procesado o no se encontró. Ejecute la sincronización."
@@ -420,84 +776,38 @@ async def get_recommendations(syllabus_id: str):
         syllabus_embedding = syllabus_data['embeddings'][0]
         syllabus_metadata = syllabus_data['metadatas'][0]
         
-        # Reconstruir entidades del sílabo
-        if 'entities' in syllabus_metadata:
-            syllabus_entities = syllabus_metadata['entities']
-        else:
-            syllabus_entities = {
-                'required_skills': syllabus_metadata.get('entities_required_skills', '').split(', ') if syllabus_metadata.get('entities_required_skills') else [],
-                'tools_required': syllabus_metadata.get('entities_tools_required', '').split(', ') if syllabus_metadata.get('entities_tools_required') else [],
-                'course_topics': syllabus_metadata.get('entities_course_topics', '').split(', ') if syllabus_metadata.get('entities_course_topics') else [],
-                'methodologies': syllabus_metadata.get('entities_methodologies', '').split(', ') if syllabus_metadata.get('entities_methodologias') else [],
-                'prerequisites': syllabus_metadata.get('entities_prerequisites', '').split(', ') if syllabus_metadata.get('entities_prerequisites') else []
-            }
-            # Limpiar entradas vacías
-            for key in syllabus_entities:
-                if isinstance(syllabus_entities[key], list):
-                    syllabus_entities[key] = [item.strip() for item in syllabus_entities[key] if item.strip()]
+        syllabus_profile = entity_store.get("syllabi", syllabus_id, syllabus_metadata)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al obtener datos del sílabo: {e}")
 
-    # 2. Buscar CVs similares semánticamente
-    cv_results, semantic_distances = db_service.search_similar("cvs", syllabus_embedding, n_results=20)
-    if cv_results is None:
-        raise HTTPException(status_code=500, detail="Error al realizar la búsqueda vectorial.")
-
-    # 3. Aplicar matching avanzado a cada candidato
-    advanced_recommendations = []
-    
-    for cv_metadata, semantic_distance in zip(cv_results, semantic_distances):
-        # Convertir distancia L2 a similitud (0-1)
-        semantic_similarity = max(0, 1 - (semantic_distance / 2))
-        
-        # Obtener entidades del CV - reconstruir desde metadatos aplanados
-        if 'entities' in cv_metadata:
-            cv_entities = cv_metadata['entities']
-        else:
-            cv_entities = {
-                'name': cv_metadata.get('name', 'Unknown'),  # Agregar nombre del profesor
-                'technical_skills': cv_metadata.get('entities_technical_skills', '').split(', ') if cv_metadata.get('entities_technical_skills') else [],
-                'experience_years': int(cv_metadata.get('entities_experience_years', 0)) if cv_metadata.get('entities_experience_years', '').isdigit() else 0,
-                'education': cv_metadata.get('entities_education', '').split(', ') if cv_metadata.get('entities_education') else [],
-                'organizations': cv_metadata.get('entities_organizations', '').split(', ') if cv_metadata.get('entities_organizations') else [],
-                'certifications': cv_metadata.get('entities_certifications', '').split(', ') if cv_metadata.get('entities_certifications') else [],
-                'languages': cv_metadata.get('entities_languages', '').split(', ') if cv_metadata.get('entities_languages') else []
-            }
-            # Limpiar entradas vacías
-            cv_entities['technical_skills'] = [skill.strip() for skill in cv_entities['technical_skills'] if skill.strip()]
-            cv_entities['education'] = [edu.strip() for edu in cv_entities['education'] if edu.strip()]
-            cv_entities['organizations'] = [org.strip() for org in cv_entities['organizations'] if org.strip()]
-            cv_entities['certifications'] = [cert.strip() for cert in cv_entities['certifications'] if cert.strip()]
-            cv_entities['languages'] = [lang.strip() for lang in cv_entities['languages'] if lang.strip()]
-        
-        # Calcular matching avanzado
-        advanced_match = matching_service.calculate_advanced_match(
-            cv_entities, syllabus_entities, semantic_similarity
-        )
-        
-        recommendation = {
+    # 2-3. Cascada: búsqueda vectorial (N), filtro de skills (M) y matching avanzado (top k)
+    ranked, cascade = _run_cascade("syllabus", syllabus_embedding, syllabus_profile, *cascade_params)
+    final_recommendations = [
+        {
             "teacher_name": cv_metadata.get("name", "N/A"),
             "final_score": advanced_match['final_score'],
             "component_scores": advanced_match['component_scores'],
             "explanation": advanced_match['explanation']
         }
-        
-        advanced_recommendations.append(recommendation)
-
-    # 4. Ordenar por score final y tomar top 10
-    final_recommendations = matching_service.rank_candidates(advanced_recommendations)[:10]
+        for cv_metadata, advanced_match in ranked
+    ]
 
-    return {
+    result = {
         "syllabus_id": syllabus_id,
         "syllabus_info": {
             "name": syllabus_metadata.get("name", "N/A"),
-            "required_skills": syllabus_entities.get('required_skills', []),
-            "course_topics": syllabus_entities.get('course_topics', [])
+            "level": syllabus_profile.level,
+            "required_skills": list(syllabus_profile.required_skills),
+            "course_topics": list(syllabus_profile.course_topics)
         },
         "recommendations": final_recommendations,
-        "total_analyzed": len(advanced_recommendations)
+        "total_analyzed": cascade['candidates'],
+        "cascade": cascade
     }
+    RECOMMENDATION_REQUESTS.inc(endpoint="syllabus", cache="miss")
+    recommendation_cache.set(cache_key, result)
+    return result
 
 @router.get("/recommendations/stats", tags=["Recommendations"])
 async def get_system_statistics():
@@ -516,7 +826,8 @@ async def get_system_statistics():
             "chromadb": {
                 "total_cvs": cv_count,
                 "total_syllabi": syllabus_count
-            }
+            },
+            "recommendation_cache": recommendation_cache.get_statistics()
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al obtener estadísticas: {str(e)}")
\ No newline at end of file
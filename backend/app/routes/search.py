@@ -0,0 +1,94 @@
+from fastapi import APIRouter, HTTPException
+import time
+
+from ..models.search_models import TeacherSearchRequest, TeacherSearchResponse, TeacherSearchResult, SearchTiming
+from ..services.database_service import DatabaseService
+from ..services.sql_database_service import SQLDatabaseService
+from ..services.embedding_batcher import get_embedding_batcher
+from ..services.embedding_cache import embedding_cache
+from ..services.similarity import distance_to_similarity
+
+router = APIRouter()
+
+db_service = DatabaseService()  # ChromaDB (vectorial)
+sql_db_service = SQLDatabaseService()  # SQLite (relacional)
+
+
+def _elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 3)
+
+
+@router.post("/search/teachers", response_model=TeacherSearchResponse, tags=["Search"])
+async def search_teachers(request: TeacherSearchRequest):
+    """
+    Busca los docentes cuyos CVs son más parecidos a un texto libre.
+
+    El texto se convierte en embedding una sola vez (con caché para consultas
+    repetidas) y se busca el top-k en la colección de CVs. Si se indican
+    habilidades, la búsqueda se restringe a los docentes que las tienen en SQL;
+    los `filters` se aplican dentro de la búsqueda vectorial, así que el top-k
+    filtrado sigue devolviendo hasta top_k docentes.
+    """
+    query = request.query.strip()
+    if not query:
+        raise HTTPException(status_code=400, detail="La consulta no puede estar vacía.")
+
+    total_start = time.perf_counter()
+
+    # 1. Embedding de la consulta (caché -> micro-batcher sobre NLPService)
+    start = time.perf_counter()
+    batcher = get_embedding_batcher()
+    model_name = batcher.nlp_service.model_name
+    backend = batcher.nlp_service.backend
+    query_embedding = embedding_cache.get(model_name, backend, query)
+    embedding_cached = query_embedding is not None
+    if not embedding_cached:
+        try:
+            query_embedding = await batcher.embed(query)
+        except Exception as e:
+            raise HTTPException(status_code=503, detail=f"No se pudo generar el embedding de la consulta: {e}")
+        embedding_cache.set(model_name, backend, query, query_embedding)
+    embed_ms = _elapsed_ms(start)
+
+    # 2. Filtro SQL opcional por habilidades
+    start = time.perf_counter()
+    candidate_ids = None
+    matching_skills = {}
+    if request.skills:
+        matches = sql_db_service.find_teachers_by_skills(request.skills, request.min_skill_matches)
+        matching_skills = {teacher.embedding_id: count for teacher, count in matches}
+        candidate_ids = list(matching_skills)
+    filter_ms = _elapsed_ms(start)
+
+    # 3. Top-k en la colección de CVs (restringido a los candidatos si hay filtro)
+    start = time.perf_counter()
+    search_results = db_service.search_similar(
+        "cvs", query_embedding, n_results=request.top_k, ids=candidate_ids, return_ids=True,
+        filters=request.filters.model_dump(exclude_none=True) if request.filters else None
+    )
+    search_ms = _elapsed_ms(start)
+    if search_results is None:
+        raise HTTPException(status_code=500, detail="Error al buscar en la colección de CVs.")
+
+    results = []
+    for rank, (cv_id, metadata, distance) in enumerate(zip(*search_results), start=1):
+        results.append(TeacherSearchResult(
+            teacher_name=metadata.get("name", cv_id),
+            embedding_id=cv_id,
+            similarity_score=round(distance_to_similarity(distance) * 100, 2),
+            matching_skills=matching_skills.get(cv_id) if request.skills else None,
+            rank=rank
+        ))
+
+    return TeacherSearchResponse(
+        query=query,
+        results=results,
+        total_results=len(results),
+        timing=SearchTiming(
+            embed_ms=embed_ms,
+            filter_ms=filter_ms,
+            search_ms=search_ms,
+            total_ms=_elapsed_ms(total_start),
+            embedding_cached=embedding_cached
+        )
+    )
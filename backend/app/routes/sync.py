@@ -2,46 +2,76 @@ from fastapi import APIRouter, HTTPException, Body
 from ..models.sync_models import SyncRequest, SyncResponse
 from ..services.drive_service import DriveService
 from ..services.pdf_service import PDFService
-from ..services.nlp_service import NLPService
+from ..services.nlp_service import EMBEDDING_CHUNKING
+from ..services.embedding_worker import create_embedding_service
 from ..services.intelligent_ner_service import IntelligentNERService
 from ..services.database_service import DatabaseService
 from ..services.sql_database_service import SQLDatabaseService
+from ..services.recommendation_cache import recommendation_cache
+from ..services.entity_store import entity_store
+from ..services.skill_embeddings import skill_embedding_index
+from ..services.logging_service import get_logger
+from ..services.metrics import INGEST_STAGE_SECONDS, DOCUMENTS_PROCESSED, DOCUMENTS_FAILED
 
 router = APIRouter()
+logger = get_logger(__name__)
 
 # Inicializamos los servicios
 drive_service = DriveService()
 pdf_service = PDFService()
-nlp_service = NLPService()
+nlp_service = create_embedding_service()  # en proceso o en el trabajador (NLP_WORKER=1)
 intelligent_ner_service = IntelligentNERService()
 db_service = DatabaseService()  # ChromaDB (vectorial)
 sql_db_service = SQLDatabaseService()  # SQLite (relacional)
 
 def process_file(file_id: str, file_name: str, collection_name: str, cycle_name: str = "", course_name: str = ""):
     """Función auxiliar para procesar un único archivo (CV o Sílabo)."""
-    print(f"Procesando: {file_name} ({file_id})")
+    logger.info("Procesando: %s (%s)", file_name, file_id)
     
-    content = drive_service.download_file(file_id)
+    with INGEST_STAGE_SECONDS.time(collection=collection_name, stage="download"):
+        content = drive_service.download_file(file_id)
     if not content:
-        print(f"  -> Error al descargar. Saltando.")
+        logger.warning("  -> Error al descargar. Saltando.")
+        DOCUMENTS_FAILED.inc(collection=collection_name, reason="download")
         return False
 
-    text = pdf_service.extract_text_from_pdf(content)
+    with INGEST_STAGE_SECONDS.time(collection=collection_name, stage="pdf_parse"):
+        text = pdf_service.extract_text_from_pdf(content)
     if not text:
-        print(f"  -> No se pudo extraer texto. Saltando.")
+        logger.warning("  -> No se pudo extraer texto. Saltando.")
+        DOCUMENTS_FAILED.inc(collection=collection_name, reason="pdf_parse")
         return False
     
     # Generar embedding semántico
-    embedding = nlp_service.generate_embedding(text)
+    chunk_embeddings = None
+    with INGEST_STAGE_SECONDS.time(collection=collection_name, stage="embed"):
+        if EMBEDDING_CHUNKING:
+            # Documento completo en ventanas solapadas; el vector del documento es su promedio
+            chunk_embeddings = nlp_service.generate_chunk_embeddings(text)
+            embedding = nlp_service.pool_embeddings(chunk_embeddings, "mean")
+        else:
+            embedding = nlp_service.generate_embedding(text)
     if not embedding:
-        print(f"  -> Error al generar embedding. Saltando.")
+        logger.warning("  -> Error al generar embedding. Saltando.")
+        DOCUMENTS_FAILED.inc(collection=collection_name, reason="embed")
         return False
 
     # Extraer entidades con NER inteligente (sin diccionario)
-    if collection_name == "cvs":
-        entities = intelligent_ner_service.extract_entities_from_cv(text)
-    else:  # syllabi
-        entities = intelligent_ner_service.extract_entities_from_syllabus(text)
+    with INGEST_STAGE_SECONDS.time(collection=collection_name, stage="ner"):
+        if collection_name == "cvs":
+            entities = intelligent_ner_service.extract_entities_from_cv(text)
+        else:  # syllabi
+            entities = intelligent_ner_service.extract_entities_from_syllabus(text)
+    
+    # Embeddings de las skills nuevas, para la coincidencia difusa del scoring
+    with INGEST_STAGE_SECONDS.time(collection=collection_name, stage="skill_embed"):
+        try:
+            skill_embedding_index.ensure(
+                entities.get('technical_skills' if collection_name == "cvs" else 'required_skills', []),
+                nlp_service.generate_embeddings
+            )
+        except Exception as e:
+            logger.warning("  -> ⚠️ Error al guardar los embeddings de skills: %s", e)
     
     # Incluir tanto el texto original como las entidades extraídas en metadata
     metadata = {
@@ -55,43 +85,57 @@ def process_file(file_id: str, file_name: str, collection_name: str, cycle_name:
     if collection_name == "syllabi":
         metadata["cycle"] = cycle_name
         metadata["course"] = course_name
-        print(f"  -> Asociando con: ciclo='{cycle_name}', curso='{course_name}'")
+        logger.info("  -> Asociando con: ciclo='%s', curso='%s'", cycle_name, course_name)
     
     # 1. Guardar en ChromaDB (embedding vectorial)
-    db_service.add_embedding(collection_name, embedding, file_id, metadata)
+    with INGEST_STAGE_SECONDS.time(collection=collection_name, stage="chroma_write"):
+        db_service.add_embedding(collection_name, embedding, file_id, metadata, document=text)
+        if chunk_embeddings is not None:
+            db_service.add_chunk_embeddings(collection_name, file_id, chunk_embeddings)
     
-    # 2. Guardar en SQL (metadata estructurada)
-    try:
-        if collection_name == "cvs":
-            # Extraer skills del CV
-            skills_list = entities.get('technical_skills', [])
-            experience_years = entities.get('experience_years', 0)
-            teacher_name = file_name.replace('.pdf', '')
+    # 2. Guardar en SQL (metadata estructurada y entidades tipadas para el scoring)
+    with INGEST_STAGE_SECONDS.time(collection=collection_name, stage="sql_write"):
+        try:
+            entity_store.put(collection_name, file_id, metadata["name"], entities,
+                             filename=file_name, embedding=embedding)
+
+            if collection_name == "cvs":
+                # Extraer skills del CV
+                skills_list = entities.get('technical_skills', [])
+                experience_years = entities.get('experience_years', 0)
+                teacher_name = file_name.replace('.pdf', '')
             
-            teacher_id = sql_db_service.add_teacher(
-                name=teacher_name,
-                embedding_id=file_id,
-                skills_list=skills_list,
-                experience_years=experience_years
-            )
-            print(f"  -> ✅ Teacher guardado en SQL (ID: {teacher_id}) con {len(skills_list)} skills")
+                teacher_id = sql_db_service.add_teacher(
+                    name=teacher_name,
+                    embedding_id=file_id,
+                    skills_list=skills_list,
+                    experience_years=experience_years
+                )
+                logger.info("  -> ✅ Teacher guardado en SQL (ID: %s) con %s skills", teacher_id, len(skills_list))
         
-        else:  # syllabi
-            # Extraer required_skills del sílabo
-            required_skills = entities.get('required_skills', [])
+            else:  # syllabi
+                # Extraer required_skills del sílabo
+                required_skills = entities.get('required_skills', [])
             
-            course_id = sql_db_service.add_course(
-                name=course_name,
-                cycle=cycle_name,
-                embedding_id=file_id,
-                required_skills=required_skills
-            )
-            print(f"  -> ✅ Course guardado en SQL (ID: {course_id}) con {len(required_skills)} required skills")
+                course_id = sql_db_service.add_course(
+                    name=course_name,
+                    cycle=cycle_name,
+                    embedding_id=file_id,
+                    required_skills=required_skills
+                )
+                logger.info("  -> ✅ Course guardado en SQL (ID: %s) con %s required skills", course_id, len(required_skills))
     
-    except Exception as e:
-        print(f"  -> ⚠️ Error al guardar en SQL: {e}")
+        except Exception as e:
+            logger.warning("  -> ⚠️ Error al guardar en SQL: %s", e)
+    
+    # Invalidar recomendaciones cacheadas que dependen de este documento (ChromaDB y SQL ya actualizados)
+    if collection_name == "syllabi":
+        recommendation_cache.invalidate_syllabus(file_id)
+    else:
+        recommendation_cache.invalidate_cvs()
     
-    print(f"  -> ✅ Procesado y guardado en ChromaDB + SQL con entidades extraídas.")
+    logger.info("  -> ✅ Procesado y guardado en ChromaDB + SQL con entidades extraídas.")
+    DOCUMENTS_PROCESSED.inc(collection=collection_name)
     return True
 
 @router.post("/sync", tags=["Sync"])
@@ -99,10 +143,10 @@ async def sync_documents(request: SyncRequest):
     """
     Inicia el proceso de sincronización con los IDs de las carpetas proporcionados.
     """
-    print("Iniciando proceso de sincronización...")
+    logger.info("Iniciando proceso de sincronización...")
     
     # --- 1. Procesar todos los CVs ---
-    print("\n--- Procesando CVs ---")
+    logger.info("--- Procesando CVs ---")
     cv_files = drive_service.list_files_in_folder(request.cv_folder_id)
     processed_cvs = 0
     for cv_file in cv_files:
@@ -111,7 +155,7 @@ async def sync_documents(request: SyncRequest):
                 processed_cvs += 1
 
     # --- 2. Procesar todos los Sílabos recursivamente ---
-    print("\n--- Procesando Sílabos ---")
+    logger.info("--- Procesando Sílabos ---")
     processed_syllabi = 0
     
     def recurse_and_process(folder_id, cycle_name="", course_name=""):
@@ -125,11 +169,11 @@ async def sync_documents(request: SyncRequest):
                 
                 if 'ciclo' in folder_name.lower():
                     # Es una carpeta de ciclo
-                    print(f"📁 Procesando ciclo: {folder_name}")
+                    logger.info("📁 Procesando ciclo: %s", folder_name)
                     recurse_and_process(item['id'], cycle_name=folder_name, course_name="")
                 elif cycle_name and not course_name and folder_name.lower() != 'silabo':
                     # Es una carpeta de curso dentro de un ciclo
-                    print(f"📚 Procesando curso: {folder_name} en {cycle_name}")
+                    logger.info("📚 Procesando curso: %s en %s", folder_name, cycle_name)
                     recurse_and_process(item['id'], cycle_name=cycle_name, course_name=folder_name)
                 else:
                     # Es otra carpeta (como 'silabo'), continuar recursivamente
@@ -141,9 +185,10 @@ async def sync_documents(request: SyncRequest):
                     if process_file(item['id'], item['name'], "syllabi", cycle_name, course_name):
                         processed_syllabi += 1
                 else:
-                    print(f"  -> Saltando {item['name']} - Sin información de ciclo/curso")
+                    logger.warning("  -> Saltando %s - Sin información de ciclo/curso", item['name'])
 
     recurse_and_process(request.syllabus_folder_id)
+    db_service.flush_vector_indexes()
 
     return {
         "status": "completed",
@@ -0,0 +1,133 @@
+from fastapi import APIRouter, HTTPException, Query
+import time
+
+import numpy as np
+
+from ..services.database_service import DatabaseService
+from ..services.advanced_matching_service import AdvancedMatchingService, HYBRID_WEIGHTS
+from ..services.entity_store import entity_store
+from ..services.similarity import distance_to_similarity
+from ..services.logging_service import get_logger
+from ..services.metrics import RECOMMENDATION_STAGE_SECONDS
+
+logger = get_logger(__name__)
+
+router = APIRouter()
+
+db_service = DatabaseService()  # ChromaDB (vectorial)
+matching_service = AdvancedMatchingService()
+
+
+def _elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 3)
+
+
+def _teacher_profile(teacher_id: str):
+    """Perfil del docente con su embedding; lo completa desde ChromaDB si hace falta."""
+    profile = entity_store.get("cvs", teacher_id)
+    if profile is not None and profile.embedding is not None:
+        return profile
+
+    data = db_service.cv_collection.get(ids=[teacher_id], include=["embeddings", "metadatas"])
+    # Chroma devuelve los embeddings como arrays de NumPy: comprobar por longitud
+    embeddings = data.get('embeddings') if data else None
+    if embeddings is None or len(embeddings) == 0:
+        return None
+    profile = entity_store.get("cvs", teacher_id, data['metadatas'][0])
+    profile.set_embedding(embeddings[0])
+    if profile.filename is None:
+        profile.filename = data['metadatas'][0].get("filename")
+    return profile
+
+
+@router.get("/teachers/{teacher_id}/course-matches", tags=["Recommendations"])
+async def get_course_matches(
+    teacher_id: str,
+    top_k: int = Query(10, ge=1, le=200, description="Número de cursos a devolver")
+):
+    """
+    Cursos que mejor encajan con un docente (búsqueda inversa a las recomendaciones).
+
+    No genera embeddings: usa el vector ya guardado del CV, busca los top_k
+    sílabos más parecidos y los puntúa con el matching híbrido (skills + semántico)
+    calculado por lotes. El coste crece con top_k, no con el número de cursos.
+
+    Args:
+        teacher_id: ID del CV del docente en ChromaDB.
+    """
+    total_start = time.perf_counter()
+
+    start = time.perf_counter()
+    teacher = _teacher_profile(teacher_id)
+    if teacher is None:
+        raise HTTPException(status_code=404, detail="El docente no ha sido procesado o no se encontró. Ejecute la sincronización.")
+    lookup_ms = _elapsed_ms(start)
+
+    # 1. Top-k sílabos por similitud con el CV
+    start = time.perf_counter()
+    search = db_service.search_similar("syllabi", teacher.embedding.tolist(), n_results=top_k, return_ids=True)
+    if search is None:
+        raise HTTPException(status_code=500, detail="Error al realizar la búsqueda vectorial.")
+    syllabus_ids, syllabus_results, distances = search
+    search_ms = _elapsed_ms(start)
+    RECOMMENDATION_STAGE_SECONDS.observe(search_ms / 1000, endpoint="course_matches", stage="vector_search")
+
+    # 2. Score híbrido de los k sílabos a la vez
+    start = time.perf_counter()
+    syllabi = [
+        entity_store.get("syllabi", syllabus_id, metadata)
+        for syllabus_id, metadata in zip(syllabus_ids, syllabus_results)
+    ]
+    semantic = np.asarray([distance_to_similarity(distance) for distance in distances], dtype=np.float64)
+    sql_scores = matching_service.skill_coverage_batch(teacher, syllabi)
+    final_scores = (
+        HYBRID_WEIGHTS['sql_skill_match'] * sql_scores +
+        HYBRID_WEIGHTS['semantic_similarity'] * semantic
+    )
+    order = np.argsort(-final_scores, kind='stable')
+
+    matches = []
+    for i in order.tolist():
+        syllabus, metadata = syllabi[i], syllabus_results[i]
+        matched_skills, missing_skills = [], []
+        for skill_id, skill in dict(zip(syllabus.required_skill_ids, syllabus.required_skills)).items():
+            (matched_skills if skill_id in teacher.skill_ids else missing_skills).append(skill)
+        matches.append({
+            "syllabus_id": syllabus_ids[i],
+            "syllabus_name": metadata.get("name", syllabus.name),
+            "cycle": metadata.get("cycle", "N/A"),
+            "course": metadata.get("course", "N/A"),
+            "level": syllabus.level,
+            "score": final_scores[i].item(),
+            "component_scores": {
+                "sql_score": sql_scores[i].item(),
+                "semantic_similarity": semantic[i].item()
+            },
+            "explanation": {
+                "matched_skills": matched_skills,
+                "missing_skills": missing_skills,
+                "total_required_skills": len(syllabus.required_skill_set)
+            }
+        })
+    scoring_ms = _elapsed_ms(start)
+    RECOMMENDATION_STAGE_SECONDS.observe(scoring_ms / 1000, endpoint="course_matches", stage="scoring")
+
+    logger.info("✅ %d cursos para el docente %s", len(matches), teacher.name)
+    return {
+        "teacher_id": teacher_id,
+        "teacher_name": teacher.name,
+        "cv_filename": teacher.filename or "N/A",
+        "matching_method": "hybrid_sql_chromadb",
+        "matches": matches,
+        "total_analyzed": len(matches),
+        "weights": {
+            "sql_skill_match": f"{HYBRID_WEIGHTS['sql_skill_match']:.0%}",
+            "semantic_similarity": f"{HYBRID_WEIGHTS['semantic_similarity']:.0%}"
+        },
+        "timings_ms": {
+            "teacher_lookup": lookup_ms,
+            "vector_search": search_ms,
+            "scoring": scoring_ms,
+            "total": _elapsed_ms(total_start)
+        }
+    }
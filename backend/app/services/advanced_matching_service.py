@@ -1,13 +1,30 @@
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+import heapq
 import numpy as np
 from sklearn.metrics.pairwise import cosine_similarity
 
+from .logging_service import get_logger, debug_enabled
+from .profiles import TeacherProfile, SyllabusProfile, skill_vocabulary
+
+logger = get_logger(__name__)
+
+# Pesos del matching híbrido (recomendaciones híbridas y cursos de un docente):
+# 40% SQL (skill match) + 60% semántico (SBERT)
+HYBRID_WEIGHTS = {
+    'sql_skill_match': 0.4,
+    'semantic_similarity': 0.6
+}
+
 class AdvancedMatchingService:
     """
     Servicio avanzado de matching que combina similitud semántica (SBERT)
     con análisis de características específicas extraídas por NER.
     """
     
+    # Versión del algoritmo de scoring. Incrementar cuando cambie la forma de
+    # calcular los scores para invalidar los resultados cacheados.
+    ALGORITHM_VERSION = "4"
+    
     def __init__(self):
         """Inicializa los pesos para diferentes componentes del matching."""
         self.weights = {
@@ -17,52 +34,46 @@ class AdvancedMatchingService:
             'education_match': 0.10        # 10% - Compatibilidad educativa
         }
 
-    def calculate_advanced_match(self, cv_entities: Dict, syllabus_entities: Dict, 
+    def calculate_advanced_match(self, cv_entities: Union[TeacherProfile, Dict],
+                               syllabus_entities: Union[SyllabusProfile, Dict],
                                semantic_similarity: float) -> Dict:
         """
         Calcula un score de matching avanzado combinando múltiples factores.
         
         Args:
-            cv_entities: Entidades extraídas del CV por NER
-            syllabus_entities: Entidades extraídas del sílabo por NER
+            cv_entities: Perfil del docente (o dict de entidades del CV, que se
+                convierte a perfil en cada llamada)
+            syllabus_entities: Perfil del sílabo (o dict de entidades del sílabo)
             semantic_similarity: Score de similitud semántica de SBERT
             
         Returns:
             Diccionario con scores detallados y explicación
         """
-        
-        # DEBUG: Imprimir datos de entrada para análisis
-        teacher_name = cv_entities.get('name', 'Unknown')
-        print(f"\n🔍 DEBUG AdvancedMatching - Teacher: {teacher_name}")
-        print(f"   CV Skills: {cv_entities.get('technical_skills', [])}")
-        print(f"   CV Experience: {cv_entities.get('experience_years', 0)} years")
-        print(f"   Syllabus Required Skills: {syllabus_entities.get('required_skills', [])}")
-        print(f"   Semantic Similarity INPUT: {semantic_similarity:.6f}")
-        
-        if semantic_similarity == 0.0:
-            print(f"   ⚠️  WARNING: Semantic similarity is 0.0 - SBERT not contributing to score!")
-        elif semantic_similarity < 0.1:
-            print(f"   ⚠️  WARNING: Very low semantic similarity - check embedding quality")
-        else:
-            print(f"   ✅ Semantic similarity looks normal")
+        teacher = cv_entities if isinstance(cv_entities, TeacherProfile) else TeacherProfile.from_entities(cv_entities)
+        syllabus = (syllabus_entities if isinstance(syllabus_entities, SyllabusProfile)
+                    else SyllabusProfile.from_entities(syllabus_entities))
+        
+        debug = debug_enabled()
+        if debug:
+            # DEBUG: Datos de entrada para análisis
+            logger.debug(
+                "🔍 AdvancedMatching - docente: %s, skills CV: %s, experiencia: %s años, "
+                "skills requeridas: %s, similitud semántica: %.6f",
+                teacher.name, list(teacher.skills), teacher.experience_years,
+                list(syllabus.required_skills), semantic_similarity
+            )
+            if semantic_similarity < 0.1:
+                logger.debug("⚠️ Similitud semántica muy baja (%.6f): revisar la calidad de los embeddings",
+                             semantic_similarity)
         
         # 1. Calcular compatibilidad de habilidades técnicas
-        skill_score = self._calculate_skill_compatibility(
-            cv_entities.get('technical_skills', []),
-            syllabus_entities.get('required_skills', [])
-        )
+        skill_score = self._calculate_skill_compatibility(teacher, syllabus)
         
         # 2. Calcular compatibilidad de experiencia
-        experience_score = self._calculate_experience_compatibility(
-            cv_entities.get('experience_years', 0),
-            syllabus_entities
-        )
+        experience_score = self._calculate_experience_compatibility(teacher, syllabus)
         
         # 3. Calcular compatibilidad educativa
-        education_score = self._calculate_education_compatibility(
-            cv_entities.get('education', []),
-            syllabus_entities.get('course_topics', [])
-        )
+        education_score = self._calculate_education_compatibility(teacher)
         
         # 4. Combinar todos los scores con pesos
         final_score = (
@@ -72,23 +83,22 @@ class AdvancedMatchingService:
             education_score * self.weights['education_match']
         )
         
-        # DEBUG: Mostrar cálculo detallado
-        semantic_contribution = semantic_similarity * self.weights['semantic_similarity']
-        skill_contribution = skill_score * self.weights['skill_match']
-        experience_contribution = experience_score * self.weights['experience_match']
-        education_contribution = education_score * self.weights['education_match']
-        
-        print(f"   📊 Component Scores:")
-        print(f"      Semantic: {semantic_similarity:.3f} * {self.weights['semantic_similarity']} = {semantic_contribution:.3f} ({semantic_contribution/final_score*100 if final_score > 0 else 0:.1f}% of total)")
-        print(f"      Skills: {skill_score:.3f} * {self.weights['skill_match']} = {skill_contribution:.3f} ({skill_contribution/final_score*100 if final_score > 0 else 0:.1f}% of total)")
-        print(f"      Experience: {experience_score:.3f} * {self.weights['experience_match']} = {experience_contribution:.3f} ({experience_contribution/final_score*100 if final_score > 0 else 0:.1f}% of total)")
-        print(f"      Education: {education_score:.3f} * {self.weights['education_match']} = {education_contribution:.3f} ({education_contribution/final_score*100 if final_score > 0 else 0:.1f}% of total)")
-        print(f"   🎯 Final Score: {final_score:.3f} -> {round(final_score * 100, 2)}%")
+        if debug:
+            # DEBUG: Contribución de cada componente al score final
+            components = (
+                ('semántico', semantic_similarity, self.weights['semantic_similarity']),
+                ('habilidades', skill_score, self.weights['skill_match']),
+                ('experiencia', experience_score, self.weights['experience_match']),
+                ('educación', education_score, self.weights['education_match']),
+            )
+            logger.debug("📊 Componentes: %s -> score final %.3f", ", ".join(
+                f"{name} {score:.3f} * {weight} = {score * weight:.3f}" for name, score, weight in components
+            ), final_score)
         
         # 5. Generar explicación detallada
         explanation = self._generate_explanation(
             semantic_similarity, skill_score, experience_score, education_score,
-            cv_entities, syllabus_entities
+            teacher, syllabus
         )
         
         return {
@@ -102,70 +112,250 @@ class AdvancedMatchingService:
             'explanation': explanation
         }
 
-    def _calculate_skill_compatibility(self, cv_skills: List[str], required_skills: List[str]) -> float:
+    def score_batch(self, syllabus: SyllabusProfile, candidates: Sequence[TeacherProfile],
+                    semantic_similarities) -> Dict[str, np.ndarray]:
         """
-        Calcula la compatibilidad entre las habilidades del CV y las requeridas.
+        Calcula los cuatro componentes y el score final de N candidatos a la vez.
+        
+        Hace las mismas operaciones en el mismo orden que calculate_advanced_match,
+        en float64, así que los scores son idénticos a los del camino escalar.
         
         Args:
-            cv_skills: Lista de habilidades técnicas del docente
-            required_skills: Lista de habilidades requeridas para el curso
+            syllabus: Perfil del sílabo
+            candidates: Perfiles de los docentes
+            semantic_similarities: Similitud semántica de cada candidato (en [0, 1])
             
         Returns:
-            Score de compatibilidad (0.0 a 1.0)
+            Diccionario de arrays de longitud N (scores en [0, 1], sin redondear):
+            'semantic_similarity', 'skill_match', 'experience_match',
+            'education_match' y 'final_score'
         """
-        print(f"      🔧 Skills Debug:")
-        print(f"         CV Skills raw: {cv_skills}")
-        print(f"         Required Skills raw: {required_skills}")
+        semantic = np.asarray(semantic_similarities, dtype=np.float64).reshape(-1)
+        if len(semantic) != len(candidates):
+            raise ValueError(f"{len(candidates)} candidatos pero {len(semantic)} similitudes semánticas")
+        
+        skill_scores = self._skill_compatibility_batch(syllabus, candidates)
+        
+        experience = np.fromiter((t.experience_years for t in candidates), dtype=np.float64, count=len(candidates))
+        required_experience = syllabus.required_experience
+        experience_scores = np.where(
+            experience == 0, 0.3,
+            np.where(
+                experience >= required_experience,
+                np.where(experience <= required_experience * 2, 1.0, 0.8),
+                np.maximum(0.1, experience / required_experience)
+            )
+        )
         
-        if not required_skills:
-            print(f"         No required skills -> score = 1.0")
-            return 1.0  # Si no hay requisitos específicos, score máximo
+        has_education = np.fromiter((t.has_education for t in candidates), dtype=bool, count=len(candidates))
+        has_university = np.fromiter((t.has_university for t in candidates), dtype=bool, count=len(candidates))
+        education_scores = np.where(has_education & has_university, 0.8, 0.5)
         
-        if not cv_skills:
-            print(f"         No CV skills -> score = 0.0")
-            return 0.0  # Si el docente no tiene habilidades listadas
+        final_scores = (
+            semantic * self.weights['semantic_similarity'] +
+            skill_scores * self.weights['skill_match'] +
+            experience_scores * self.weights['experience_match'] +
+            education_scores * self.weights['education_match']
+        )
+        return {
+            'semantic_similarity': semantic,
+            'skill_match': skill_scores,
+            'experience_match': experience_scores,
+            'education_match': education_scores,
+            'final_score': final_scores,
+        }
+
+    @staticmethod
+    def _weighted_skill_scores(exact: np.ndarray, related: np.ndarray, weights: np.ndarray) -> np.ndarray:
+        """
+        Score de habilidades a partir de máscaras candidato × skill requerida distinta.
         
-        # Normalizar a minúsculas para comparación
-        cv_skills_lower = [skill.lower().strip() for skill in cv_skills]
-        required_skills_lower = [skill.lower().strip() for skill in required_skills]
+        Cada skill requerida aporta su peso (skill_weights del perfil de
+        requisitos) si el docente la tiene, y la mitad de su peso si tiene
+        alguna relacionada (incluida ella misma). Las sumas se hacen por fila
+        con la misma reducción para 1 o N candidatos, así que el camino
+        escalar y el de lotes dan exactamente el mismo resultado.
+        """
+        exact_score = (exact * weights).sum(axis=1)
+        partial_score = (related * weights).sum(axis=1)
+        return np.minimum(1.0, exact_score + 0.5 * partial_score)
+
+    def _skill_compatibility_batch(self, syllabus: SyllabusProfile, candidates: Sequence[TeacherProfile]) -> np.ndarray:
+        """
+        _calculate_skill_compatibility para N candidatos.
         
-        # Calcular intersección exacta
-        exact_matches = len(set(cv_skills_lower) & set(required_skills_lower))
+        Sólo importan las skills relacionadas con alguna requerida, así que se
+        construye una matriz de incidencia candidato × skill relevante y dos
+        matrices del sílabo (relevante × requerida): una de coincidencia exacta
+        y otra de relación (subcadena o embedding). Las máscaras de coincidencia
+        salen de productos de matrices en vez de comparar cadenas por par.
+        """
+        n = len(candidates)
+        required_ids = syllabus.skill_weight_ids
+        if not required_ids:
+            return np.ones(n)  # Si no hay requisitos específicos, score máximo
+        
+        # Columnas: skills relacionadas con alguna requerida (incluye las propias requeridas)
+        related = [skill_vocabulary.related_ids(req_id) for req_id in required_ids]
+        columns = {skill_id: col for col, skill_id in enumerate(sorted(frozenset().union(*related)))}
+        
+        # Relevante × requerida distinta: relación y coincidencia exacta
+        partial_matrix = np.zeros((len(columns), len(required_ids)), dtype=np.float64)
+        exact_matrix = np.zeros((len(columns), len(required_ids)), dtype=np.float64)
+        for j, (req_id, related_ids) in enumerate(zip(required_ids, related)):
+            partial_matrix[[columns[skill_id] for skill_id in related_ids], j] = 1.0
+            exact_matrix[columns[req_id], j] = 1.0
+        
+        # Incidencia candidato × skill relevante
+        rows, cols = [], []
+        for i, teacher in enumerate(candidates):
+            for skill_id in teacher.skill_ids:
+                col = columns.get(skill_id)
+                if col is not None:
+                    rows.append(i)
+                    cols.append(col)
+        incidence = np.zeros((n, len(columns)), dtype=np.float64)
+        incidence[rows, cols] = 1.0
+        
+        exact = (incidence @ exact_matrix > 0).astype(np.float64)
+        partial = (incidence @ partial_matrix > 0).astype(np.float64)
+        scores = self._weighted_skill_scores(exact, partial, syllabus.skill_weights)
+        has_skills = np.fromiter((bool(t.skill_ids) for t in candidates), dtype=bool, count=n)
+        return np.where(has_skills, scores, 0.0)  # Sin habilidades listadas: 0
+
+    def skill_coverage_batch(self, teacher: TeacherProfile, syllabi: Sequence[SyllabusProfile]) -> np.ndarray:
+        """
+        Fracción de las skills requeridas (distintas) de cada sílabo que tiene
+        el docente: el score SQL del matching híbrido, para k sílabos a la vez.
         
-        # Calcular matches parciales (palabras clave comunes)
-        partial_matches = 0
-        for req_skill in required_skills_lower:
-            for cv_skill in cv_skills_lower:
-                if req_skill in cv_skill or cv_skill in req_skill:
-                    partial_matches += 0.5  # Peso menor para matches parciales
-                    break
+        Returns:
+            Array de longitud k (0 si el sílabo no tiene skills requeridas)
+        """
+        owners, matched = [], []
+        for j, syllabus in enumerate(syllabi):
+            owners.extend([j] * len(syllabus.required_skill_set))
+            matched.extend(skill_id in teacher.skill_ids for skill_id in syllabus.required_skill_set)
+        owners = np.asarray(owners, dtype=np.intp)
+        totals = np.bincount(owners, minlength=len(syllabi))
+        hits = np.bincount(owners, weights=np.asarray(matched, dtype=np.float64), minlength=len(syllabi))
+        return np.divide(hits, totals, out=np.zeros(len(syllabi)), where=totals > 0)
+
+    def select_for_rerank(self, syllabus: SyllabusProfile, candidates: Sequence[TeacherProfile],
+                          semantic_similarities, n_rerank: int) -> List[int]:
+        """
+        Filtro barato de la cascada: elige los n_rerank candidatos con mayor
+        score parcial (similitud semántica + compatibilidad de habilidades, con
+        sus pesos), calculado por lotes.
         
-        total_matches = exact_matches + partial_matches
-        max_possible_matches = len(required_skills_lower)
+        Returns:
+            Índices de los candidatos elegidos, en su orden original
+        """
+        if n_rerank >= len(candidates):
+            return list(range(len(candidates)))
+        semantic = np.asarray(semantic_similarities, dtype=np.float64).reshape(-1)
+        partial_scores = (
+            semantic * self.weights['semantic_similarity'] +
+            self._skill_compatibility_batch(syllabus, candidates) * self.weights['skill_match']
+        )
+        selected = np.argpartition(-partial_scores, n_rerank - 1)[:n_rerank]
+        return sorted(selected.tolist())
+
+    def calculate_advanced_match_batch(self, syllabus: SyllabusProfile, candidates: Sequence[TeacherProfile],
+                                       semantic_similarities, top_k: Optional[int] = None) -> List[Tuple[int, Dict]]:
+        """
+        Versión por lotes de calculate_advanced_match.
         
-        final_skill_score = min(1.0, total_matches / max_possible_matches)
+        Los scores de todos los candidatos se calculan con score_batch, los
+        top_k se eligen con un heap y la explicación sólo se genera para ellos.
         
-        print(f"         Exact matches: {exact_matches}")
-        print(f"         Partial matches: {partial_matches}")
-        print(f"         Total matches: {total_matches}")
-        print(f"         Max possible: {max_possible_matches}")
-        print(f"         Final skill score: {final_skill_score:.3f}")
+        Args:
+            syllabus: Perfil del sílabo
+            candidates: Perfiles de los docentes
+            semantic_similarities: Similitud semántica de cada candidato
+            top_k: Número de candidatos a devolver (None = todos)
+            
+        Returns:
+            Lista de (índice del candidato, resultado) ordenada por score final
+            descendente, con el mismo formato de resultado y el mismo orden que
+            calculate_advanced_match + rank_candidates
+        """
+        if not candidates:
+            return []
+        scores = self.score_batch(syllabus, candidates, semantic_similarities)
+        
+        # Ordenar por el score redondeado (como rank_candidates); ante empates
+        # gana el índice menor, igual que el sort estable
+        final_scores = [round(score * 100, 2) for score in scores['final_score'].tolist()]
+        if top_k is not None and top_k < len(final_scores):
+            order = heapq.nlargest(top_k, range(len(final_scores)), key=lambda i: (final_scores[i], -i))
+        else:
+            order = sorted(range(len(final_scores)), key=final_scores.__getitem__, reverse=True)
+        
+        results = []
+        for index in order:
+            semantic_similarity = scores['semantic_similarity'][index].item()
+            skill_score = scores['skill_match'][index].item()
+            experience_score = scores['experience_match'][index].item()
+            education_score = scores['education_match'][index].item()
+            results.append((index, {
+                'final_score': final_scores[index],
+                'component_scores': {
+                    'semantic_similarity': round(semantic_similarity * 100, 2),
+                    'skill_match': round(skill_score * 100, 2),
+                    'experience_match': round(experience_score * 100, 2),
+                    'education_match': round(education_score * 100, 2)
+                },
+                'explanation': self._generate_explanation(
+                    semantic_similarity, skill_score, experience_score, education_score,
+                    candidates[index], syllabus
+                )
+            }))
+        return results
+
+    def _calculate_skill_compatibility(self, teacher: TeacherProfile, syllabus: SyllabusProfile) -> float:
+        """
+        Calcula la compatibilidad entre las habilidades del CV y las requeridas.
+        
+        Args:
+            teacher: Perfil del docente
+            syllabus: Perfil del sílabo
+            
+        Returns:
+            Score de compatibilidad (0.0 a 1.0)
+        """
+        required_ids = syllabus.skill_weight_ids
+        if not required_ids:
+            return 1.0  # Si no hay requisitos específicos, score máximo
+        
+        cv_ids = teacher.skill_ids
+        if not cv_ids:
+            return 0.0  # Si el docente no tiene habilidades listadas
+        
+        # Coincidencia exacta (ids internados, ya normalizados) y parcial: alguna
+        # skill del docente relacionada con la requerida (subcadena o embedding)
+        exact = np.array([[req_id in cv_ids for req_id in required_ids]], dtype=np.float64)
+        partial = np.array([[not skill_vocabulary.related_ids(req_id).isdisjoint(cv_ids)
+                             for req_id in required_ids]], dtype=np.float64)
+        final_skill_score = float(self._weighted_skill_scores(exact, partial, syllabus.skill_weights)[0])
+        
+        logger.debug("🔧 Skills - exactas: %d, parciales: %d, requeridas: %d, score: %.3f",
+                     int(exact.sum()), int(partial.sum()), len(required_ids), final_skill_score)
         
         return final_skill_score
 
-    def _calculate_experience_compatibility(self, cv_experience_years: int, syllabus_entities: Dict) -> float:
+    def _calculate_experience_compatibility(self, teacher: TeacherProfile, syllabus: SyllabusProfile) -> float:
         """
         Calcula la compatibilidad basada en años de experiencia.
         
         Args:
-            cv_experience_years: Años de experiencia del docente
-            syllabus_entities: Entidades del sílabo para inferir nivel requerido
+            teacher: Perfil del docente
+            syllabus: Perfil del sílabo (con la experiencia requerida ya inferida)
             
         Returns:
             Score de compatibilidad (0.0 a 1.0)
         """
-        # Inferir experiencia requerida basándose en el contenido del curso
-        required_experience = self._infer_required_experience(syllabus_entities)
+        cv_experience_years = teacher.experience_years
+        required_experience = syllabus.required_experience
         
         if cv_experience_years == 0:
             return 0.3  # Score mínimo si no se puede determinar experiencia
@@ -182,87 +372,42 @@ class AdvancedMatchingService:
             ratio = cv_experience_years / required_experience
             return max(0.1, ratio)  # Score mínimo del 10%
 
-    def _infer_required_experience(self, syllabus_entities: Dict) -> int:
-        """
-        Infiere los años de experiencia requeridos basándose en el contenido del curso.
-        
-        Args:
-            syllabus_entities: Entidades extraídas del sílabo
-            
-        Returns:
-            Años de experiencia estimados requeridos
-        """
-        required_skills = syllabus_entities.get('required_skills', [])
-        course_topics = syllabus_entities.get('course_topics', [])
-        
-        # Palabras clave que indican nivel avanzado
-        advanced_keywords = [
-            'avanzado', 'advanced', 'senior', 'expert', 'arquitectura', 'architecture',
-            'microservices', 'machine learning', 'deep learning', 'devops', 'cloud'
-        ]
-        
-        # Palabras clave que indican nivel intermedio
-        intermediate_keywords = [
-            'intermedio', 'intermediate', 'desarrollo', 'development', 'frameworks',
-            'apis', 'databases', 'web development'
-        ]
-        
-        all_text = ' '.join(required_skills + course_topics).lower()
-        
-        if any(keyword in all_text for keyword in advanced_keywords):
-            return 5  # 5+ años para cursos avanzados
-        elif any(keyword in all_text for keyword in intermediate_keywords):
-            return 3  # 3+ años para cursos intermedios
-        else:
-            return 1  # 1+ año para cursos básicos
-
-    def _calculate_education_compatibility(self, cv_education: List[str], course_topics: List[str]) -> float:
+    def _calculate_education_compatibility(self, teacher: TeacherProfile) -> float:
         """
         Calcula compatibilidad basada en background educativo.
         
         Args:
-            cv_education: Lista de instituciones educativas del docente
-            course_topics: Temas del curso
+            teacher: Perfil del docente
             
         Returns:
             Score de compatibilidad (0.0 a 1.0)
         """
-        if not cv_education:
+        if not teacher.has_education:
             return 0.5  # Score neutro si no hay información educativa
         
         # Por ahora, score básico basado en si tiene educación universitaria
-        has_university = any(
-            keyword in edu.lower() 
-            for edu in cv_education 
-            for keyword in ['universidad', 'university', 'institute']
-        )
-        
-        return 0.8 if has_university else 0.5
+        return 0.8 if teacher.has_university else 0.5
 
     def _generate_explanation(self, semantic_sim: float, skill_score: float, 
                             exp_score: float, edu_score: float,
-                            cv_entities: Dict, syllabus_entities: Dict) -> Dict:
+                            teacher: TeacherProfile, syllabus: SyllabusProfile) -> Dict:
         """
         Genera una explicación detallada del matching.
         
         Returns:
             Diccionario con explicación detallada
         """
-        cv_skills = cv_entities.get('technical_skills', [])
-        required_skills = syllabus_entities.get('required_skills', [])
-        cv_experience = cv_entities.get('experience_years', 0)
+        cv_experience = teacher.experience_years
         
         # Encontrar habilidades coincidentes
         matching_skills = []
         missing_skills = []
         
-        if required_skills:
-            cv_skills_lower = [skill.lower() for skill in cv_skills]
-            for req_skill in required_skills:
-                if req_skill.lower() in cv_skills_lower:
-                    matching_skills.append(req_skill)
-                else:
-                    missing_skills.append(req_skill)
+        for req_id, req_skill in zip(syllabus.required_skill_ids, syllabus.required_skills):
+            if req_id in teacher.skill_ids:
+                matching_skills.append(req_skill)
+            else:
+                missing_skills.append(req_skill)
         
         # Generar factores clave
         key_factors = []
@@ -299,16 +444,14 @@ class AdvancedMatchingService:
         Returns:
             Lista ordenada de candidatos
         """
-        print(f"\n🏆 DEBUG Ranking - Antes del ordenamiento:")
-        for i, candidate in enumerate(candidates):
-            print(f"   {i+1}. {candidate.get('teacher_name', 'Unknown')}: {candidate.get('score', candidate.get('final_score', 0))}%")
-        
         # Ordenar por score (puede ser 'score' o 'final_score' dependiendo de la estructura)
         sorted_candidates = sorted(candidates, key=lambda x: x.get('score', x.get('final_score', 0)), reverse=True)
         
-        print(f"\n🏆 DEBUG Ranking - Después del ordenamiento:")
-        for i, candidate in enumerate(sorted_candidates):
-            print(f"   {i+1}. {candidate.get('teacher_name', 'Unknown')}: {candidate.get('score', candidate.get('final_score', 0))}%")
+        if debug_enabled():
+            logger.debug("🏆 Ranking: %s", ", ".join(
+                f"{i + 1}. {c.get('teacher_name', 'Unknown')}: {c.get('score', c.get('final_score', 0))}%"
+                for i, c in enumerate(sorted_candidates)
+            ))
         
         return sorted_candidates
 
@@ -1,6 +1,44 @@
 import chromadb
 import os
 
+from .vector_index import get_vector_index
+from .quantized_store import get_quantized_store, rescore_exact
+from .similarity import DISTANCE_SPACE, similarity_to_distance
+from .search_filters import compile_filters, filter_metadata, FILTER_FIELDS_VERSION, FILTER_VERSION_KEY
+from .entity_store import parse_legacy_entities
+from .logging_service import get_logger, debug_enabled
+
+logger = get_logger(__name__)
+
+# Backend de búsqueda vectorial: 'chroma' (HNSW de ChromaDB), 'numpy'
+# (índice exacto en memoria reflejado desde ChromaDB, ver vector_index.py) o
+# 'quantized' (primera pasada int8/float16 mapeada en memoria + re-puntuación
+# exacta de la lista corta, ver quantized_store.py).
+VECTOR_INDEX_BACKEND = os.getenv("VECTOR_INDEX_BACKEND", "chroma").lower()
+QUANTIZED_DTYPE = os.getenv("QUANTIZED_DTYPE", "int8").lower()
+# Candidatos de la primera pasada cuantizada por cada resultado final
+QUANTIZED_OVERSAMPLE = int(os.getenv("QUANTIZED_OVERSAMPLE", "4"))
+
+# Scoring de documentos con embeddings por fragmentos: 'pooled' usa el vector
+# promedio del documento (colección principal) y 'max' la máxima similitud entre
+# la consulta y cualquiera de sus fragmentos (colecciones *_chunks).
+CHUNK_SCORING = os.getenv("CHUNK_SCORING", "pooled").lower()
+# Fragmentos recuperados por cada documento pedido en el scoring 'max'
+CHUNK_OVERSAMPLE = int(os.getenv("CHUNK_OVERSAMPLE", "5"))
+CHUNK_COLLECTIONS = {"cvs": "cv_chunks", "syllabi": "syllabus_chunks"}
+
+# Configuración HNSW de las colecciones. Con pocos miles de vectores un grafo
+# más denso (M) y un ef de búsqueda alto dan recall casi exacto con coste bajo.
+# Cambiar cualquiera de estos valores reconstruye las colecciones existentes
+# al arrancar (ver _get_or_migrate_collection).
+HNSW_CONFIG = {
+    "hnsw:space": DISTANCE_SPACE,
+    "hnsw:M": int(os.getenv("CHROMA_HNSW_M", "32")),
+    "hnsw:construction_ef": int(os.getenv("CHROMA_HNSW_CONSTRUCTION_EF", "200")),
+    "hnsw:search_ef": int(os.getenv("CHROMA_HNSW_SEARCH_EF", "128")),
+}
+
+
 class DatabaseService:
     """
     Servicio para gestionar la base de datos vectorial ChromaDB.
@@ -9,24 +47,201 @@ class DatabaseService:
         """
         Inicializa el cliente de ChromaDB y crea o carga las colecciones.
         """
+        self.chunk_collections = {}
+        self._filter_ready = set()  # Colecciones con los campos filtrables ya completados
+        self.vector_indexes = {}
+        self.quantized_stores = {}
+        # Configura ChromaDB para que guarde los datos en un directorio local.
+        # Esto hace que los datos persistan entre ejecuciones.
+        self.db_path = os.getenv("CHROMA_DB_PATH") or os.path.join(os.path.dirname(__file__), '..', '..', 'chroma_db')
+        self._initialize_client()
+
+    def _initialize_client(self):
+        """
+        Crea el cliente de ChromaDB y las colecciones, y carga el índice en
+        memoria o los almacenes cuantizados según VECTOR_INDEX_BACKEND.
+        Si falla, deja `client` en None.
+        """
+        db_path = self.db_path
         try:
-            # Configura ChromaDB para que guarde los datos en un directorio local.
-            # Esto hace que los datos persistan entre ejecuciones.
-            db_path = os.path.join(os.path.dirname(__file__), '..', '..', 'chroma_db')
             self.client = chromadb.PersistentClient(path=db_path)
 
             # Crea o carga las colecciones. Una para CVs y otra para Sílabos.
-            self.cv_collection = self.client.get_or_create_collection(name="cvs")
-            self.syllabus_collection = self.client.get_or_create_collection(name="syllabi")
+            # Las colecciones antiguas (espacio L2) se migran a espacio coseno.
+            self.cv_collection = self._get_or_migrate_collection("cvs")
+            self.syllabus_collection = self._get_or_migrate_collection("syllabi")
+            # Fragmentos de documentos largos (ver NLPService.generate_chunk_embeddings)
+            self.chunk_collections = {
+                name: self._get_or_migrate_collection(chunk_name)
+                for name, chunk_name in CHUNK_COLLECTIONS.items()
+            }
             
-            print("✅ Base de datos ChromaDB inicializada exitosamente.")
-            print(f"   - Directorio de datos: {db_path}")
-            print(f"   - Colecciones cargadas: cvs, syllabi")
+            logger.info("✅ Base de datos ChromaDB inicializada exitosamente (directorio: %s, colecciones: cvs, syllabi)",
+                        db_path)
 
         except Exception as e:
-            print(f"❌ ERROR al inicializar ChromaDB: {e}")
+            logger.error("❌ ERROR al inicializar ChromaDB: %s", e)
             self.client = None
 
+        if self.client and VECTOR_INDEX_BACKEND == "numpy":
+            self._load_vector_indexes()
+        elif self.client and VECTOR_INDEX_BACKEND == "quantized":
+            self._load_quantized_stores(os.path.join(db_path, 'quantized'))
+
+    def _get_or_migrate_collection(self, name: str):
+        """
+        Obtiene una colección con la configuración HNSW actual, reconstruyéndola
+        si fue creada con otra (p. ej. el espacio L2 por defecto, o con otros
+        valores de CHROMA_HNSW_*): ChromaDB ignora la configuración que se pasa a
+        get_or_create_collection cuando la colección ya existe.
+        """
+        self._recover_migration(name)
+        collection = self.client.get_or_create_collection(name=name, metadata=HNSW_CONFIG)
+        # Sin 'hnsw:space' la colección usa el espacio L2 por defecto
+        current = {"hnsw:space": "l2", **(collection.metadata or {})}
+        changed = {key: current.get(key) for key, value in HNSW_CONFIG.items() if current.get(key) != value}
+        if not changed:
+            return collection
+        logger.info("Configuración HNSW de '%s' distinta de la actual (%s)", name, changed)
+        return self._migrate_collection(collection)
+
+    def _recover_migration(self, name: str):
+        """
+        Completa o deshace una migración interrumpida entre el renombrado de la
+        colección original y el borrado de su copia de respaldo.
+        """
+        backup_name = f"{name}_previous"
+        existing = {collection.name for collection in self.client.list_collections()}
+        if backup_name not in existing:
+            return
+        if name in existing:
+            # El reemplazo llegó a completarse: sólo faltaba borrar el respaldo
+            self.client.delete_collection(backup_name)
+        else:
+            logger.warning("⚠️ Migración de '%s' interrumpida: se restaura la colección original", name)
+            self.client.get_collection(backup_name).modify(name=name)
+
+    def _migrate_collection(self, collection, batch_size: int = 1000):
+        """
+        Reconstruye una colección con HNSW_CONFIG copiando ids, embeddings y metadatos.
+
+        Los datos se copian primero a una colección temporal; después la original
+        se renombra como respaldo, la temporal ocupa su nombre y sólo entonces se
+        borra el respaldo, así que una interrupción nunca deja la colección sin datos.
+        """
+        name = collection.name
+        temp_name = f"{name}_migration"
+        backup_name = f"{name}_previous"
+        logger.info("🔄 Migrando colección '%s' a la configuración HNSW %s...", name, HNSW_CONFIG)
+
+        try:
+            self.client.delete_collection(temp_name)
+        except Exception:
+            pass
+        target = self.client.create_collection(name=temp_name, metadata=HNSW_CONFIG)
+
+        offset = 0
+        while True:
+            page = collection.get(
+                include=["embeddings", "metadatas", "documents"], limit=batch_size, offset=offset
+            )
+            if not page.get('ids'):
+                break
+            target.add(
+                ids=page['ids'],
+                embeddings=page['embeddings'],
+                metadatas=page['metadatas'],
+                documents=page['documents']
+            )
+            offset += len(page['ids'])
+
+        collection.modify(name=backup_name)
+        try:
+            target.modify(name=name)
+        except Exception:
+            collection.modify(name=name)
+            raise
+        self.client.delete_collection(backup_name)
+        logger.info("✅ Colección '%s' migrada (%d documentos).", name, offset)
+        return self.client.get_collection(name=name)
+
+    def _load_vector_indexes(self):
+        """
+        Refleja las colecciones de ChromaDB en índices exactos en memoria.
+        Los índices son compartidos, así que sólo se cargan la primera vez.
+        """
+        for name, collection in (("cvs", self.cv_collection), ("syllabi", self.syllabus_collection)):
+            index = get_vector_index(name)
+            if not index.loaded:
+                index.load_from_collection(collection)
+                logger.info("Índice vectorial en memoria '%s': %d vectores", name, len(index))
+            self.vector_indexes[name] = index
+
+    def _load_quantized_stores(self, directory: str):
+        """
+        Mapea en memoria los almacenes cuantizados, reconstruyéndolos desde
+        ChromaDB si no existen, quedaron cambios sin escribir o sus ids no
+        coinciden con los de la colección.
+        """
+        for name, collection in (("cvs", self.cv_collection), ("syllabi", self.syllabus_collection)):
+            store = get_quantized_store(directory, name, QUANTIZED_DTYPE)
+            if not store.loaded:
+                if not store.load() or set(store.ids) != set(collection.get(include=[])['ids']):
+                    store.rebuild_from_collection(collection)
+                logger.info("Almacén cuantizado '%s' (%s): %d vectores, %.1f KB",
+                            name, QUANTIZED_DTYPE, len(store), store.nbytes / 1024)
+            self.quantized_stores[name] = store
+
+    def flush_vector_indexes(self):
+        """Escribe a disco los cambios pendientes de los almacenes cuantizados (fin de un sync)."""
+        for store in self.quantized_stores.values():
+            store.flush()
+
+    def get_embedding(self, collection_name: str, doc_id: str) -> list[float] | None:
+        """
+        Obtiene el embedding de un único documento, usando el índice en memoria si existe.
+        """
+        index = self.vector_indexes.get(collection_name)
+        if index is not None:
+            vector = index.get_embedding(doc_id)
+            return vector.tolist() if vector is not None else None
+
+        collection = self._get_collection(collection_name)
+        if collection is None:
+            return None
+        data = collection.get(ids=[doc_id], include=["embeddings"])
+        if data is None or data.get('embeddings') is None or len(data['embeddings']) == 0:
+            return None
+        return data['embeddings'][0]
+
+    def _search_quantized(self, collection_name: str, query_embedding, n_results: int) -> tuple[list, list, list]:
+        """
+        Top-k en dos pasadas: candidatos con los vectores cuantizados y
+        re-puntuación exacta (float32 de ChromaDB) sólo de esa lista corta.
+        """
+        store = self.quantized_stores[collection_name]
+        candidate_ids, _ = store.search(query_embedding, n_results * QUANTIZED_OVERSAMPLE)
+        if not candidate_ids:
+            return [], [], []
+
+        exact = self._get_collection(collection_name).get(
+            ids=candidate_ids, include=["embeddings", "metadatas"]
+        )
+        ranked = rescore_exact(query_embedding, exact['ids'], exact['embeddings'], n_results)
+        ids = [exact['ids'][i] for i, _ in ranked]
+        metadatas = [exact['metadatas'][i] for i, _ in ranked]
+        distances = [similarity_to_distance(sim) for _, sim in ranked]
+        return ids, metadatas, distances
+
+    def _get_collection(self, collection_name: str):
+        """Devuelve la colección de ChromaDB por nombre, o None si no es válida."""
+        if collection_name == "cvs":
+            return self.cv_collection
+        if collection_name == "syllabi":
+            return self.syllabus_collection
+        logger.warning("Colección '%s' no válida.", collection_name)
+        return None
+
     def _flatten_metadata(self, metadata: dict) -> dict:
         """
         Aplana los metadatos para que sean compatibles con ChromaDB.
@@ -74,21 +289,32 @@ class DatabaseService:
             self.client = None
             self.cv_collection = None
             self.syllabus_collection = None
+            self.chunk_collections = {}
+            self._filter_ready.clear()
+            for index in self.vector_indexes.values():
+                index.clear()
+            for store in self.quantized_stores.values():
+                store.clear()
             
             # Eliminar directorio de datos corrupto
-            db_path = os.path.join(os.path.dirname(__file__), "..", "..", "chroma_db")
+            db_path = self.db_path
             if os.path.exists(db_path):
                 shutil.rmtree(db_path)
-                print(f"🗑️ Directorio de base de datos eliminado: {db_path}")
+                logger.info("🗑️ Directorio de base de datos eliminado: %s", db_path)
             
-            # Reinicializar
+            # Reinicializar: ChromaDB guarda en caché el sistema de cada ruta, que
+            # seguiría apuntando a los archivos borrados
+            chromadb.api.client.SharedSystemClient.clear_system_cache()
             self._initialize_client()
-            print("✅ Base de datos ChromaDB reinicializada exitosamente.")
+            if self.client is None:
+                raise RuntimeError("no se pudo crear el cliente de ChromaDB")
+            logger.info("✅ Base de datos ChromaDB reinicializada exitosamente.")
             
         except Exception as e:
-            print(f"❌ ERROR al reinicializar base de datos: {e}")
+            logger.error("❌ ERROR al reinicializar base de datos: %s", e)
 
-    def add_embedding(self, collection_name: str, embedding: list[float], doc_id: str, metadata: dict):
+    def add_embedding(self, collection_name: str, embedding: list[float], doc_id: str, metadata: dict,
+                      document: str | None = None):
         """
         Añade un embedding a una colección específica.
 
@@ -97,39 +323,187 @@ class DatabaseService:
             embedding: El vector de embedding.
             doc_id: Un ID único para el documento (ej: el ID de archivo de Drive).
             metadata: Un diccionario con datos adicionales (ej: nombre del docente).
+            document: Texto completo del documento, sobre el que actúa el filtro `text`.
+                Si es None se guarda `metadata['raw_text']` (que puede estar recortado).
         """
         if not self.client:
-            print("Cliente de ChromaDB no inicializado.")
+            logger.warning("Cliente de ChromaDB no inicializado.")
             return
 
         try:
-            if collection_name == "cvs":
-                collection = self.cv_collection
-            elif collection_name == "syllabi":
-                collection = self.syllabus_collection
-            else:
-                print(f"Colección '{collection_name}' no válida.")
+            collection = self._get_collection(collection_name)
+            if collection is None:
                 return
 
-            # Aplanar metadatos para hacerlos compatibles con ChromaDB
+            # Aplanar metadatos para hacerlos compatibles con ChromaDB, más los
+            # campos tipados sobre los que se puede filtrar (ver search_filters.py)
             flattened_metadata = self._flatten_metadata(metadata)
+            flattened_metadata.update(
+                filter_metadata(collection_name, parse_legacy_entities(collection_name, metadata), metadata)
+            )
+            raw_text = document if document is not None else metadata.get("raw_text")
             
-            print(f"🔧 DEBUG - Metadatos originales: {metadata}")
-            print(f"🔧 DEBUG - Metadatos aplanados: {flattened_metadata}")
+            logger.debug("🔧 Metadatos de '%s': originales=%s, aplanados=%s", doc_id, metadata, flattened_metadata)
 
-            collection.add(
+            # upsert (y no add) para que re-sincronizar un documento lo actualice
+            # tanto en ChromaDB como en el índice en memoria.
+            collection.upsert(
                 embeddings=[embedding],
                 metadatas=[flattened_metadata],
+                documents=[raw_text] if isinstance(raw_text, str) else None,
                 ids=[doc_id]
             )
+
+            index = self.vector_indexes.get(collection_name)
+            if index is not None:
+                index.upsert(doc_id, embedding, flattened_metadata)
+            store = self.quantized_stores.get(collection_name)
+            if store is not None:
+                store.upsert(doc_id, embedding)
         except Exception as e:
-            print(f"❌ ERROR al añadir embedding a la colección '{collection_name}': {e}")
+            logger.error("❌ ERROR al añadir embedding a la colección '%s': %s", collection_name, e)
             # Si hay error de base de datos corrupta, intentar reinicializar
             if "unable to open database" in str(e) or "no such table" in str(e):
-                print("🔄 Detectando corrupción de base de datos, reinicializando...")
+                logger.warning("🔄 Detectando corrupción de base de datos, reinicializando...")
                 self._reinitialize_database()
 
-    def search_similar(self, collection_name: str, query_embedding: list[float], n_results: int = 5) -> tuple[list, list] | None:
+    def add_chunk_embeddings(self, collection_name: str, doc_id: str, chunk_embeddings, metadata: dict = None):
+        """
+        Guarda los embeddings de los fragmentos de un documento, reemplazando los anteriores.
+
+        Args:
+            collection_name: Colección del documento ('cvs' o 'syllabi').
+            doc_id: ID del documento padre.
+            chunk_embeddings: Matriz (n_fragmentos, dim) de NLPService.generate_chunk_embeddings.
+            metadata: Metadatos escalares opcionales que se copian a cada fragmento.
+        """
+        if not self.client:
+            logger.warning("Cliente de ChromaDB no inicializado.")
+            return
+
+        collection = self.chunk_collections.get(collection_name)
+        if collection is None:
+            logger.warning("Colección '%s' no válida.", collection_name)
+            return
+
+        try:
+            collection.delete(where={"parent_id": doc_id})
+            if chunk_embeddings is None or len(chunk_embeddings) == 0:
+                return
+            base_metadata = {k: v for k, v in (metadata or {}).items() if isinstance(v, (str, int, float, bool))}
+            collection.add(
+                ids=[f"{doc_id}#{i}" for i in range(len(chunk_embeddings))],
+                embeddings=[list(map(float, vector)) for vector in chunk_embeddings],
+                metadatas=[{**base_metadata, "parent_id": doc_id, "chunk_index": i}
+                           for i in range(len(chunk_embeddings))]
+            )
+        except Exception as e:
+            logger.error("❌ ERROR al añadir fragmentos a la colección '%s': %s", collection_name, e)
+
+    def _ensure_filter_metadata(self, collection_name: str, batch_size: int = 1000):
+        """
+        Completa los campos filtrables de los documentos guardados antes de
+        existir (o con una versión anterior de filter_metadata). Sólo se
+        comprueba la primera vez que se filtra cada colección.
+        """
+        if collection_name in self._filter_ready:
+            return
+        collection = self._get_collection(collection_name)
+        # $ne también selecciona los documentos que no tienen la clave
+        outdated = collection.get(
+            where={FILTER_VERSION_KEY: {"$ne": FILTER_FIELDS_VERSION}},
+            include=["metadatas", "embeddings", "documents"]
+        )
+        ids, metadatas, documents = outdated['ids'], outdated['metadatas'], outdated['documents']
+        for start in range(0, len(ids), batch_size):
+            batch = metadatas[start:start + batch_size]
+            # Con los embeddings guardados: si sólo se pasan documentos, ChromaDB intenta re-embeberlos
+            collection.update(
+                ids=ids[start:start + batch_size],
+                embeddings=outdated['embeddings'][start:start + batch_size],
+                metadatas=[
+                    filter_metadata(collection_name, parse_legacy_entities(collection_name, metadata), metadata)
+                    for metadata in batch
+                ],
+                # Se conserva el texto completo si ya estaba guardado
+                documents=[
+                    document or metadata.get("raw_text") or ""
+                    for document, metadata in zip(documents[start:start + batch_size], batch)
+                ]
+            )
+        if ids:
+            logger.info("Campos filtrables completados en '%s': %d documentos", collection_name, len(ids))
+        self._filter_ready.add(collection_name)
+
+    def _filter_ids(self, collection_name: str, where: dict | None, where_document: dict | None,
+                    ids: list[str] | None = None) -> list[str]:
+        """Ids de los documentos que cumplen el filtro (dentro de `ids`, si se indica)."""
+        data = self._get_collection(collection_name).get(
+            ids=ids, where=where, where_document=where_document, include=[]
+        )
+        return data['ids']
+
+    def search_similar_chunked(self, collection_name: str, query_embedding: list[float],
+                               n_results: int = 5, ids: list[str] | None = None,
+                               return_ids: bool = False) -> tuple | None:
+        """
+        Busca documentos por máxima similitud (max-sim) entre la consulta y sus fragmentos.
+
+        Args:
+            ids: Si se indica, sólo considera fragmentos de esos documentos.
+            return_ids: Devolver también los ids de los documentos padre.
+
+        Returns:
+            Una tupla (metadatos de los documentos padre, distancias coseno), precedida de
+            los ids si return_ids=True, o None si hay error.
+        """
+        collection = self.chunk_collections.get(collection_name)
+        parent_collection = self._get_collection(collection_name)
+        if collection is None or parent_collection is None:
+            return None
+
+        try:
+            # Un documento con muchos fragmentos parecidos puede ocupar gran parte
+            # de la página: se amplía la búsqueda hasta reunir n_results padres
+            # distintos o agotar los fragmentos
+            total = collection.count()
+            fetch = min(n_results * CHUNK_OVERSAMPLE, total)
+            best_distance = {}
+            while fetch > 0:
+                results = collection.query(
+                    query_embeddings=[query_embedding],
+                    n_results=fetch,
+                    where={"parent_id": {"$in": ids}} if ids is not None else None,
+                    include=["metadatas", "distances"]
+                )
+                # Los resultados vienen ordenados: la primera aparición de cada padre es su mejor fragmento
+                best_distance = {}
+                for metadata, distance in zip(results['metadatas'][0], results['distances'][0]):
+                    parent_id = metadata.get("parent_id")
+                    if parent_id not in best_distance:
+                        best_distance[parent_id] = distance
+                    if len(best_distance) == n_results:
+                        break
+                if len(best_distance) == n_results or len(results['ids'][0]) < fetch or fetch == total:
+                    break
+                fetch = min(fetch * 2, total)
+
+            parent_ids = list(best_distance)
+            if not parent_ids:
+                return ([], [], []) if return_ids else ([], [])
+            parents = parent_collection.get(ids=parent_ids, include=["metadatas"])
+            metadata_by_id = dict(zip(parents['ids'], parents['metadatas']))
+            found = [parent_id for parent_id in parent_ids if parent_id in metadata_by_id]
+            metadatas, distances = [metadata_by_id[p] for p in found], [best_distance[p] for p in found]
+            return (found, metadatas, distances) if return_ids else (metadatas, distances)
+
+        except Exception as e:
+            logger.error("❌ ERROR al buscar fragmentos en la colección '%s': %s", collection_name, e)
+            return None
+
+    def search_similar(self, collection_name: str, query_embedding: list[float], n_results: int = 5,
+                       ids: list[str] | None = None, return_ids: bool = False,
+                       filters: dict | None = None) -> tuple | None:
         """
         Busca los N embeddings más similares a un embedding de consulta.
 
@@ -137,59 +511,164 @@ class DatabaseService:
             collection_name: La colección en la que buscar.
             query_embedding: El embedding a comparar.
             n_results: El número de resultados a devolver.
+            ids: Si se indica, restringe la búsqueda a esos documentos (ej: filtrados por SQL).
+            return_ids: Devolver también los ids de los documentos encontrados.
+            filters: Filtros estructurados (ver search_filters.compile_filters). Se
+                aplican dentro de la búsqueda, así que se devuelven hasta N
+                documentos que los cumplen.
 
         Returns:
-            Una tupla con las listas de metadatos y distancias correspondientes, o None si hay error.
+            Una tupla con las listas de metadatos y distancias correspondientes (precedida de
+            la lista de ids si return_ids=True), o None si hay error.
+
+        Raises:
+            ValueError: Si `filters` contiene filtros no admitidos para la colección.
         """
         if not self.client:
-            print("Cliente de ChromaDB no inicializado.")
+            logger.warning("Cliente de ChromaDB no inicializado.")
             return None
 
+        where, where_document = compile_filters(collection_name, filters)
+        filtered = where is not None or where_document is not None
+        empty = ([], [], []) if return_ids else ([], [])
+
+        if filtered:
+            try:
+                self._ensure_filter_metadata(collection_name)
+            except Exception as e:
+                logger.error("❌ ERROR al preparar los filtros de la colección '%s': %s", collection_name, e)
+                return None
+
+        if CHUNK_SCORING == "max" and self.chunk_collections.get(collection_name) is not None \
+                and self.chunk_collections[collection_name].count() > 0:
+            if filtered:
+                # Los fragmentos no tienen los campos filtrables: filtrar por documento padre
+                try:
+                    ids = self._filter_ids(collection_name, where, where_document, ids)
+                except Exception as e:
+                    logger.error("❌ ERROR al filtrar la colección '%s': %s", collection_name, e)
+                    return None
+            if ids is not None and not ids:
+                return empty
+            return self.search_similar_chunked(collection_name, query_embedding, n_results, ids, return_ids)
+
+        if ids is not None and not ids:
+            return empty
+
         try:
-            if collection_name == "cvs":
-                collection = self.cv_collection
-            elif collection_name == "syllabi":
-                collection = self.syllabus_collection
-            else:
-                print(f"Colección '{collection_name}' no válida.")
+            index = self.vector_indexes.get(collection_name)
+            if index is not None:
+                if filtered:
+                    # El índice en memoria no evalúa filtros: máscara con los ids que los cumplen
+                    ids = self._filter_ids(collection_name, where, where_document, ids)
+                    if not ids:
+                        return empty
+                found_ids, metadatas, similarities = index.search(query_embedding, n_results, ids=ids)
+                # Misma convención que ChromaDB en espacio coseno: d = 1 - cos
+                distances = [similarity_to_distance(sim) for sim in similarities]
+                return (found_ids, metadatas, distances) if return_ids else (metadatas, distances)
+            # El almacén cuantizado no admite filtros ni máscaras de ids: con filtros
+            # (o ids) la búsqueda cae a collection.query de ChromaDB, más abajo
+            if collection_name in self.quantized_stores and ids is None and not filtered:
+                found_ids, metadatas, distances = self._search_quantized(collection_name, query_embedding, n_results)
+                return (found_ids, metadatas, distances) if return_ids else (metadatas, distances)
+
+            collection = self._get_collection(collection_name)
+            if collection is None:
                 return None
 
             results = collection.query(
                 query_embeddings=[query_embedding],
                 n_results=n_results,
+                ids=ids,
+                where=where,
+                where_document=where_document,
                 include=["metadatas", "distances"]
             )
 
+            found_ids = results['ids'][0] if results['ids'] else []
             metadatas = results['metadatas'][0] if results['metadatas'] else []
             distances = results['distances'][0] if results['distances'] else []
 
-            # DEBUG: Analizar las distancias obtenidas
-            if distances:
+            # DEBUG: Analizar las distancias obtenidas (sólo si la depuración está activa)
+            if distances and debug_enabled():
                 import numpy as np
-                print(f"\n🔍 DEBUG ChromaDB Search - Collection: {collection_name}")
-                print(f"   Query embedding norm: {np.linalg.norm(query_embedding):.3f}")
-                print(f"   Results found: {len(distances)}")
-                print(f"   Distance range: [{min(distances):.3f}, {max(distances):.3f}]")
-                print(f"   Distance mean: {np.mean(distances):.3f}")
-                
-                # Verificar si las distancias son anómalamente altas
-                if max(distances) > 3.0:
-                    print(f"   ⚠️  WARNING: Very high distances detected! May indicate embedding normalization issues.")
-                elif max(distances) > 2.0:
-                    print(f"   ⚠️  WARNING: High distances detected! Check embedding quality.")
-                else:
-                    print(f"   ✅ Distances look reasonable.")
-
-            return metadatas, distances
+                logger.debug(
+                    "🔍 ChromaDB search '%s' - norma de la consulta: %.3f, resultados: %d, "
+                    "distancias: [%.3f, %.3f], media: %.3f",
+                    collection_name, np.linalg.norm(query_embedding), len(distances),
+                    min(distances), max(distances), np.mean(distances)
+                )
+                # Distancia coseno: 0 = idénticos, 1 = ortogonales, 2 = opuestos
+                if max(distances) > 1.0:
+                    logger.debug("⚠️ Similitudes coseno negativas detectadas. Revisar la calidad de los embeddings.")
+
+            return (found_ids, metadatas, distances) if return_ids else (metadatas, distances)
 
         except Exception as e:
-            print(f"❌ ERROR al buscar en la colección '{collection_name}': {e}")
+            logger.error("❌ ERROR al buscar en la colección '%s': %s", collection_name, e)
             # Si hay error de base de datos corrupta, intentar reinicializar
             if "unable to open database" in str(e) or "no such table" in str(e):
-                print("🔄 Detectando corrupción de base de datos, reinicializando...")
+                logger.warning("🔄 Detectando corrupción de base de datos, reinicializando...")
                 self._reinitialize_database()
             return None
 
+    def search_similar_batch(self, collection_name: str, query_embeddings: list[list[float]],
+                             n_results: int = 5, return_ids: bool = False) -> list[tuple] | None:
+        """
+        Igual que search_similar, pero para varias consultas en una sola llamada.
+
+        Con CHUNK_SCORING='max' cada consulta se resuelve con search_similar_chunked,
+        para puntuar igual que search_similar.
+
+        Args:
+            return_ids: Devolver también los ids de los documentos encontrados.
+
+        Returns:
+            Una tupla (metadatos, distancias) por consulta (precedida de la lista de ids
+            si return_ids=True), o None si hay error.
+        """
+        if not self.client:
+            logger.warning("Cliente de ChromaDB no inicializado.")
+            return None
+
+        if CHUNK_SCORING == "max" and self.chunk_collections.get(collection_name) is not None \
+                and self.chunk_collections[collection_name].count() > 0:
+            results = [
+                self.search_similar_chunked(collection_name, query_embedding, n_results, return_ids=return_ids)
+                for query_embedding in query_embeddings
+            ]
+            return None if any(result is None for result in results) else results
+
+        try:
+            index = self.vector_indexes.get(collection_name)
+            if index is not None:
+                results = [
+                    (found_ids, metadatas, [similarity_to_distance(sim) for sim in similarities])
+                    for found_ids, metadatas, similarities in index.search_batch(query_embeddings, n_results)
+                ]
+            elif collection_name in self.quantized_stores:
+                results = [
+                    self._search_quantized(collection_name, query_embedding, n_results)
+                    for query_embedding in query_embeddings
+                ]
+            else:
+                collection = self._get_collection(collection_name)
+                if collection is None:
+                    return None
+
+                query = collection.query(
+                    query_embeddings=query_embeddings,
+                    n_results=n_results,
+                    include=["metadatas", "distances"]
+                )
+                results = list(zip(query['ids'] or [], query['metadatas'] or [], query['distances'] or []))
+            return results if return_ids else [result[1:] for result in results]
+
+        except Exception as e:
+            logger.error("❌ ERROR al buscar en la colección '%s': %s", collection_name, e)
+            return None
+
 # --- Ejemplo de uso (para pruebas) ---
 if __name__ == '__main__':
     # Para esta prueba, necesitamos el NLPService para crear embeddings de ejemplo.
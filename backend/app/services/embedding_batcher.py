@@ -0,0 +1,120 @@
+"""
+Micro-batching dinámico de embeddings para consultas en tiempo de petición.
+
+Las consultas ad-hoc (descripciones de cursos en texto libre, "docentes
+parecidos a este texto", ...) llegan como muchos `generate_embedding` de un solo
+texto desde peticiones concurrentes. EmbeddingBatcher acumula esas llamadas
+durante como máximo `max_wait_ms` o hasta `max_batch_size` textos, las ejecuta
+como un único `encode` en un hilo (sin bloquear el event loop) y resuelve el
+future de cada llamador. La espera adicional queda acotada por `max_wait_ms`
+mientras el throughput crece con la carga.
+"""
+
+import asyncio
+import os
+
+EMBEDDING_BATCH_MAX_SIZE = int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "32"))
+EMBEDDING_BATCH_MAX_WAIT_MS = float(os.getenv("EMBEDDING_BATCH_MAX_WAIT_MS", "5"))
+
+
+class EmbeddingBatcher:
+    """
+    Agrupa llamadas concurrentes a `embed` en lotes para NLPService.generate_embeddings.
+    """
+
+    def __init__(self, nlp_service, max_batch_size: int = EMBEDDING_BATCH_MAX_SIZE,
+                 max_wait_ms: float = EMBEDDING_BATCH_MAX_WAIT_MS):
+        """
+        Args:
+            nlp_service: Servicio con `generate_embeddings(texts)` (NLPService o el cliente del trabajador).
+            max_batch_size: Máximo de textos por lote.
+            max_wait_ms: Tiempo máximo que un texto espera a que se complete su lote.
+        """
+        self.nlp_service = nlp_service
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+
+        self._pending: list[tuple[str, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._batches = 0
+        self._items = 0
+
+    async def embed(self, text: str) -> list[float]:
+        """
+        Devuelve el embedding normalizado de `text`, calculado junto con las
+        demás llamadas concurrentes.
+
+        Raises:
+            ValueError: Si el texto está vacío.
+            RuntimeError: Si el modelo no pudo generar el lote.
+        """
+        if not text or not isinstance(text, str):
+            raise ValueError("El texto de entrada debe ser una cadena no vacía.")
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_ms / 1000.0, self._flush)
+
+        return await future
+
+    def _flush(self):
+        """Saca los textos pendientes y lanza su lote en segundo plano."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending[:self.max_batch_size], self._pending[self.max_batch_size:]
+        if self._pending:
+            # Lo que no cupo en este lote espera como mucho otra ventana
+            self._timer = asyncio.get_running_loop().call_later(self.max_wait_ms / 1000.0, self._flush)
+        asyncio.get_running_loop().create_task(self._run_batch(batch))
+
+    async def _run_batch(self, batch: list[tuple[str, asyncio.Future]]):
+        """Codifica un lote en un hilo y resuelve los futures de cada llamador."""
+        # Textos repetidos dentro del lote se codifican una sola vez
+        unique_texts = list(dict.fromkeys(text for text, _ in batch))
+        try:
+            embeddings = await asyncio.to_thread(self.nlp_service.generate_embeddings, unique_texts)
+            if embeddings is None:
+                raise RuntimeError("No se pudieron generar los embeddings del lote")
+            by_text = dict(zip(unique_texts, embeddings))
+            for text, future in batch:
+                if not future.done():
+                    future.set_result(by_text[text])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+        self._batches += 1
+        self._items += len(batch)
+
+    def get_statistics(self) -> dict:
+        """Estadísticas de uso del batcher."""
+        return {
+            "batches": self._batches,
+            "items": self._items,
+            "avg_batch_size": round(self._items / self._batches, 2) if self._batches else 0.0,
+            "pending": len(self._pending),
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+        }
+
+
+_embedding_batcher: EmbeddingBatcher | None = None
+
+
+def get_embedding_batcher() -> EmbeddingBatcher:
+    """Batcher compartido sobre el servicio de embeddings configurado (ver create_embedding_service)."""
+    global _embedding_batcher
+    if _embedding_batcher is None:
+        from .embedding_worker import create_embedding_service
+        _embedding_batcher = EmbeddingBatcher(create_embedding_service())
+    return _embedding_batcher
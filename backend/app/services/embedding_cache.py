@@ -0,0 +1,77 @@
+"""
+Caché de embeddings de consultas.
+
+Las búsquedas en texto libre suelen repetirse (la misma descripción de curso,
+el mismo filtro desde el frontend). Guardar el embedding por (modelo, backend,
+texto) permite responder las consultas repetidas sin volver a ejecutar el modelo.
+"""
+
+from collections import OrderedDict
+from threading import Lock
+from typing import List, Optional, Tuple
+import hashlib
+
+
+class EmbeddingCache:
+    """
+    Caché LRU en memoria de embeddings indexados por modelo y texto.
+    """
+
+    def __init__(self, max_entries: int = 2048):
+        """
+        Args:
+            max_entries: Número máximo de embeddings guardados antes de descartar los más antiguos.
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str, str], List[float]]" = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model_name: str, backend: str, text: str) -> Tuple[str, str, str]:
+        """Clave de caché: el texto se guarda como hash para no retener textos largos."""
+        digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        return (model_name or "", backend or "", digest)
+
+    def get(self, model_name: str, backend: str, text: str) -> Optional[List[float]]:
+        """Devuelve el embedding cacheado del texto, o None si no existe."""
+        key = self.make_key(model_name, backend, text)
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return embedding
+
+    def set(self, model_name: str, backend: str, text: str, embedding: List[float]):
+        """Guarda el embedding de un texto."""
+        key = self.make_key(model_name, backend, text)
+        with self._lock:
+            self._entries[key] = embedding
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Vacía la caché."""
+        with self._lock:
+            self._entries.clear()
+
+    def get_statistics(self) -> dict:
+        """Estadísticas de uso de la caché."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            }
+
+
+# Instancia compartida por todas las rutas
+embedding_cache = EmbeddingCache()
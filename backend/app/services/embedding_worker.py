@@ -0,0 +1,344 @@
+"""
+Proceso trabajador dedicado para la generación de embeddings.
+
+Con NLP_WORKER=1 el modelo de NLPService se carga en un proceso aparte en lugar
+de dentro de los handlers de la API, de modo que una sincronización no compite
+por el GIL ni por los hilos de torch con el tráfico de recomendaciones.
+
+Los textos llegan por una cola de peticiones; el trabajador agrupa las
+peticiones que llegan dentro de una ventana corta (NLP_WORKER_BATCH_WINDOW_MS)
+o hasta NLP_WORKER_MAX_BATCH textos, y los codifica con una sola llamada a
+`encode`. El cliente (EmbeddingWorkerClient) expone la misma interfaz que
+NLPService y, además, variantes `async` que esperan el resultado sin bloquear
+el event loop.
+"""
+
+from concurrent.futures import Future
+import asyncio
+import atexit
+import itertools
+import multiprocessing
+import os
+import queue
+import threading
+import time
+
+from .nlp_service import NLPService
+from .logging_service import get_logger
+
+logger = get_logger(__name__)
+
+NLP_WORKER = os.getenv("NLP_WORKER", "0") == "1"
+NLP_WORKER_BATCH_WINDOW_MS = float(os.getenv("NLP_WORKER_BATCH_WINDOW_MS", "10"))
+NLP_WORKER_MAX_BATCH = int(os.getenv("NLP_WORKER_MAX_BATCH", "64"))
+NLP_WORKER_TIMEOUT = float(os.getenv("NLP_WORKER_TIMEOUT", "300"))
+
+# Tipos de petición que entiende el trabajador
+KIND_EMBED = "embed"      # un embedding normalizado por texto
+KIND_CHUNKS = "chunks"    # embeddings por fragmentos de cada texto
+
+_READY = "__ready__"
+
+# Cada cuánto se comprueba, mientras se espera una respuesta, que el trabajador sigue vivo
+LIVENESS_POLL_SECONDS = 1.0
+
+
+def _process_batch(nlp_service: NLPService, batch: list, responses):
+    """Codifica un micro-lote de peticiones (agrupadas por tipo) y envía cada resultado."""
+    for kind in (KIND_EMBED, KIND_CHUNKS):
+        items = [item for item in batch if item[1] == kind]
+        if not items:
+            continue
+
+        texts = [text for _, _, item_texts in items for text in item_texts]
+        try:
+            if kind == KIND_EMBED:
+                results = nlp_service.generate_embeddings(texts)
+            else:
+                results = nlp_service.generate_chunk_embeddings_batch(texts)
+            error = None if results is not None else "No se pudieron generar los embeddings"
+        except Exception as e:
+            results, error = None, str(e)
+
+        offset = 0
+        for request_id, _, item_texts in items:
+            if error:
+                responses.put((request_id, None, error))
+            else:
+                responses.put((request_id, results[offset:offset + len(item_texts)], None))
+            offset += len(item_texts)
+
+
+def _worker_main(requests, responses, max_batch_size: int, batch_window_ms: float):
+    """Bucle principal del proceso trabajador."""
+    nlp_service = NLPService()
+    responses.put((_READY, {
+        "loaded": nlp_service.model is not None,
+        "model_name": nlp_service.model_name,
+        "backend": nlp_service.backend,
+    }, None))
+    window = batch_window_ms / 1000.0
+
+    stop = False
+    while not stop:
+        item = requests.get()
+        if item is None:
+            break
+
+        # Micro-lote: acumular peticiones hasta llenar el lote o agotar la ventana
+        batch = [item]
+        n_texts = len(item[2])
+        deadline = time.monotonic() + window
+        while n_texts < max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = requests.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                stop = True
+                break
+            batch.append(item)
+            n_texts += len(item[2])
+
+        _process_batch(nlp_service, batch, responses)
+
+
+class EmbeddingWorkerClient:
+    """
+    Cliente del proceso trabajador con la misma interfaz que NLPService.
+    """
+
+    pool_embeddings = staticmethod(NLPService.pool_embeddings)
+
+    def __init__(self, max_batch_size: int = NLP_WORKER_MAX_BATCH,
+                 batch_window_ms: float = NLP_WORKER_BATCH_WINDOW_MS, timeout: float = NLP_WORKER_TIMEOUT):
+        """
+        Args:
+            max_batch_size: Máximo de textos por micro-lote.
+            batch_window_ms: Tiempo máximo que el trabajador espera para completar un lote.
+            timeout: Segundos máximos de espera por una petición.
+        """
+        self.max_batch_size = max_batch_size
+        self.batch_window_ms = batch_window_ms
+        self.timeout = timeout
+        self.model = None  # True cuando el trabajador cargó el modelo
+        self.model_name = None
+        self.backend = None
+
+        self._ids = itertools.count()
+        self._pending: dict[int, Future] = {}
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._process = None
+        self._dispatcher = None
+        atexit.register(self.close)
+
+    def is_alive(self) -> bool:
+        """True si el proceso trabajador está en marcha."""
+        process = self._process
+        return process is not None and process.is_alive()
+
+    def start(self):
+        """Lanza el proceso trabajador (o lo relanza si murió) y espera a que cargue el modelo."""
+        with self._start_lock:
+            if self._process is not None:
+                if self._process.is_alive():
+                    return
+                logger.error("❌ El proceso de embeddings terminó inesperadamente (código %s); se relanza.",
+                             self._process.exitcode)
+                self.close()
+
+            # 'spawn' evita heredar el estado de torch/hilos del proceso de la API
+            context = multiprocessing.get_context("spawn")
+            self._requests = context.Queue()
+            self._responses = context.Queue()
+            self._process = context.Process(
+                target=_worker_main,
+                args=(self._requests, self._responses, self.max_batch_size, self.batch_window_ms),
+                name="embedding-worker",
+                daemon=True,
+            )
+            self._process.start()
+            logger.info("Iniciando proceso de embeddings (pid %s)...", self._process.pid)
+
+            info = self._wait_ready()
+            self.model = info["loaded"] or None
+            self.model_name = info["model_name"]
+            self.backend = info["backend"]
+            if self.model:
+                logger.info("✅ Proceso de embeddings listo.")
+            else:
+                logger.error("❌ ERROR: el proceso de embeddings no pudo cargar el modelo NLP.")
+
+            self._dispatcher = threading.Thread(target=self._dispatch, name="embedding-worker-dispatch", daemon=True)
+            self._dispatcher.start()
+
+    def _wait_ready(self) -> dict:
+        """Espera el aviso de arranque del trabajador; falla en cuanto el proceso muere."""
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                _, info, _ = self._responses.get(timeout=LIVENESS_POLL_SECONDS)
+                return info
+            except queue.Empty:
+                if not self._process.is_alive():
+                    error = f"El proceso de embeddings terminó al arrancar (código {self._process.exitcode})"
+                elif time.monotonic() >= deadline:
+                    error = "El proceso de embeddings no arrancó a tiempo"
+                else:
+                    continue
+            self.close()
+            raise RuntimeError(error)
+
+    def _dispatch(self):
+        """Hilo que reparte las respuestas del trabajador a los futures pendientes."""
+        while True:
+            try:
+                response = self._responses.get()
+            except (EOFError, OSError):
+                break
+            if response is None:
+                break
+            request_id, result, error = response
+            with self._lock:
+                future = self._pending.pop(request_id, None)
+            # Sin future si ya se descartó (timeout); cancelado si se abandonó la espera asíncrona
+            if future is None or not future.set_running_or_notify_cancel():
+                continue
+            if error:
+                future.set_exception(RuntimeError(error))
+            else:
+                future.set_result(result)
+
+    def submit(self, kind: str, texts: list[str]) -> Future:
+        """Encola textos para el trabajador y devuelve un Future con sus resultados."""
+        self.start()
+        future = Future()
+        future.request_id = request_id = next(self._ids)
+        with self._lock:
+            self._pending[request_id] = future
+        self._requests.put((request_id, kind, list(texts)))
+        return future
+
+    def _discard(self, future: Future):
+        """Quita una petición de las pendientes (ya respondida, caducada o con el trabajador caído)."""
+        with self._lock:
+            self._pending.pop(future.request_id, None)
+
+    def _check_alive(self, future: Future, deadline: float):
+        """Lanza un error si la petición caducó o si el trabajador murió sin responderla."""
+        if future.done():
+            return
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"Sin respuesta del proceso de embeddings en {self.timeout:g}s")
+        if not self.is_alive():
+            raise RuntimeError("El proceso de embeddings terminó inesperadamente")
+
+    def _wait(self, kind: str, texts: list[str]):
+        """Envía una petición y espera su resultado; None si falla, caduca o el trabajador muere."""
+        future = None
+        try:
+            future = self.submit(kind, texts)
+            deadline = time.monotonic() + self.timeout
+            while True:
+                try:
+                    return future.result(timeout=LIVENESS_POLL_SECONDS)
+                except TimeoutError:
+                    self._check_alive(future, deadline)
+        except Exception as e:
+            logger.error("❌ ERROR en el proceso de embeddings: %s", e)
+            return None
+        finally:
+            if future is not None:
+                self._discard(future)
+
+    async def _await(self, kind: str, texts: list[str]):
+        """Variante asíncrona de _wait; propaga los errores."""
+        future = self.submit(kind, texts)
+        wrapped = asyncio.wrap_future(future)
+        deadline = time.monotonic() + self.timeout
+        try:
+            while True:
+                done, _ = await asyncio.wait({wrapped}, timeout=LIVENESS_POLL_SECONDS)
+                if done:
+                    return wrapped.result()
+                self._check_alive(future, deadline)
+        finally:
+            self._discard(future)
+            wrapped.cancel()
+
+    def generate_embeddings(self, texts: list[str]) -> list[list[float]] | None:
+        """Embeddings normalizados para varios textos (ver NLPService.generate_embeddings)."""
+        if not texts:
+            return []
+        return self._wait(KIND_EMBED, texts)
+
+    def generate_embedding(self, text: str) -> list[float] | None:
+        """Embedding normalizado de un texto (ver NLPService.generate_embedding)."""
+        if not text or not isinstance(text, str):
+            logger.warning("El texto de entrada debe ser una cadena no vacía.")
+            return None
+        embeddings = self.generate_embeddings([text])
+        return embeddings[0] if embeddings else None
+
+    def generate_chunk_embeddings(self, text: str) -> list:
+        """Embeddings por fragmentos de un texto (ver NLPService.generate_chunk_embeddings)."""
+        if not text:
+            return []
+        results = self._wait(KIND_CHUNKS, [text])
+        return results[0] if results else []
+
+    async def agenerate_embeddings(self, texts: list[str]) -> list[list[float]]:
+        """Variante asíncrona de generate_embeddings; no bloquea el event loop."""
+        if not texts:
+            return []
+        return await self._await(KIND_EMBED, texts)
+
+    async def agenerate_embedding(self, text: str) -> list[float]:
+        """Variante asíncrona de generate_embedding."""
+        return (await self.agenerate_embeddings([text]))[0]
+
+    def close(self):
+        """Detiene el proceso trabajador y libera los futures pendientes."""
+        if self._process is None:
+            return
+        try:
+            self._requests.put(None)
+            self._process.join(timeout=5)
+            if self._process.is_alive():
+                self._process.terminate()
+            self._responses.put(None)
+        except (OSError, ValueError):
+            pass
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if future.set_running_or_notify_cancel():
+                future.set_exception(RuntimeError("Proceso de embeddings detenido"))
+        self._process = None
+
+
+_worker_client: EmbeddingWorkerClient | None = None
+_nlp_service: NLPService | None = None
+_create_lock = threading.Lock()
+
+
+def create_embedding_service():
+    """
+    Devuelve el servicio de embeddings configurado, compartido por todas las
+    rutas: el cliente del proceso trabajador si NLP_WORKER=1, o un NLPService
+    en el propio proceso (el modelo se carga una sola vez).
+    """
+    global _worker_client, _nlp_service
+    with _create_lock:
+        if not NLP_WORKER:
+            if _nlp_service is None:
+                _nlp_service = NLPService()
+            return _nlp_service
+        if _worker_client is None:
+            _worker_client = EmbeddingWorkerClient()
+            _worker_client.start()
+        return _worker_client
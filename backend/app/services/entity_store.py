@@ -0,0 +1,273 @@
+"""
+Almacén de entidades NER tipadas para el scoring.
+
+Antes, las rutas de recomendaciones reconstruían las entidades de cada
+candidato en cada request a partir de los metadatos aplanados de ChromaDB
+(`', '.join(...)` -> `.split(', ')`, strip, isdigit), con tres copias del mismo
+código y corrompiendo las skills que contienen comas.
+
+Ahora `process_file` guarda las entidades tal cual (listas y números) en la
+tabla `entity_profiles` de metadata.db, y este módulo las mantiene en memoria
+como perfiles de scoring (`TeacherProfile` / `SyllabusProfile`, ver
+profiles.py): se construyen una sola vez por colección y se actualizan en cada
+sincronización, así que el scoring no parsea nada.
+
+Para los sílabos, además, se guarda en `syllabus_requirements` su perfil de
+requisitos (nivel, experiencia requerida, skills normalizadas, temas y pesos),
+de modo que al cargarlos no se vuelven a aplicar heurísticas de texto.
+
+Los documentos sincronizados antes de existir la tabla no tienen perfil: para
+ellos se usa `parse_legacy_entities` sobre los metadatos de ChromaDB, y lo
+mismo con los sílabos sin perfil de requisitos o con uno de una versión
+anterior. La migración se persiste al arrancar la aplicación (`backfill`); en
+los requests sólo se reconstruye el perfil en memoria, sin escribir en SQL.
+"""
+
+from threading import Lock
+from typing import Dict, List, Optional, Union
+
+from .sql_database_service import SQLDatabaseService
+from .profiles import TeacherProfile, SyllabusProfile, build_requirement_profile, REQUIREMENTS_VERSION
+from .skill_embeddings import skill_embedding_index
+from .logging_service import get_logger
+
+logger = get_logger(__name__)
+
+# Campos de entidades por colección: (nombre, tipo)
+ENTITY_FIELDS = {
+    "cvs": (
+        ("technical_skills", list),
+        ("experience_years", int),
+        ("education", list),
+        ("organizations", list),
+        ("certifications", list),
+        ("languages", list),
+    ),
+    "syllabi": (
+        ("required_skills", list),
+        ("tools_required", list),
+        ("course_topics", list),
+        ("methodologies", list),
+        ("prerequisites", list),
+    ),
+}
+
+
+def _to_int(value) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _to_list(value) -> List[str]:
+    if isinstance(value, str):
+        value = [value]
+    return [str(item).strip() for item in value or [] if str(item).strip()]
+
+
+def normalize_entities(collection: str, entities: Dict) -> Dict:
+    """
+    Devuelve las entidades con los tipos esperados por el scoring.
+
+    Las claves conocidas se convierten a listas de cadenas sin vacíos o a
+    enteros; las desconocidas se conservan tal cual.
+    """
+    normalized = dict(entities)
+    for field, field_type in ENTITY_FIELDS.get(collection, ()):
+        if field_type is int:
+            normalized[field] = _to_int(entities.get(field, 0))
+        else:
+            normalized[field] = _to_list(entities.get(field))
+    return normalized
+
+
+def parse_legacy_entities(collection: str, metadata: Dict) -> Dict:
+    """
+    Reconstruye las entidades desde metadatos de ChromaDB en el formato antiguo.
+
+    Acepta tanto `metadata['entities']` (dict) como las claves aplanadas
+    `entities_<campo>` con listas unidas por ', '.
+    """
+    if isinstance(metadata.get("entities"), dict):
+        return normalize_entities(collection, metadata["entities"])
+
+    entities = {}
+    for field, field_type in ENTITY_FIELDS.get(collection, ()):
+        value = metadata.get(f"entities_{field}")
+        if field_type is int:
+            entities[field] = _to_int(value)
+        else:
+            entities[field] = value.split(", ") if isinstance(value, str) and value else []
+    return normalize_entities(collection, entities)
+
+
+def build_profile(collection: str, embedding_id: str, name: str, entities: Dict,
+                  requirements: Optional[Dict] = None, **kwargs):
+    """Perfil de scoring (TeacherProfile o SyllabusProfile) de un documento."""
+    if collection == "cvs":
+        return TeacherProfile(embedding_id, name, entities, **kwargs)
+    return SyllabusProfile(embedding_id, name, entities, requirements=requirements, **kwargs)
+
+
+class EntityStore:
+    """
+    Perfiles de entidades en memoria, respaldados por la tabla entity_profiles.
+    """
+
+    def __init__(self, sql_db_service: Optional[SQLDatabaseService] = None):
+        """
+        Args:
+            sql_db_service: Conexión SQL a usar. Si es None se crea una propia
+                la primera vez que se necesita.
+        """
+        self._sql = sql_db_service
+        self._profiles: Dict[str, Dict[str, Union[TeacherProfile, SyllabusProfile]]] = {}
+        self._lock = Lock()
+        self.legacy_parses = 0
+        self.requirement_rebuilds = 0
+
+    def bind(self, sql_db_service: SQLDatabaseService):
+        """Usa otra conexión SQL y descarta los perfiles cargados."""
+        with self._lock:
+            self._sql = sql_db_service
+            self._profiles.clear()
+        skill_embedding_index.bind(sql_db_service)
+
+    def _sql_service(self) -> SQLDatabaseService:
+        if self._sql is None:
+            self._sql = SQLDatabaseService()
+        return self._sql
+
+    def _collection(self, collection: str) -> Dict:
+        """Perfiles de una colección; se cargan de SQL la primera vez (con el lock tomado)."""
+        profiles = self._profiles.get(collection)
+        if profiles is None:
+            # Pares de skills similares por embedding, antes del primer scoring
+            skill_embedding_index.load()
+            sql = self._sql_service()
+            requirements = sql.get_syllabus_requirements() if collection == "syllabi" else {}
+            profiles = {}
+            for row in sql.get_entity_profiles(collection):
+                row_requirements = requirements.get(row.embedding_id)
+                if collection == "syllabi" and (
+                        row_requirements is None or row_requirements['version'] != REQUIREMENTS_VERSION):
+                    # Sílabo sincronizado antes de guardar requisitos (o con heurísticas
+                    # antiguas): sólo en memoria, backfill() lo persiste
+                    row_requirements = build_requirement_profile(row.entities)
+                    self.requirement_rebuilds += 1
+                profiles[row.embedding_id] = build_profile(
+                    collection, row.embedding_id, row.name, row.entities, row_requirements
+                )
+            self._profiles[collection] = profiles
+            logger.info("Perfiles de entidades cargados para '%s': %d", collection, len(profiles))
+        return profiles
+
+    def put(self, collection: str, embedding_id: str, name: str, entities: Dict, **kwargs):
+        """
+        Guarda las entidades de un documento en SQL y su perfil en memoria.
+
+        Args:
+            **kwargs: Datos del perfil que no se persisten en SQL
+                (`filename`, `embedding`).
+        """
+        normalized = normalize_entities(collection, entities)
+        requirements = build_requirement_profile(normalized) if collection == "syllabi" else None
+        profile = build_profile(collection, embedding_id, name, normalized, requirements, **kwargs)
+        with self._lock:
+            self._sql_service().save_entity_profile(embedding_id, collection, name, normalized)
+            if requirements is not None:
+                self._sql_service().save_syllabus_requirements(embedding_id, requirements)
+            self._collection(collection)[embedding_id] = profile
+        return profile
+
+    def get(self, collection: str, embedding_id: str, metadata: Optional[Dict] = None):
+        """
+        Perfil de un documento.
+
+        Args:
+            collection: 'cvs' o 'syllabi'.
+            embedding_id: ID del documento en ChromaDB.
+            metadata: Metadatos de ChromaDB del documento. Si no hay perfil
+                guardado se reconstruye desde ellos (formato antiguo) sólo en
+                memoria: leer no escribe en SQL (ver backfill).
+
+        Returns:
+            El perfil, o None si no existe y no se pasaron metadatos.
+        """
+        with self._lock:
+            profiles = self._collection(collection)
+            profile = profiles.get(embedding_id)
+            if profile is not None or metadata is None:
+                return profile
+
+            self.legacy_parses += 1
+            entities = parse_legacy_entities(collection, metadata)
+            requirements = build_requirement_profile(entities) if collection == "syllabi" else None
+            profile = profiles[embedding_id] = build_profile(
+                collection, embedding_id, metadata.get("name", "Unknown"), entities, requirements,
+                filename=metadata.get("filename")
+            )
+            return profile
+
+    def backfill(self, db_service) -> Dict[str, int]:
+        """
+        Persiste la migración de los documentos antiguos: entidades de los
+        documentos de ChromaDB sin perfil en SQL y perfiles de requisitos de los
+        sílabos que no lo tienen o lo tienen de una versión anterior.
+
+        Se llama al arrancar la aplicación, no en los requests.
+
+        Args:
+            db_service: DatabaseService de donde leer los metadatos de ChromaDB.
+
+        Returns:
+            Documentos migrados por tipo: {'profiles': n, 'requirements': m}.
+        """
+        counts = {"profiles": 0, "requirements": 0}
+        with self._lock:
+            sql = self._sql_service()
+            for collection in ("cvs", "syllabi"):
+                chroma = db_service.cv_collection if collection == "cvs" else db_service.syllabus_collection
+                if chroma is None:
+                    continue
+                saved = {row.embedding_id for row in sql.get_entity_profiles(collection)}
+                missing = [doc_id for doc_id in chroma.get(include=[])['ids'] if doc_id not in saved]
+                if missing:
+                    data = chroma.get(ids=missing, include=["metadatas"])
+                    for doc_id, metadata in zip(data['ids'], data['metadatas']):
+                        sql.save_entity_profile(doc_id, collection, metadata.get("name", "Unknown"),
+                                                parse_legacy_entities(collection, metadata))
+                        counts["profiles"] += 1
+
+            requirements = sql.get_syllabus_requirements()
+            for row in sql.get_entity_profiles("syllabi"):
+                current = requirements.get(row.embedding_id)
+                if current is None or current['version'] != REQUIREMENTS_VERSION:
+                    sql.save_syllabus_requirements(row.embedding_id, build_requirement_profile(row.entities))
+                    counts["requirements"] += 1
+
+            if counts["profiles"] or counts["requirements"]:
+                # Se recargan de SQL en el siguiente acceso
+                self._profiles.clear()
+        if counts["profiles"] or counts["requirements"]:
+            logger.info("Migración de entidades: %d perfiles y %d perfiles de requisitos guardados",
+                        counts["profiles"], counts["requirements"])
+        return counts
+
+    def clear(self):
+        """Descarta los perfiles en memoria (se recargan de SQL en el siguiente acceso)."""
+        with self._lock:
+            self._profiles.clear()
+
+    def get_statistics(self) -> Dict:
+        with self._lock:
+            return {
+                "profiles": {collection: len(profiles) for collection, profiles in self._profiles.items()},
+                "legacy_parses": self.legacy_parses,
+                "requirement_rebuilds": self.requirement_rebuilds,
+            }
+
+
+# Instancia compartida entre sync (que escribe) y las rutas de recomendaciones (que leen)
+entity_store = EntityStore()
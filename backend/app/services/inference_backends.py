@@ -0,0 +1,170 @@
+"""
+Backends de inferencia para NLPService.
+
+- 'torch': SentenceTransformer sobre PyTorch (comportamiento original).
+- 'onnx':  el mismo modelo exportado a ONNX (opcionalmente cuantizado a int8
+           dinámico) y ejecutado con ONNX Runtime en CPU. Requiere las
+           dependencias opcionales de requirements-onnx.txt.
+
+Ambos backends exponen la parte de la interfaz de SentenceTransformer que usa
+NLPService (`encode`, `tokenizer`, `max_seq_length`), de modo que el servicio
+no necesita saber cuál está activo.
+"""
+
+from typing import List, Union
+import os
+
+import numpy as np
+
+from .logging_service import get_logger
+
+logger = get_logger(__name__)
+
+# Selección del backend por configuración
+NLP_BACKEND = os.getenv("NLP_BACKEND", "torch").lower()
+NLP_ONNX_QUANTIZE = os.getenv("NLP_ONNX_QUANTIZE", "0") == "1"
+# Hilos intra-op (0 = valor por defecto de la librería)
+NLP_INTRA_OP_THREADS = int(os.getenv("NLP_INTRA_OP_THREADS", "0"))
+NLP_ONNX_DIR = os.getenv("NLP_ONNX_DIR") or os.path.join(os.path.dirname(__file__), '..', '..', 'onnx_models')
+
+
+class OnnxSentenceEncoder:
+    """
+    Codificador de oraciones sobre ONNX Runtime con mean pooling, equivalente
+    a SentenceTransformer para modelos Transformer + Pooling('mean').
+    """
+
+    def __init__(self, model_name: str, cache_dir: str = NLP_ONNX_DIR, quantize: bool = NLP_ONNX_QUANTIZE,
+                 intra_op_threads: int = NLP_INTRA_OP_THREADS):
+        """
+        Args:
+            model_name: Nombre o ruta del modelo de sentence-transformers.
+            cache_dir: Carpeta donde se guardan el modelo exportado y el tokenizador.
+            quantize: Aplicar cuantización dinámica int8 a los pesos.
+            intra_op_threads: Hilos de ONNX Runtime por operación (0 = automático).
+        """
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        self.model_dir = os.path.join(cache_dir, model_name.replace('/', '__'))
+        fp32_path = os.path.join(self.model_dir, "model.onnx")
+        int8_path = os.path.join(self.model_dir, "model.int8.onnx")
+
+        if not os.path.exists(fp32_path):
+            self._export(model_name, fp32_path)
+        model_path = fp32_path
+        if quantize:
+            if not os.path.exists(int8_path):
+                from onnxruntime.quantization import quantize_dynamic, QuantType
+                quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+            model_path = int8_path
+
+        options = ort.SessionOptions()
+        if intra_op_threads > 0:
+            options.intra_op_num_threads = intra_op_threads
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self._input_names = {i.name for i in self.session.get_inputs()}
+
+        self.tokenizer = AutoTokenizer.from_pretrained(self.model_dir)
+        with open(os.path.join(self.model_dir, "max_seq_length.txt")) as f:
+            self.max_seq_length = int(f.read().strip())
+        self.quantized = quantize
+
+    def _export(self, model_name: str, onnx_path: str):
+        """Exporta el Transformer de un SentenceTransformer a ONNX (una sola vez)."""
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        logger.info("Exportando modelo '%s' a ONNX en %s...", model_name, onnx_path)
+        st_model = SentenceTransformer(model_name, device="cpu")
+        transformer = st_model[0].auto_model.eval()
+        os.makedirs(os.path.dirname(onnx_path), exist_ok=True)
+
+        sample = st_model.tokenizer(["texto de ejemplo"], return_tensors="pt")
+        input_names = ["input_ids", "attention_mask"]
+        if "token_type_ids" in sample:
+            input_names.append("token_type_ids")
+        dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+        dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+        class _LastHiddenState(torch.nn.Module):
+            """Envuelve el Transformer para pasar las entradas por nombre y devolver sólo el tensor."""
+
+            def __init__(self, model):
+                super().__init__()
+                self.model = model
+
+            def forward(self, *inputs):
+                return self.model(**dict(zip(input_names, inputs))).last_hidden_state
+
+        with torch.no_grad():
+            torch.onnx.export(
+                _LastHiddenState(transformer),
+                tuple(sample[name] for name in input_names),
+                onnx_path,
+                input_names=input_names,
+                output_names=["last_hidden_state"],
+                dynamic_axes=dynamic_axes,
+                opset_version=17,
+                dynamo=False,
+            )
+        st_model.tokenizer.save_pretrained(os.path.dirname(onnx_path))
+        with open(os.path.join(os.path.dirname(onnx_path), "max_seq_length.txt"), "w") as f:
+            f.write(str(st_model.max_seq_length))
+        logger.info("✅ Modelo exportado a ONNX.")
+
+    def encode(self, sentences: Union[str, List[str]], batch_size: int = 32, convert_to_numpy: bool = True,
+               convert_to_tensor: bool = False, normalize_embeddings: bool = False, **kwargs) -> np.ndarray:
+        """
+        Genera embeddings con la misma semántica que SentenceTransformer.encode.
+
+        Returns:
+            Vector (dim,) si `sentences` es un string, o matriz (n, dim) float32.
+        """
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+
+        # Ordenar por longitud reduce el padding dentro de cada lote
+        order = np.argsort([-len(t) for t in texts], kind='stable')
+        embeddings = np.empty((len(texts), 0), dtype=np.float32)
+        outputs = []
+        for start in range(0, len(texts), batch_size):
+            batch = [texts[i] for i in order[start:start + batch_size]]
+            encoded = self.tokenizer(batch, padding=True, truncation=True,
+                                     max_length=self.max_seq_length, return_tensors="np")
+            feeds = {name: encoded[name].astype(np.int64) for name in self._input_names if name in encoded}
+            hidden = self.session.run(["last_hidden_state"], feeds)[0]
+
+            mask = encoded["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            outputs.append(pooled.astype(np.float32))
+
+        if outputs:
+            embeddings = np.empty((len(texts), outputs[0].shape[1]), dtype=np.float32)
+            embeddings[order] = np.vstack(outputs)
+
+        if normalize_embeddings and len(embeddings):
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            embeddings = embeddings / norms
+
+        return embeddings[0] if single else embeddings
+
+
+def load_encoder(model_name: str, backend: str = NLP_BACKEND):
+    """
+    Carga el codificador del backend configurado.
+
+    Args:
+        model_name: Nombre del modelo de sentence-transformers.
+        backend: 'torch' u 'onnx'.
+    """
+    if backend == "onnx":
+        return OnnxSentenceEncoder(model_name)
+
+    from sentence_transformers import SentenceTransformer
+    if NLP_INTRA_OP_THREADS > 0:
+        import torch
+        torch.set_num_threads(NLP_INTRA_OP_THREADS)
+    return SentenceTransformer(model_name)
@@ -0,0 +1,87 @@
+"""
+Logging con niveles para la aplicación.
+
+Sustituye a los `print` de depuración de las rutas críticas. Reglas:
+
+- Los módulos obtienen su logger con `get_logger(__name__)` y usan formato
+  perezoso (`logger.debug("... %s", valor)`): el mensaje sólo se construye si
+  el registro se va a emitir.
+- El nivel global se configura con LOG_LEVEL (INFO por defecto).
+- Un request puede activar la depuración sólo para sí mismo (cabecera
+  `X-Debug: 1` o parámetro `?debug=1`, junto con `X-Admin-Token`; ver el
+  middleware en main.py); los mensajes DEBUG de ese request se emiten aunque
+  el nivel global sea INFO. Sin ADMIN_TOKEN configurado no está disponible.
+- Los cálculos que sólo sirven para diagnosticar (normas, estadísticas con
+  NumPy, ...) deben ir dentro de `if debug_enabled():` para no pagarlos en
+  producción.
+"""
+
+from contextvars import ContextVar
+import logging
+import os
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "%(asctime)s %(levelname)s [%(name)s] %(message)s")
+
+_ROOT_LOGGER = "app"
+
+# Depuración activada para el request en curso (se propaga a hilos y tareas del request)
+_request_debug: ContextVar[bool] = ContextVar("request_debug", default=False)
+
+
+class _RequestDebugFilter(logging.Filter):
+    """Deja pasar DEBUG sólo si el nivel global lo permite o el request lo pidió."""
+
+    def __init__(self, level: int):
+        super().__init__()
+        self.level = level
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= self.level or _request_debug.get()
+
+
+_configured_level = logging.getLevelNamesMapping().get(LOG_LEVEL, logging.INFO)
+_root = logging.getLogger(_ROOT_LOGGER)
+if not _root.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    # El logger acepta DEBUG y el filtro del handler decide: así un request
+    # puede depurarse sin bajar el nivel global
+    _handler.addFilter(_RequestDebugFilter(_configured_level))
+    _root.addHandler(_handler)
+    _root.setLevel(logging.DEBUG)
+    _root.propagate = False
+
+
+class _FilteredLogger(logging.LoggerAdapter):
+    """Logger que descarta los mensajes filtrados antes de crear el registro."""
+
+    def isEnabledFor(self, level: int) -> bool:
+        return level >= _configured_level or _request_debug.get()
+
+
+def get_logger(name: str) -> logging.LoggerAdapter:
+    """
+    Devuelve el logger de un módulo bajo la jerarquía 'app'.
+
+    Args:
+        name: Normalmente `__name__` del módulo.
+    """
+    if not name.startswith(_ROOT_LOGGER):
+        name = f"{_ROOT_LOGGER}.{name}"
+    return _FilteredLogger(logging.getLogger(name), {})
+
+
+def debug_enabled() -> bool:
+    """True si hay que emitir (y calcular) información de depuración en este contexto."""
+    return _configured_level <= logging.DEBUG or _request_debug.get()
+
+
+def set_request_debug(enabled: bool):
+    """Activa la depuración para el request en curso. Devuelve el token para restaurarla."""
+    return _request_debug.set(enabled)
+
+
+def reset_request_debug(token):
+    """Restaura el estado de depuración anterior (ver set_request_debug)."""
+    _request_debug.reset(token)
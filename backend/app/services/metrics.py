@@ -0,0 +1,300 @@
+"""
+Instrumentación ligera: contadores, histogramas y gauges con exposición en el
+formato de texto de Prometheus (endpoint /metrics).
+
+Uso típico:
+
+    with INGEST_STAGE_SECONDS.time(collection="cvs", stage="embed"):
+        embedding = nlp_service.generate_embedding(text)
+    DOCUMENTS_PROCESSED.inc(collection="cvs")
+
+Con METRICS_ENABLED=0 todas las métricas son objetos no-op: `time()` devuelve
+un context manager compartido que no mide nada, así que el coste en las rutas
+críticas es una llamada a método vacía.
+"""
+
+from contextlib import contextmanager, nullcontext
+from threading import Lock
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import bisect
+import math
+import os
+import time
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    """Base de las métricas: nombre, ayuda, etiquetas y valores por combinación de etiquetas."""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple, object] = {}
+        self._lock = Lock()
+
+    def _key(self, labels: Dict) -> Tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"Etiquetas de '{self.name}': se esperaban {self.labelnames}, se recibieron {tuple(labels)}")
+        return tuple(labels[name] for name in self.labelnames)
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+
+
+class Counter(_Metric):
+    """Valor que sólo crece (documentos procesados, errores, ...)."""
+
+    type_name = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return self._header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items
+        ]
+
+
+class Gauge(_Metric):
+    """Valor que sube y baja (tamaño de colecciones, entradas en caché, ...)."""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._callback: Optional[Callable[[], Dict[Tuple, float]]] = None
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def set_function(self, callback: Callable[[], Dict[Tuple, float]]):
+        """
+        Calcula los valores en el momento del scrape.
+
+        Args:
+            callback: Devuelve {tupla de valores de etiquetas: valor}.
+        """
+        self._callback = callback
+
+    def render(self) -> List[str]:
+        if self._callback is not None:
+            values = self._callback()
+            with self._lock:
+                self._values = dict(values)
+        with self._lock:
+            items = list(self._values.items())
+        return self._header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items
+        ]
+
+
+class _Timer:
+    """Context manager que observa la duración del bloque en un histograma."""
+
+    __slots__ = ("_histogram", "_labels", "_start")
+
+    def __init__(self, histogram: "Histogram", labels: Dict):
+        self._histogram = histogram
+        self._labels = labels
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._histogram.observe(time.perf_counter() - self._start, **self._labels)
+        return False
+
+
+class StageTimings:
+    """
+    Duración acumulada de las etapas de un request, para observar cada etapa una
+    sola vez aunque se mida en varios bloques (p. ej. dentro de un bucle).
+
+        timings = StageTimings(RECOMMENDATION_STAGE_SECONDS, endpoint="hybrid")
+        try:
+            for candidate in candidates:
+                with timings.time("vector_search"):
+                    ...
+        finally:
+            timings.observe()
+    """
+
+    def __init__(self, histogram: "Histogram", **labels):
+        self._histogram = histogram
+        self._labels = labels
+        self.seconds: Dict[str, float] = {}
+
+    @contextmanager
+    def time(self, stage: str):
+        """Suma la duración del bloque `with` a la etapa `stage`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[stage] = self.seconds.get(stage, 0.0) + time.perf_counter() - start
+
+    def observe(self):
+        """Observa en el histograma el total de cada etapa medida y reinicia los totales."""
+        for stage, seconds in self.seconds.items():
+            self._histogram.observe(seconds, stage=stage, **self._labels)
+        self.seconds = {}
+
+
+class Histogram(_Metric):
+    """Distribución de duraciones (segundos) en buckets acumulativos."""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [conteos por bucket (no acumulados) + desbordamiento, suma]
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def time(self, **labels) -> _Timer:
+        """Mide la duración de un bloque `with`."""
+        return _Timer(self, labels)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(counts), total) for key, (counts, total) in self._values.items()]
+        lines = self._header()
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class _NoopMetric:
+    """Métrica desactivada: acepta todas las operaciones sin hacer nada."""
+
+    def inc(self, amount: float = 1.0, **labels):
+        pass
+
+    def set(self, value: float, **labels):
+        pass
+
+    def set_function(self, callback):
+        pass
+
+    def observe(self, value: float, **labels):
+        pass
+
+    def time(self, **labels):
+        return _NOOP_TIMER
+
+    def render(self) -> List[str]:
+        return []
+
+
+_NOOP_TIMER = nullcontext()
+_NOOP_METRIC = _NoopMetric()
+
+
+class MetricsRegistry:
+    """Registro de métricas de la aplicación."""
+
+    def __init__(self, enabled: bool = METRICS_ENABLED):
+        self.enabled = enabled
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = Lock()
+
+    def _register(self, metric_class, name: str, *args, **kwargs):
+        if not self.enabled:
+            return _NOOP_METRIC
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = metric_class(name, *args, **kwargs)
+            return self._metrics[name]
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, documentation, labelnames, buckets)
+
+    def render(self) -> str:
+        """Todas las métricas en el formato de texto de Prometheus (versión 0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Registro compartido por toda la aplicación
+registry = MetricsRegistry()
+
+# --- Ingesta (process_file) ---
+INGEST_STAGE_SECONDS = registry.histogram(
+    "ingest_stage_seconds", "Duración de cada etapa de process_file",
+    ("collection", "stage"))
+DOCUMENTS_PROCESSED = registry.counter(
+    "documents_processed_total", "Documentos procesados correctamente",
+    ("collection",))
+DOCUMENTS_FAILED = registry.counter(
+    "documents_failed_total", "Documentos descartados durante el procesamiento",
+    ("collection", "reason"))
+
+# --- Recomendaciones ---
+RECOMMENDATION_STAGE_SECONDS = registry.histogram(
+    "recommendation_stage_seconds", "Duración de cada etapa de los endpoints de recomendaciones",
+    ("endpoint", "stage"))
+RECOMMENDATION_REQUESTS = registry.counter(
+    "recommendation_requests_total", "Requests de recomendaciones por endpoint y resultado de la caché",
+    ("endpoint", "cache"))
+
+# --- Tamaño de los datos ---
+COLLECTION_DOCUMENTS = registry.gauge(
+    "vector_collection_documents", "Documentos en cada colección de ChromaDB",
+    ("collection",))
@@ -1,4 +1,17 @@
-from sentence_transformers import SentenceTransformer
+import numpy as np
+import os
+
+from .inference_backends import load_encoder, NLP_BACKEND
+from .logging_service import get_logger, debug_enabled
+
+logger = get_logger(__name__)
+
+# Embeddings por fragmentos: el modelo trunca la entrada a max_seq_length tokens,
+# así que los documentos largos se dividen en ventanas solapadas de tokens.
+EMBEDDING_CHUNKING = os.getenv("EMBEDDING_CHUNKING", "0") == "1"
+CHUNK_WINDOW_TOKENS = int(os.getenv("CHUNK_WINDOW_TOKENS", "0"))  # 0 = max_seq_length del modelo
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "32"))
+CHUNK_BATCH_SIZE = int(os.getenv("CHUNK_BATCH_SIZE", "32"))
 
 class NLPService:
     """
@@ -9,15 +22,17 @@ class NLPService:
         """
         Inicializa el servicio y carga el modelo de Sentence Transformers.
         El modelo se descarga la primera vez y luego se carga desde el caché.
+        El backend de inferencia (PyTorch u ONNX Runtime) se elige con NLP_BACKEND.
         """
         # Modelo multilingüe, bueno para empezar y balanceado en rendimiento/calidad.
         self.model_name = 'paraphrase-multilingual-MiniLM-L12-v2'
+        self.backend = NLP_BACKEND
         try:
-            print(f"Cargando modelo NLP '{self.model_name}'...")
-            self.model = SentenceTransformer(self.model_name)
-            print("✅ Modelo NLP cargado exitosamente.")
+            logger.info("Cargando modelo NLP '%s' (backend: %s)...", self.model_name, self.backend)
+            self.model = load_encoder(self.model_name, self.backend)
+            logger.info("✅ Modelo NLP cargado exitosamente.")
         except Exception as e:
-            print(f"❌ ERROR al cargar el modelo NLP: {e}")
+            logger.error("❌ ERROR al cargar el modelo NLP: %s", e)
             self.model = None
 
     def generate_embedding(self, text: str) -> list[float] | None:
@@ -31,11 +46,11 @@ class NLPService:
             Una lista de floats representando el embedding, o None si hay un error.
         """
         if not self.model:
-            print("Modelo NLP no cargado. No se puede generar embedding.")
+            logger.warning("Modelo NLP no cargado. No se puede generar embedding.")
             return None
         
         if not text or not isinstance(text, str):
-            print("El texto de entrada debe ser una cadena no vacía.")
+            logger.warning("El texto de entrada debe ser una cadena no vacía.")
             return None
 
         try:
@@ -44,8 +59,7 @@ class NLPService:
             embedding = self.model.encode(text, convert_to_tensor=False)
             
             # NORMALIZAR el embedding para que tenga norma 1.0
-            # Esto es crucial para que las distancias euclidianas en ChromaDB sean correctas
-            import numpy as np
+            # Así el producto punto coincide con la similitud coseno usada en ChromaDB
             embedding_array = np.array(embedding)
             norm = np.linalg.norm(embedding_array)
             
@@ -57,23 +71,140 @@ class NLPService:
             # Convertir de vuelta a lista
             embedding_list = normalized_embedding.tolist()
             
-            # DEBUG: Verificar propiedades del embedding
-            new_norm = np.linalg.norm(normalized_embedding)
-            mean_val = np.mean(normalized_embedding)
-            std_val = np.std(normalized_embedding)
-            
-            print(f"🔍 DEBUG Embedding - Text length: {len(text)} chars")
-            print(f"   Embedding dim: {len(embedding_list)}")
-            print(f"   Original norm: {norm:.3f}")
-            print(f"   Normalized norm: {new_norm:.3f} (should be ≈1.0)")
-            print(f"   Mean: {mean_val:.6f}")
-            print(f"   Std: {std_val:.6f}")
-            print(f"   Range: [{min(embedding_list):.6f}, {max(embedding_list):.6f}]")
+            # DEBUG: Verificar propiedades del embedding (sólo si la depuración está activa)
+            if debug_enabled():
+                logger.debug(
+                    "🔍 Embedding - texto: %d chars, dim: %d, norma original: %.3f, "
+                    "norma normalizada: %.3f, media: %.6f, std: %.6f, rango: [%.6f, %.6f]",
+                    len(text), len(embedding_list), norm, np.linalg.norm(normalized_embedding),
+                    np.mean(normalized_embedding), np.std(normalized_embedding),
+                    normalized_embedding.min(), normalized_embedding.max()
+                )
             
             return embedding_list
         except Exception as e:
-            print(f"❌ ERROR al generar el embedding: {e}")
+            logger.error("❌ ERROR al generar el embedding: %s", e)
+            return None
+
+    def generate_embeddings(self, texts: list[str]) -> list[list[float]] | None:
+        """
+        Genera embeddings normalizados para varios textos con una sola llamada a `encode`.
+
+        Args:
+            texts: Lista de textos no vacíos.
+
+        Returns:
+            Una lista de embeddings (uno por texto, en el mismo orden), o None si hay un error.
+        """
+        if not self.model:
+            logger.warning("Modelo NLP no cargado. No se puede generar embedding.")
+            return None
+
+        if not texts:
+            return []
+
+        try:
+            embeddings = self.model.encode(
+                texts,
+                batch_size=CHUNK_BATCH_SIZE,
+                convert_to_numpy=True,
+                normalize_embeddings=True
+            )
+            return embeddings.astype(np.float32).tolist()
+        except Exception as e:
+            logger.error("❌ ERROR al generar los embeddings: %s", e)
+            return None
+
+    def _split_into_windows(self, text: str, window: int, overlap: int) -> list[str]:
+        """
+        Divide un texto en ventanas solapadas de `window` tokens del tokenizador del modelo.
+        """
+        tokenizer = self.model.tokenizer
+        token_ids = tokenizer(text, add_special_tokens=False, verbose=False)['input_ids']
+        if len(token_ids) <= window:
+            return [text]
+
+        step = max(1, window - overlap)
+        chunks = []
+        for start in range(0, len(token_ids), step):
+            chunks.append(tokenizer.decode(token_ids[start:start + window]))
+            if start + window >= len(token_ids):
+                break
+        return chunks
+
+    def generate_chunk_embeddings_batch(self, texts: list[str], window_tokens: int = None,
+                                        overlap_tokens: int = None) -> list[np.ndarray] | None:
+        """
+        Genera embeddings por fragmentos para varios documentos con un solo `encode`.
+
+        Args:
+            texts: Textos completos de los documentos.
+            window_tokens: Tokens por ventana (por defecto max_seq_length del modelo menos los especiales).
+            overlap_tokens: Tokens compartidos entre ventanas consecutivas.
+
+        Returns:
+            Una matriz float32 normalizada (n_fragmentos, dim) por documento, o None si hay un error.
+        """
+        if not self.model:
+            logger.warning("Modelo NLP no cargado. No se puede generar embedding.")
+            return None
+
+        window = window_tokens or CHUNK_WINDOW_TOKENS or (self.model.max_seq_length - 2)
+        overlap = CHUNK_OVERLAP_TOKENS if overlap_tokens is None else overlap_tokens
+
+        try:
+            all_chunks, boundaries = [], []
+            for text in texts:
+                chunks = self._split_into_windows(text, window, overlap) if text else []
+                boundaries.append((len(all_chunks), len(all_chunks) + len(chunks)))
+                all_chunks.extend(chunks)
+
+            if not all_chunks:
+                return [np.empty((0, 0), dtype=np.float32) for _ in texts]
+
+            embeddings = self.model.encode(
+                all_chunks,
+                batch_size=CHUNK_BATCH_SIZE,
+                convert_to_numpy=True,
+                normalize_embeddings=True
+            ).astype(np.float32)
+            return [embeddings[start:end] for start, end in boundaries]
+        except Exception as e:
+            logger.error("❌ ERROR al generar embeddings por fragmentos: %s", e)
+            return None
+
+    def generate_chunk_embeddings(self, text: str) -> np.ndarray | None:
+        """
+        Genera los embeddings de los fragmentos solapados de un único documento.
+
+        Returns:
+            Matriz float32 normalizada (n_fragmentos, dim), o None si hay un error.
+        """
+        if not text or not isinstance(text, str):
+            logger.warning("El texto de entrada debe ser una cadena no vacía.")
             return None
+        results = self.generate_chunk_embeddings_batch([text])
+        return results[0] if results else None
+
+    @staticmethod
+    def pool_embeddings(chunk_embeddings: np.ndarray, mode: str = "mean") -> list[float] | None:
+        """
+        Combina los embeddings de los fragmentos en un único vector normalizado.
+
+        Args:
+            chunk_embeddings: Matriz (n_fragmentos, dim).
+            mode: 'mean' (promedio) o 'max' (máximo por dimensión).
+        """
+        if chunk_embeddings is None or len(chunk_embeddings) == 0:
+            return None
+        if mode == "max":
+            pooled = chunk_embeddings.max(axis=0)
+        else:
+            pooled = chunk_embeddings.mean(axis=0)
+        norm = np.linalg.norm(pooled)
+        if norm > 0:
+            pooled = pooled / norm
+        return pooled.tolist()
 
 # --- Ejemplo de uso (para pruebas) ---
 if __name__ == '__main__':
@@ -0,0 +1,290 @@
+"""
+Perfiles compactos de docentes y sílabos para el scoring.
+
+`AdvancedMatchingService` recibía dicts de entidades y, por cada candidato,
+pasaba las skills a minúsculas, construía sets y comparaba subcadenas. Aquí ese
+trabajo se hace una sola vez, al sincronizar o al cargar el EntityStore:
+
+- Cada skill normalizada se interna en `skill_vocabulary` y se representa con
+  un id entero; un perfil guarda un frozenset de ids.
+- Las coincidencias parciales (una skill contenida en otra, o similar por
+  embedding) se precalculan por skill requerida como un frozenset de ids
+  relacionados, así que comprobar si un docente tiene una coincidencia parcial
+  es `isdisjoint` entre sets.
+- Los valores derivados se calculan una sola vez: la formación universitaria
+  del docente al construir su perfil, y los requisitos del sílabo (nivel,
+  experiencia requerida, skills normalizadas) al sincronizarlo
+  (build_requirement_profile, guardado en syllabus_requirements).
+
+Las clases usan `__slots__` para no pagar un `__dict__` por docente.
+"""
+
+from threading import Lock
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+import sys
+
+import numpy as np
+
+# Palabras clave que indican nivel avanzado / intermedio (ver LEVEL_EXPERIENCE)
+ADVANCED_KEYWORDS = (
+    'avanzado', 'advanced', 'senior', 'expert', 'arquitectura', 'architecture',
+    'microservices', 'machine learning', 'deep learning', 'devops', 'cloud'
+)
+INTERMEDIATE_KEYWORDS = (
+    'intermedio', 'intermediate', 'desarrollo', 'development', 'frameworks',
+    'apis', 'databases', 'web development'
+)
+UNIVERSITY_KEYWORDS = ('universidad', 'university', 'institute')
+
+
+def normalize_skill(skill: str) -> str:
+    return skill.lower().strip()
+
+
+class SkillVocabulary:
+    """
+    Skills normalizadas internadas como ids enteros.
+
+    `related_ids(id)` devuelve los ids de las skills relacionadas con una skill
+    (incluida ella misma):
+
+    - las que la contienen o están contenidas en ella (subcadena), calculadas
+      al pedirlas y extendidas sólo con las skills añadidas desde el último
+      cálculo;
+    - las similares por embedding, que registra SkillEmbeddingIndex con
+      `add_similar` (ver skill_embeddings.py).
+    """
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._substring: Dict[int, Tuple[FrozenSet[int], int]] = {}
+        self._similar: Dict[int, Set[int]] = {}
+        self._similar_version = 0
+        self._related: Dict[int, Tuple[FrozenSet[int], Tuple[int, int]]] = {}
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def skill_id(self, skill: str) -> int:
+        """Id de una skill (se normaliza y se añade al vocabulario si es nueva)."""
+        name = normalize_skill(skill)
+        skill_id = self._ids.get(name)
+        if skill_id is None:
+            with self._lock:
+                skill_id = self._ids.get(name)
+                if skill_id is None:
+                    skill_id = len(self._names)
+                    self._names.append(sys.intern(name))
+                    self._ids[self._names[skill_id]] = skill_id
+        return skill_id
+
+    def ids(self, skills: Iterable[str]) -> Tuple[int, ...]:
+        """Ids de una lista de skills, en el mismo orden, descartando las vacías."""
+        return tuple(self.skill_id(skill) for skill in skills if skill and skill.strip())
+
+    def name(self, skill_id: int) -> str:
+        return self._names[skill_id]
+
+    def add_similar(self, pairs: Iterable[Tuple[int, int]]):
+        """Registra pares de skills similares por embedding (relación simétrica)."""
+        with self._lock:
+            for a, b in pairs:
+                self._similar.setdefault(a, set()).add(b)
+                self._similar.setdefault(b, set()).add(a)
+            self._similar_version += 1
+
+    def clear_similar(self):
+        with self._lock:
+            self._similar.clear()
+            self._similar_version += 1
+
+    def related_ids(self, skill_id: int) -> FrozenSet[int]:
+        """Ids de las skills relacionadas por subcadena (en cualquier sentido) o por embedding."""
+        key = (len(self._names), self._similar_version)
+        cached = self._related.get(skill_id)
+        if cached is not None and cached[1] == key:
+            return cached[0]
+        result = self._substring_related(skill_id)
+        similar = self._similar.get(skill_id)
+        if similar:
+            result = result | similar
+        self._related[skill_id] = (result, key)
+        return result
+
+    def _substring_related(self, skill_id: int) -> FrozenSet[int]:
+        cached = self._substring.get(skill_id)
+        size = len(self._names)
+        if cached is not None and cached[1] == size:
+            return cached[0]
+        name = self._names[skill_id]
+        related, start = (set(cached[0]), cached[1]) if cached is not None else (set(), 0)
+        for other_id in range(start, size):
+            other = self._names[other_id]
+            if name in other or other in name:
+                related.add(other_id)
+        result = frozenset(related)
+        self._substring[skill_id] = (result, size)
+        return result
+
+
+# Vocabulario compartido por todos los perfiles del proceso
+skill_vocabulary = SkillVocabulary()
+
+
+def _unit_vector(embedding) -> Optional[np.ndarray]:
+    if embedding is None:
+        return None
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+
+class TeacherProfile:
+    """Docente listo para el scoring."""
+
+    __slots__ = ("embedding_id", "name", "filename", "skills", "skill_ids",
+                 "experience_years", "has_education", "has_university", "embedding")
+
+    def __init__(self, embedding_id: str, name: str, entities: Dict,
+                 filename: Optional[str] = None, embedding=None):
+        """
+        Args:
+            embedding_id: ID del CV en ChromaDB.
+            name: Nombre del docente.
+            entities: Entidades NER normalizadas (ver entity_store.normalize_entities).
+            filename: Nombre del archivo del CV, si se conoce.
+            embedding: Embedding del CV, si se conoce (se guarda normalizado).
+        """
+        skill_ids = skill_vocabulary.ids(entities.get('technical_skills', []))
+        education = entities.get('education', [])
+        self.embedding_id = embedding_id
+        self.name = name
+        self.filename = filename
+        self.skills = tuple(skill_vocabulary.name(skill_id) for skill_id in skill_ids)
+        self.skill_ids = frozenset(skill_ids)
+        self.experience_years = int(entities.get('experience_years', 0) or 0)
+        self.has_education = bool(education)
+        self.has_university = any(
+            keyword in edu.lower() for edu in education for keyword in UNIVERSITY_KEYWORDS
+        )
+        self.embedding = _unit_vector(embedding)
+
+    @classmethod
+    def from_entities(cls, entities: Dict) -> "TeacherProfile":
+        """Perfil efímero a partir de un dict de entidades (API antigua del matching)."""
+        return cls(entities.get('embedding_id', ''), entities.get('name', 'Unknown'), entities)
+
+    def set_embedding(self, embedding):
+        self.embedding = _unit_vector(embedding)
+
+    def __repr__(self):
+        return (f"TeacherProfile(name={self.name!r}, skills={list(self.skills)}, "
+                f"experience_years={self.experience_years})")
+
+
+# Versión de build_requirement_profile: incrementarla cuando cambien las
+# heurísticas para que los perfiles guardados se recalculen al cargarlos
+REQUIREMENTS_VERSION = 1
+
+# Nivel del curso -> años de experiencia requeridos
+LEVEL_EXPERIENCE = {'advanced': 5, 'intermediate': 3, 'basic': 1}
+
+
+def infer_course_level(required_skills: Iterable[str], course_topics: Iterable[str]) -> str:
+    """Nivel del curso ('advanced', 'intermediate' o 'basic') según sus skills y temas."""
+    all_text = ' '.join(list(required_skills) + list(course_topics)).lower()
+    if any(keyword in all_text for keyword in ADVANCED_KEYWORDS):
+        return 'advanced'
+    elif any(keyword in all_text for keyword in INTERMEDIATE_KEYWORDS):
+        return 'intermediate'
+    return 'basic'
+
+
+def build_requirement_profile(entities: Dict) -> Dict:
+    """
+    Perfil de requisitos de un sílabo a partir de sus entidades NER.
+
+    Sólo depende del sílabo: se calcula al sincronizarlo y se guarda en la
+    tabla syllabus_requirements, así el request no vuelve a aplicar las
+    heurísticas de texto.
+
+    Returns:
+        Dict con 'version', 'level', 'required_experience', 'required_skills'
+        (normalizadas, en orden y con repetidos), 'course_topics' y
+        'skill_weights' (peso de cada skill en la compatibilidad de
+        habilidades: sus apariciones entre el total de requeridas).
+    """
+    required_skills = [
+        normalize_skill(skill) for skill in entities.get('required_skills', []) if skill and skill.strip()
+    ]
+    course_topics = list(entities.get('course_topics', []))
+    level = infer_course_level(required_skills, course_topics)
+    skill_weights = {}
+    for skill in required_skills:
+        skill_weights[skill] = skill_weights.get(skill, 0) + 1 / len(required_skills)
+    return {
+        'version': REQUIREMENTS_VERSION,
+        'level': level,
+        'required_experience': LEVEL_EXPERIENCE[level],
+        'required_skills': required_skills,
+        'course_topics': course_topics,
+        'skill_weights': skill_weights,
+    }
+
+
+class SyllabusProfile:
+    """Sílabo listo para el scoring."""
+
+    __slots__ = ("embedding_id", "name", "filename", "level", "required_skills", "required_skill_ids",
+                 "required_skill_set", "skill_weight_ids", "skill_weights", "course_topics",
+                 "required_experience", "embedding")
+
+    def __init__(self, embedding_id: str, name: str, entities: Optional[Dict] = None,
+                 filename: Optional[str] = None, embedding=None, requirements: Optional[Dict] = None):
+        """
+        Args:
+            embedding_id: ID del sílabo en ChromaDB.
+            name: Nombre del sílabo.
+            entities: Entidades NER normalizadas. Sólo se usan si no se pasa `requirements`.
+            filename: Nombre del archivo del sílabo, si se conoce.
+            embedding: Embedding del sílabo, si se conoce (se guarda normalizado).
+            requirements: Perfil de requisitos ya calculado (build_requirement_profile).
+        """
+        if requirements is None:
+            requirements = build_requirement_profile(entities or {})
+        required_ids = skill_vocabulary.ids(requirements['required_skills'])
+        self.embedding_id = embedding_id
+        self.name = name
+        self.filename = filename
+        self.level = requirements['level']
+        # Lista (con posibles repetidos, en el orden del sílabo) y set de ids
+        self.required_skill_ids = required_ids
+        self.required_skill_set = frozenset(required_ids)
+        self.required_skills = tuple(skill_vocabulary.name(skill_id) for skill_id in required_ids)
+        # Peso de cada skill requerida distinta en la compatibilidad de habilidades
+        # (ids en el orden del sílabo y array de pesos alineado)
+        weights = {}
+        for skill, weight in (requirements.get('skill_weights') or {}).items():
+            skill_id = skill_vocabulary.skill_id(skill)
+            weights[skill_id] = weights.get(skill_id, 0.0) + weight
+        if not weights and required_ids:
+            weights = {skill_id: required_ids.count(skill_id) / len(required_ids) for skill_id in required_ids}
+        self.skill_weight_ids = tuple(dict.fromkeys(skill_id for skill_id in required_ids if skill_id in weights))
+        self.skill_weights = np.fromiter((weights[skill_id] for skill_id in self.skill_weight_ids),
+                                         dtype=np.float64, count=len(self.skill_weight_ids))
+        self.course_topics = tuple(requirements['course_topics'])
+        self.required_experience = requirements['required_experience']
+        self.embedding = _unit_vector(embedding)
+
+    @classmethod
+    def from_entities(cls, entities: Dict) -> "SyllabusProfile":
+        """Perfil efímero a partir de un dict de entidades (API antigua del matching)."""
+        return cls(entities.get('embedding_id', ''), entities.get('name', ''), entities)
+
+    def set_embedding(self, embedding):
+        self.embedding = _unit_vector(embedding)
+
+    def __repr__(self):
+        return f"SyllabusProfile(name={self.name!r}, required_skills={list(self.required_skills)})"
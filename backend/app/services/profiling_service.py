@@ -0,0 +1,267 @@
+"""
+Perfilado por muestreo de requests individuales.
+
+Desactivado por defecto (PROFILING_ENABLED=0). Si está activo y ADMIN_TOKEN
+está configurado, un request con `X-Profile: 1` (o `?profile=1`) y la cabecera
+`X-Admin-Token` correcta hace que el middleware de main.py arranque un
+SamplingProfiler mientras dura el request, incluido el envío del cuerpo (las
+respuestas en streaming generan su contenido después de devolver la respuesta).
+
+Un hilo toma muestras cada PROFILE_INTERVAL_MS sólo de los hilos que sirven el
+request: el que lo recibe y los que se registran con `profile_current_thread`
+(p. ej. los pasos de un generador síncrono, que Starlette ejecuta en el pool de
+hilos). De esas pilas se queda con las que pasan por código de la aplicación,
+para descartar el event loop ocioso. Los demás requests concurrentes que corren
+en otros hilos no aparecen en el perfil.
+
+El resultado se guarda en PROFILE_DIR en dos formatos:
+- `<id>.collapsed.txt`: pilas colapsadas ("a;b;c N"), para flamegraph.pl / speedscope.
+- `<id>.speedscope.json`: perfil muestreado para https://www.speedscope.app.
+Sólo se conservan los PROFILE_MAX_PROFILES perfiles más recientes.
+
+Los requests sin la marca no pasan por aquí y no pagan ningún coste.
+"""
+
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import hmac
+import json
+import os
+import re
+import sys
+import threading
+import time
+
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "0") == "1"
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "1"))
+PROFILE_DIR = os.getenv("PROFILE_DIR") or os.path.join(os.path.dirname(__file__), '..', '..', 'profiles')
+# Perfiles guardados como máximo (se borran los más antiguos)
+PROFILE_MAX_PROFILES = int(os.getenv("PROFILE_MAX_PROFILES", "50"))
+# Token de los endpoints de administración y del perfilado; sin token, ambos quedan deshabilitados
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_BACKEND_DIR = os.path.dirname(_APP_DIR)
+_PROFILE_NAME = re.compile(r"^[\w.-]+\.(collapsed\.txt|speedscope\.json)$")
+
+# (nombre de la función, archivo, primera línea)
+Frame = Tuple[str, str, int]
+
+# Profiler del request en curso (se propaga a las tareas y a los hilos del pool)
+_active_profiler: ContextVar[Optional["SamplingProfiler"]] = ContextVar("active_profiler", default=None)
+
+
+def is_admin_token(token: Optional[str]) -> bool:
+    """True si `token` coincide con ADMIN_TOKEN (siempre False si no hay token configurado)."""
+    return bool(ADMIN_TOKEN) and token is not None and hmac.compare_digest(token, ADMIN_TOKEN)
+
+
+@contextmanager
+def profile_current_thread():
+    """
+    Muestrea el hilo actual mientras dura el bloque, si el request en curso se
+    está perfilando. Para trabajo del request en hilos del pool, que al salir
+    del bloque pueden pasar a servir otros requests.
+    """
+    profiler = _active_profiler.get()
+    thread_id = threading.get_ident()
+    added = profiler is not None and thread_id not in profiler._threads
+    if added:
+        profiler.add_thread(thread_id)
+    try:
+        yield
+    finally:
+        if added:
+            profiler.remove_thread(thread_id)
+
+
+def _frame_key(frame) -> Frame:
+    code = frame.f_code
+    filename = code.co_filename
+    if filename.startswith(_BACKEND_DIR):
+        filename = os.path.relpath(filename, _BACKEND_DIR)
+    return (code.co_qualname, filename, code.co_firstlineno)
+
+
+class SamplingProfiler:
+    """
+    Profiler estadístico: muestrea `sys._current_frames()` desde un hilo aparte.
+    """
+
+    def __init__(self, label: str = "", interval_ms: float = PROFILE_INTERVAL_MS):
+        """
+        Args:
+            label: Descripción del request (método y ruta).
+            interval_ms: Milisegundos entre muestras.
+        """
+        self.label = label
+        slug = re.sub(r"[^\w-]+", "_", label).strip("_")[:60]
+        self.profile_id = f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}_{slug}"
+        self.interval = interval_ms / 1000.0
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self._threads = set()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.started_at = 0.0
+        self.duration = 0.0
+
+    def add_thread(self, thread_id: int):
+        """Muestrea también este hilo (trabajo del request delegado a otro hilo)."""
+        self._threads.add(thread_id)
+
+    def remove_thread(self, thread_id: int):
+        self._threads.discard(thread_id)
+
+    def start(self):
+        """
+        Empieza a muestrear el hilo actual y lo marca como profiler del contexto.
+
+        Returns:
+            Token para restaurar el contexto con `_active_profiler.reset` (ver deactivate).
+        """
+        self.add_thread(threading.get_ident())
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return _active_profiler.set(self)
+
+    @staticmethod
+    def deactivate(token):
+        """Deja de asociar el profiler al contexto actual (las tareas ya creadas lo conservan)."""
+        _active_profiler.reset(token)
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration = time.perf_counter() - self.started_at
+
+    def _run(self):
+        this_file = os.path.abspath(__file__)
+        while not self._stop.wait(self.interval):
+            self.sample_count += 1
+            frames = sys._current_frames()
+            for thread_id in list(self._threads):
+                frame = frames.get(thread_id)
+                stack = []
+                in_app = False
+                while frame is not None:
+                    filename = frame.f_code.co_filename
+                    if filename.startswith(_APP_DIR) and filename != this_file \
+                            and not filename.endswith(os.path.join("app", "main.py")):
+                        in_app = True
+                    stack.append(_frame_key(frame))
+                    frame = frame.f_back
+                if in_app:
+                    # Raíz primero
+                    self.samples[tuple(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        """Pilas en formato colapsado: 'frame;frame;frame N' por línea."""
+        lines = []
+        for stack, count in self.samples.most_common():
+            names = ";".join(f"{name} ({filename}:{line})" for name, filename, line in stack)
+            lines.append(f"{names} {count}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self, name: str) -> Dict:
+        """Perfil en formato speedscope ('sampled', pesos en milisegundos)."""
+        frames: List[Frame] = []
+        frame_index: Dict[Frame, int] = {}
+        samples, weights = [], []
+        for stack, count in self.samples.items():
+            indices = []
+            for frame in stack:
+                if frame not in frame_index:
+                    frame_index[frame] = len(frames)
+                    frames.append(frame)
+                indices.append(frame_index[frame])
+            samples.append(indices)
+            weights.append(count * self.interval * 1000)
+        total = sum(weights)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": [{"name": n, "file": f, "line": l} for n, f, l in frames]},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": total,
+                "samples": samples,
+                "weights": weights,
+            }],
+            "name": name,
+            "exporter": "sampling-profiler",
+        }
+
+    def save(self, directory: str = PROFILE_DIR, keep: int = PROFILE_MAX_PROFILES) -> str:
+        """
+        Guarda el perfil en los dos formatos y borra los más antiguos.
+
+        Args:
+            keep: Perfiles (pares de archivos) que se conservan en el directorio.
+
+        Returns:
+            Identificador del perfil (prefijo común de los archivos).
+        """
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f"{self.profile_id}.collapsed.txt"), "w") as f:
+            f.write(self.collapsed())
+        with open(os.path.join(directory, f"{self.profile_id}.speedscope.json"), "w") as f:
+            json.dump(self.speedscope(self.label), f)
+        prune_profiles(directory, keep)
+        return self.profile_id
+
+
+def prune_profiles(directory: str = PROFILE_DIR, keep: int = PROFILE_MAX_PROFILES) -> int:
+    """
+    Borra los perfiles más antiguos y deja los `keep` más recientes.
+
+    Returns:
+        Número de archivos borrados.
+    """
+    if not os.path.isdir(directory):
+        return 0
+    files = [filename for filename in os.listdir(directory) if _PROFILE_NAME.match(filename)]
+    # El id empieza por la fecha, así que el orden alfabético es el cronológico
+    profile_ids = sorted({filename.split(".", 1)[0] for filename in files}, reverse=True)
+    stale = set(profile_ids[max(keep, 0):])
+    removed = 0
+    for filename in files:
+        if filename.split(".", 1)[0] in stale:
+            try:
+                os.remove(os.path.join(directory, filename))
+                removed += 1
+            except OSError:
+                pass
+    return removed
+
+
+def list_profiles(directory: str = PROFILE_DIR) -> List[Dict]:
+    """Perfiles guardados, del más reciente al más antiguo."""
+    if not os.path.isdir(directory):
+        return []
+    profiles = []
+    for filename in os.listdir(directory):
+        if _PROFILE_NAME.match(filename):
+            path = os.path.join(directory, filename)
+            stat = os.stat(path)
+            profiles.append({
+                "file": filename,
+                "size_bytes": stat.st_size,
+                "created_at": datetime.fromtimestamp(stat.st_mtime).isoformat(),
+            })
+    return sorted(profiles, key=lambda p: p["file"], reverse=True)
+
+
+def get_profile_path(filename: str, directory: str = PROFILE_DIR) -> Optional[str]:
+    """Ruta de un perfil guardado, o None si el nombre no es válido o no existe."""
+    if not _PROFILE_NAME.match(filename):
+        return None
+    path = os.path.join(directory, filename)
+    return path if os.path.isfile(path) else None
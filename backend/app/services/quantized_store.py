@@ -0,0 +1,297 @@
+"""
+Almacén compacto de embeddings cuantizados (int8 o float16) en archivos mapeados en memoria.
+
+Se usa para la primera pasada del top-k: se recorre la matriz cuantizada por
+bloques y se obtiene una lista corta de candidatos, que luego se re-puntúa con
+los embeddings exactos (float32) sólo para esos pocos documentos.
+
+Formato en disco (dentro de `chroma_db/quantized/`):
+    <coleccion>.<dtype>.npy   matriz (n, dim) int8 o float16
+    <coleccion>.scales.npy    escala por vector (sólo int8)
+    <coleccion>.ids.json      ids de los documentos en el orden de la matriz
+    <coleccion>.dirty         existe mientras hay cambios sin escribir con flush();
+                              si sigue ahí al cargar, el almacén se reconstruye
+"""
+
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+import json
+import os
+
+import numpy as np
+
+SUPPORTED_DTYPES = ("int8", "float16")
+
+
+class QuantizedEmbeddingStore:
+    """
+    Embeddings normalizados guardados como int8 (cuantización escalar simétrica
+    por vector) o float16, con búsqueda aproximada por bloques.
+
+    Los cambios de la sincronización se acumulan en memoria y se escriben a
+    disco con `flush()`.
+    """
+
+    def __init__(self, directory: str, collection_name: str, dtype: str = "int8", block_size: int = 8192):
+        """
+        Args:
+            directory: Carpeta donde se guardan los archivos.
+            collection_name: Nombre de la colección de ChromaDB que se refleja.
+            dtype: 'int8' (8x menos que float64) o 'float16' (4x menos).
+            block_size: Filas procesadas por bloque al buscar (limita la memoria temporal).
+        """
+        if dtype not in SUPPORTED_DTYPES:
+            raise ValueError(f"dtype '{dtype}' no soportado. Opciones: {SUPPORTED_DTYPES}")
+
+        self.directory = directory
+        self.collection_name = collection_name
+        self.dtype = dtype
+        self.block_size = block_size
+
+        self.ids: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._matrix: Optional[np.ndarray] = None
+        self._scales: Optional[np.ndarray] = None
+
+        # Cambios pendientes de escribir: doc_id -> vector float32 normalizado
+        self._pending: Dict[str, np.ndarray] = {}
+        self._lock = Lock()
+        self.loaded = False
+
+    # ==================== ARCHIVOS ====================
+
+    def _path(self, suffix: str) -> str:
+        return os.path.join(self.directory, f"{self.collection_name}.{suffix}")
+
+    def load(self) -> bool:
+        """
+        Mapea los archivos existentes en memoria (sin leerlos completos).
+
+        Returns:
+            True si había un almacén guardado y al día, False si no existe o
+            quedaron cambios sin escribir (el proceso terminó antes de flush()).
+        """
+        matrix_path = self._path(f"{self.dtype}.npy")
+        ids_path = self._path("ids.json")
+        if not (os.path.exists(matrix_path) and os.path.exists(ids_path)):
+            return False
+        if os.path.exists(self._path("dirty")):
+            return False
+
+        with open(ids_path, encoding="utf-8") as f:
+            ids = json.load(f)
+
+        with self._lock:
+            self._matrix = np.load(matrix_path, mmap_mode="r")
+            self._scales = np.load(self._path("scales.npy")) if self.dtype == "int8" else None
+            self.ids = ids
+            self._positions = {doc_id: i for i, doc_id in enumerate(ids)}
+            self.loaded = True
+        return True
+
+    def rebuild_from_collection(self, collection, batch_size: int = 1000):
+        """Reconstruye el almacén completo a partir de una colección de ChromaDB."""
+        offset = 0
+        with self._lock:
+            self._pending = {}
+        while True:
+            page = collection.get(include=["embeddings"], limit=batch_size, offset=offset)
+            if not page.get('ids'):
+                break
+            for doc_id, embedding in zip(page['ids'], page['embeddings']):
+                self.upsert(doc_id, embedding)
+            offset += len(page['ids'])
+
+        with self._lock:
+            self.ids = []
+            self._positions = {}
+            self._matrix = None
+            self._scales = None
+        self.flush()
+        self.loaded = True
+
+    def flush(self):
+        """Escribe los cambios pendientes a disco y vuelve a mapear los archivos."""
+        with self._lock:
+            if not self._pending and self._matrix is not None:
+                return
+
+            vectors = [self._dequantize_rows(slice(0, len(self.ids)))] if self.ids else []
+            ids = list(self.ids)
+            positions = dict(self._positions)
+            new_rows = []
+            for doc_id, vector in self._pending.items():
+                position = positions.get(doc_id)
+                if position is None:
+                    positions[doc_id] = len(ids)
+                    ids.append(doc_id)
+                    new_rows.append(vector)
+                else:
+                    vectors[0][position] = vector
+
+            dim = self._infer_dimension()
+            all_vectors = np.vstack(vectors + new_rows) if (vectors or new_rows) else np.empty((0, dim), np.float32)
+            quantized, scales = self.quantize(all_vectors, self.dtype)
+
+            os.makedirs(self.directory, exist_ok=True)
+            # Se escribe a archivos temporales y se reemplazan de forma atómica
+            matrix_path = self._path(f"{self.dtype}.npy")
+            np.save(matrix_path + ".tmp.npy", quantized)
+            os.replace(matrix_path + ".tmp.npy", matrix_path)
+            if scales is not None:
+                scales_path = self._path("scales.npy")
+                np.save(scales_path + ".tmp.npy", scales)
+                os.replace(scales_path + ".tmp.npy", scales_path)
+            ids_path = self._path("ids.json")
+            with open(ids_path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(ids, f)
+            os.replace(ids_path + ".tmp", ids_path)
+            if os.path.exists(self._path("dirty")):
+                os.remove(self._path("dirty"))
+
+            self._pending = {}
+            self._matrix = np.load(matrix_path, mmap_mode="r")
+            self._scales = scales
+            self.ids = ids
+            self._positions = positions
+
+    def _infer_dimension(self) -> int:
+        if self._matrix is not None and self._matrix.ndim == 2:
+            return self._matrix.shape[1]
+        for vector in self._pending.values():
+            return vector.shape[0]
+        return 0
+
+    # ==================== CUANTIZACIÓN ====================
+
+    @staticmethod
+    def quantize(vectors: np.ndarray, dtype: str) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        Cuantiza una matriz de vectores float32.
+
+        Returns:
+            (matriz cuantizada, escalas por vector o None para float16)
+        """
+        if dtype == "float16":
+            return vectors.astype(np.float16), None
+        max_abs = np.abs(vectors).max(axis=1) if len(vectors) else np.empty(0, np.float32)
+        scales = np.where(max_abs > 0, max_abs / 127.0, 1.0).astype(np.float32)
+        quantized = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+        return quantized, scales
+
+    def _dequantize_rows(self, rows: slice) -> np.ndarray:
+        block = np.asarray(self._matrix[rows], dtype=np.float32)
+        if self._scales is not None:
+            block *= self._scales[rows][:, None]
+        return block
+
+    @property
+    def nbytes(self) -> int:
+        """Tamaño de la matriz cuantizada (más escalas) en bytes."""
+        if self._matrix is None:
+            return 0
+        return self._matrix.nbytes + (self._scales.nbytes if self._scales is not None else 0)
+
+    # ==================== ESCRITURA / BÚSQUEDA ====================
+
+    def __len__(self) -> int:
+        return len(self.ids) + sum(1 for doc_id in self._pending if doc_id not in self._positions)
+
+    def upsert(self, doc_id: str, embedding):
+        """Registra un embedding nuevo o actualizado (se escribe a disco en flush())."""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector = vector / norm
+        with self._lock:
+            if not self._pending:
+                # Marca el almacén como desactualizado hasta el próximo flush()
+                os.makedirs(self.directory, exist_ok=True)
+                open(self._path("dirty"), "w").close()
+            self._pending[doc_id] = vector
+
+    def clear(self):
+        """Olvida el contenido en memoria (los archivos se regeneran en la próxima carga)."""
+        with self._lock:
+            self.ids = []
+            self._positions = {}
+            self._matrix = None
+            self._scales = None
+            self._pending = {}
+            self.loaded = False
+
+    def search(self, query_embedding, n_candidates: int) -> Tuple[List[str], List[float]]:
+        """
+        Primera pasada aproximada: los n_candidates documentos con mayor similitud
+        coseno según los vectores cuantizados (incluye los cambios pendientes).
+
+        Returns:
+            Tupla (ids, similitudes aproximadas) ordenada de mayor a menor.
+        """
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+
+        with self._lock:
+            size = len(self.ids)
+            scores = np.empty(size, dtype=np.float32)
+            for start in range(0, size, self.block_size):
+                block = np.asarray(self._matrix[start:start + self.block_size], dtype=np.float32)
+                scores[start:start + len(block)] = block @ query
+            if self._scales is not None and size:
+                scores *= self._scales
+
+            ids = self.ids
+            if self._pending:
+                # Los documentos pendientes reemplazan a su versión guardada
+                for doc_id in self._pending:
+                    position = self._positions.get(doc_id)
+                    if position is not None:
+                        scores[position] = -np.inf
+                pending_ids = list(self._pending)
+                pending_scores = np.stack([self._pending[d] for d in pending_ids]) @ query
+                ids = ids + pending_ids
+                scores = np.concatenate([scores, pending_scores.astype(np.float32)])
+
+        total = len(ids)
+        if total == 0 or n_candidates <= 0:
+            return [], []
+        n_candidates = min(n_candidates, total)
+        top = np.argpartition(-scores, n_candidates - 1)[:n_candidates] if n_candidates < total else np.arange(total)
+        top = top[np.argsort(-scores[top], kind='stable')]
+        top = [i for i in top if np.isfinite(scores[i])]
+        return [ids[i] for i in top], scores[top].tolist()
+
+
+def rescore_exact(query_embedding, ids: List[str], embeddings, n_results: int) -> List[Tuple[int, float]]:
+    """
+    Segunda pasada: similitud coseno exacta (float32) sobre la lista corta.
+
+    Returns:
+        Lista de (posición en `ids`, similitud exacta) con los n_results mejores.
+    """
+    if not ids:
+        return []
+    query = np.asarray(query_embedding, dtype=np.float32)
+    vectors = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1) * (np.linalg.norm(query) or 1.0)
+    norms[norms == 0] = 1.0
+    similarities = (vectors @ query) / norms
+    order = np.argsort(-similarities, kind='stable')[:n_results]
+    return [(int(i), float(similarities[i])) for i in order]
+
+
+# Almacenes compartidos por colección (igual que get_vector_index)
+_stores: Dict[str, QuantizedEmbeddingStore] = {}
+_stores_lock = Lock()
+
+
+def get_quantized_store(directory: str, collection_name: str, dtype: str = "int8") -> QuantizedEmbeddingStore:
+    """Devuelve el almacén compartido de una colección, creándolo si no existe."""
+    with _stores_lock:
+        store = _stores.get(collection_name)
+        if store is None:
+            store = QuantizedEmbeddingStore(directory, collection_name, dtype)
+            _stores[collection_name] = store
+        return store
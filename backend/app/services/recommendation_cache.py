@@ -0,0 +1,146 @@
+"""
+Caché de resultados de recomendaciones.
+
+Las recomendaciones sólo dependen de los datos sincronizados (sílabos y CVs),
+de los pesos de scoring y de la versión del algoritmo. Este módulo guarda los
+resultados ya calculados y los invalida cuando `process_file` (sync o
+auto-sync) modifica un sílabo o cualquier CV.
+
+Limitación: la caché vive en la memoria de cada proceso. Con varios workers
+(p. ej. `uvicorn --workers N`) una sincronización sólo invalida la caché del
+proceso que la ejecutó, y los demás pueden servir rankings anteriores a ella
+hasta reiniciarse. En ese despliegue conviene desactivarla con
+RECOMMENDATION_CACHE_SIZE=0.
+"""
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Hashable, Optional, Tuple
+import os
+
+# Resultados guardados como máximo (0 desactiva la caché)
+RECOMMENDATION_CACHE_SIZE = int(os.getenv("RECOMMENDATION_CACHE_SIZE", "512"))
+
+
+class RecommendationCache:
+    """
+    Caché LRU en memoria para los resultados de los endpoints de recomendaciones.
+
+    Cada entrada se indexa por (endpoint, id del sílabo, pesos, versión del algoritmo).
+    Además se guardan alias (ciclo, curso) -> id del sílabo para que los endpoints
+    que buscan por nombre no tengan que recorrer todos los sílabos en cada request.
+    """
+
+    def __init__(self, max_entries: int = 512):
+        """
+        Args:
+            max_entries: Número máximo de resultados guardados antes de descartar los más antiguos.
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, Dict]" = OrderedDict()
+        self._entries_by_syllabus: Dict[str, set] = {}
+        self._aliases: Dict[Tuple[str, str], str] = {}
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(endpoint: str, syllabus_id: str, weights: Dict[str, float],
+                 algorithm_version: str, **params: Hashable) -> Tuple:
+        """
+        Construye la clave de caché para un resultado.
+
+        Args:
+            endpoint: Nombre lógico del endpoint (ej: 'generate', 'hybrid').
+            syllabus_id: ID del sílabo en ChromaDB.
+            weights: Pesos de scoring usados para calcular el resultado.
+            algorithm_version: Versión del algoritmo de matching.
+            **params: Parámetros adicionales del request que afectan al resultado.
+
+        Returns:
+            Tupla hasheable usada como clave.
+        """
+        return (
+            endpoint,
+            syllabus_id,
+            tuple(sorted(weights.items())),
+            algorithm_version,
+            tuple(sorted(params.items())),
+        )
+
+    def get(self, key: Tuple) -> Optional[Dict]:
+        """Devuelve el resultado cacheado para la clave, o None si no existe."""
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def set(self, key: Tuple, result: Dict):
+        """Guarda un resultado. El id del sílabo se toma de la propia clave."""
+        syllabus_id = key[1]
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            self._entries_by_syllabus.setdefault(syllabus_id, set()).add(key)
+
+            while len(self._entries) > self.max_entries:
+                old_key, _ = self._entries.popitem(last=False)
+                keys = self._entries_by_syllabus.get(old_key[1])
+                if keys is not None:
+                    keys.discard(old_key)
+                    if not keys:
+                        del self._entries_by_syllabus[old_key[1]]
+
+    def resolve_alias(self, cycle_name: str, course_name: str) -> Optional[str]:
+        """Devuelve el id del sílabo ya resuelto para (ciclo, curso), si se conoce."""
+        with self._lock:
+            return self._aliases.get((cycle_name.lower(), course_name.lower()))
+
+    def set_alias(self, cycle_name: str, course_name: str, syllabus_id: str):
+        """Recuerda qué sílabo corresponde a un par (ciclo, curso) del request."""
+        with self._lock:
+            self._aliases[(cycle_name.lower(), course_name.lower())] = syllabus_id
+
+    def invalidate_syllabus(self, syllabus_id: str):
+        """
+        Invalida los resultados de un sílabo modificado.
+
+        Los alias por nombre se descartan por completo, porque un sílabo nuevo
+        puede cambiar qué documento coincide con un par (ciclo, curso).
+        """
+        with self._lock:
+            for key in self._entries_by_syllabus.pop(syllabus_id, set()):
+                self._entries.pop(key, None)
+            self._aliases.clear()
+
+    def invalidate_cvs(self):
+        """Invalida todos los resultados: un CV nuevo o modificado afecta a todos los rankings."""
+        self.clear(keep_aliases=True)
+
+    def clear(self, keep_aliases: bool = False):
+        """Vacía la caché."""
+        with self._lock:
+            self._entries.clear()
+            self._entries_by_syllabus.clear()
+            if not keep_aliases:
+                self._aliases.clear()
+
+    def get_statistics(self) -> Dict:
+        """Estadísticas de uso de la caché."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'aliases': len(self._aliases),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0
+            }
+
+
+# Instancia compartida entre las rutas de sync (que invalidan) y las de recomendaciones (que leen).
+recommendation_cache = RecommendationCache(RECOMMENDATION_CACHE_SIZE)
@@ -0,0 +1,146 @@
+"""
+Filtros estructurados para la búsqueda vectorial.
+
+Antes, restringir una búsqueda (docentes con una skill, con experiencia mínima
+o de un departamento) sólo se podía hacer en Python sobre el top-k ya
+recuperado, así que un top-20 filtrado podía quedarse vacío. Aquí los filtros
+se compilan a cláusulas `where` / `where_document` de ChromaDB y se aplican
+dentro de la búsqueda: el top-k filtrado devuelve una página completa si hay
+suficientes documentos que cumplan el filtro.
+
+Para que los filtros sean exactos, `filter_metadata` añade a los metadatos de
+cada documento campos escalares tipados (además de los `entities_*` aplanados
+como texto, que se conservan por compatibilidad):
+
+- cvs: `skills` (lista de skills normalizadas), `experience_years` (int) y
+  `department` (str, si el documento lo trae).
+- syllabi: `skills` (skills requeridas normalizadas), `level` (str),
+  `required_experience` (int) y `department` (str, si el documento lo trae).
+
+Los documentos guardados antes de existir estos campos se completan la
+primera vez que se filtra su colección (ver DatabaseService._ensure_filter_metadata).
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .entity_store import normalize_entities
+from .profiles import normalize_skill, build_requirement_profile
+
+# Versión de los campos filtrables: incrementarla cuando cambie filter_metadata
+# para que los documentos guardados se recalculen
+FILTER_FIELDS_VERSION = 1
+FILTER_VERSION_KEY = "filter_fields_version"
+
+# Filtros admitidos por colección
+FILTERS = {
+    "cvs": ("skills_any", "skills_all", "min_experience", "max_experience", "department", "text"),
+    "syllabi": ("skills_any", "skills_all", "level", "min_experience", "max_experience", "department", "text"),
+}
+
+# Campo de experiencia sobre el que actúan min_experience / max_experience
+EXPERIENCE_FIELD = {"cvs": "experience_years", "syllabi": "required_experience"}
+
+
+def _skills(skills: Iterable[str]) -> List[str]:
+    """Skills normalizadas, sin vacíos ni repetidos, en su orden original."""
+    return list(dict.fromkeys(normalize_skill(skill) for skill in skills if skill and skill.strip()))
+
+
+def filter_metadata(collection: str, entities: Dict, metadata: Optional[Dict] = None) -> Dict:
+    """
+    Campos escalares tipados de un documento para filtrar en ChromaDB.
+
+    Args:
+        collection: 'cvs' o 'syllabi'.
+        entities: Entidades NER del documento.
+        metadata: Metadatos originales del documento (de ahí sale `department`).
+
+    Returns:
+        Dict listo para fusionar con los metadatos aplanados. Las listas vacías
+        se omiten (ChromaDB no las admite).
+    """
+    entities = normalize_entities(collection, entities)
+    if collection == "cvs":
+        fields = {
+            "skills": _skills(entities.get("technical_skills", [])),
+            "experience_years": entities.get("experience_years", 0),
+        }
+    else:
+        requirements = build_requirement_profile(entities)
+        fields = {
+            "skills": _skills(requirements["required_skills"]),
+            "level": requirements["level"],
+            "required_experience": requirements["required_experience"],
+        }
+    department = (metadata or {}).get("department")
+    if isinstance(department, str) and department.strip():
+        fields["department"] = department.strip().lower()
+    fields[FILTER_VERSION_KEY] = FILTER_FIELDS_VERSION
+    return {key: value for key, value in fields.items() if value != []}
+
+
+def _any_skill(skills: List[str]) -> Dict:
+    clauses = [{"skills": {"$contains": skill}} for skill in skills]
+    return clauses[0] if len(clauses) == 1 else {"$or": clauses}
+
+
+def _all(clauses: List[Dict]) -> Optional[Dict]:
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def compile_filters(collection: str, filters: Optional[Dict]) -> Tuple[Optional[Dict], Optional[Dict]]:
+    """
+    Compila filtros estructurados a cláusulas de ChromaDB.
+
+    Args:
+        collection: 'cvs' o 'syllabi'.
+        filters: Dict con cualquiera de:
+            - skills_any: lista de skills; basta con tener una.
+            - skills_all: lista de skills; hay que tenerlas todas.
+            - min_experience / max_experience: años de experiencia (del
+              docente, o requeridos por el sílabo).
+            - department: departamento o lista de departamentos.
+            - level: nivel del sílabo ('basic', 'intermediate', 'advanced').
+            - text: texto que debe aparecer en el documento.
+            Los valores None se ignoran.
+
+    Returns:
+        (where, where_document); cada uno es None si no hay cláusulas.
+
+    Raises:
+        ValueError: Si hay filtros no admitidos para la colección.
+    """
+    filters = {key: value for key, value in (filters or {}).items() if value is not None}
+    unknown = set(filters) - set(FILTERS.get(collection, ()))
+    if unknown:
+        raise ValueError(f"Filtros no admitidos para '{collection}': {', '.join(sorted(unknown))}")
+
+    clauses = []
+    skills_any = _skills(filters.get("skills_any", []))
+    if skills_any:
+        clauses.append(_any_skill(skills_any))
+    clauses.extend({"skills": {"$contains": skill}} for skill in _skills(filters.get("skills_all", [])))
+
+    experience_field = EXPERIENCE_FIELD.get(collection)
+    if "min_experience" in filters:
+        clauses.append({experience_field: {"$gte": int(filters["min_experience"])}})
+    if "max_experience" in filters:
+        clauses.append({experience_field: {"$lte": int(filters["max_experience"])}})
+
+    if "department" in filters:
+        departments = filters["department"]
+        if isinstance(departments, str):
+            departments = [departments]
+        departments = list(dict.fromkeys(d.strip().lower() for d in departments if d and d.strip()))
+        if departments:
+            clauses.append({"department": departments[0]} if len(departments) == 1
+                           else {"department": {"$in": departments}})
+    if "level" in filters:
+        clauses.append({"level": filters["level"]})
+
+    text = (filters.get("text") or "").strip()
+    where_document = {"$contains": text} if text else None
+    return _all(clauses), where_document
+
@@ -0,0 +1,40 @@
+"""
+Convención única de similitud semántica.
+
+Las colecciones de ChromaDB usan el espacio 'cosine', donde la distancia
+devuelta es d = 1 - cos(a, b). Todas las rutas convierten distancias y
+comparan embeddings con estas funciones para que los scores sean
+consistentes entre endpoints y backends (ChromaDB o índice en memoria).
+"""
+
+import numpy as np
+
+# Espacio de distancia de las colecciones de ChromaDB
+DISTANCE_SPACE = "cosine"
+
+
+def distance_to_similarity(distance: float) -> float:
+    """
+    Convierte una distancia coseno (1 - cos) en similitud en el rango [0, 1].
+
+    Las similitudes negativas (vectores opuestos) se recortan a 0.0.
+    """
+    return min(1.0, max(0.0, 1.0 - float(distance)))
+
+
+def similarity_to_distance(similarity: float) -> float:
+    """Inversa de distance_to_similarity (sin recorte): d = 1 - cos."""
+    return 1.0 - float(similarity)
+
+
+def cosine_similarity(a, b) -> float:
+    """
+    Similitud coseno entre dos embeddings, recortada al rango [0, 1]
+    igual que distance_to_similarity.
+    """
+    a = np.asarray(a, dtype=np.float32)
+    b = np.asarray(b, dtype=np.float32)
+    denominator = np.linalg.norm(a) * np.linalg.norm(b)
+    if denominator == 0:
+        return 0.0
+    return min(1.0, max(0.0, float(np.dot(a, b) / denominator)))
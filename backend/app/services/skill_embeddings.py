@@ -0,0 +1,184 @@
+"""
+Similitud entre skills por embeddings, para las coincidencias parciales del scoring.
+
+La coincidencia parcial por subcadena no reconoce sinónimos ni traducciones
+("aprendizaje automático" / "machine learning"). Aquí cada skill normalizada se
+embebe una sola vez con el modelo de NLP al sincronizar, se guarda en la tabla
+`skill_embeddings` y se mantiene en memoria una matriz skill × dimensión. Al
+añadir skills nuevas sólo se calcula su similitud contra las existentes, y los
+pares con similitud coseno >= SKILL_SIMILARITY_THRESHOLD se registran en
+`skill_vocabulary` como relacionados (`add_similar`).
+
+El scoring no usa el modelo: sólo consulta `skill_vocabulary.related_ids`, que
+ya incluye estos pares, así que la coincidencia difusa es una búsqueda en un
+set precalculado.
+"""
+
+from threading import Lock
+from typing import Callable, Iterable, List, Optional
+import os
+
+import numpy as np
+
+from .sql_database_service import SQLDatabaseService
+from .profiles import normalize_skill, skill_vocabulary, SkillVocabulary
+from .logging_service import get_logger
+
+logger = get_logger(__name__)
+
+# Similitud coseno mínima para considerar dos skills equivalentes (coincidencia parcial)
+SKILL_SIMILARITY_THRESHOLD = float(os.getenv("SKILL_SIMILARITY_THRESHOLD", "0.8"))
+
+# Filas nuevas por bloque al calcular similitudes contra toda la matriz
+SIMILARITY_BLOCK_ROWS = 1024
+
+
+class SkillEmbeddingIndex:
+    """
+    Embeddings de skills en memoria (respaldados por la tabla skill_embeddings)
+    y pares de skills similares por encima del umbral.
+    """
+
+    def __init__(self, sql_db_service: Optional[SQLDatabaseService] = None,
+                 vocabulary: SkillVocabulary = skill_vocabulary,
+                 threshold: float = SKILL_SIMILARITY_THRESHOLD):
+        self._sql = sql_db_service
+        self._vocabulary = vocabulary
+        self.threshold = threshold
+        self._skill_ids: List[int] = []  # id de vocabulario de cada fila de la matriz
+        self._known = set()
+        # Buffer con capacidad reservada; sólo las primeras len(self._skill_ids) filas son válidas
+        self._matrix: Optional[np.ndarray] = None
+        self._loaded = False
+        self._lock = Lock()
+
+    def bind(self, sql_db_service: SQLDatabaseService):
+        """Usa otra conexión SQL y descarta los embeddings y pares cargados."""
+        with self._lock:
+            self._sql = sql_db_service
+            self._skill_ids, self._known, self._matrix = [], set(), None
+            self._loaded = False
+            self._vocabulary.clear_similar()
+
+    def _sql_service(self) -> SQLDatabaseService:
+        if self._sql is None:
+            self._sql = SQLDatabaseService()
+        return self._sql
+
+    def __len__(self) -> int:
+        return len(self._skill_ids)
+
+    @property
+    def matrix(self) -> Optional[np.ndarray]:
+        """Vista (sin copia) de las filas ocupadas de la matriz."""
+        return None if self._matrix is None else self._matrix[:len(self._skill_ids)]
+
+    def _ensure_capacity(self, rows: int, dim: int):
+        """Reserva espacio para al menos `rows` filas, duplicando la capacidad si hace falta."""
+        if self._matrix is None:
+            self._matrix = np.empty((rows, dim), dtype=np.float32)
+        elif rows > self._matrix.shape[0]:
+            new_matrix = np.empty((max(rows, self._matrix.shape[0] * 2), dim), dtype=np.float32)
+            new_matrix[:len(self._skill_ids)] = self._matrix[:len(self._skill_ids)]
+            self._matrix = new_matrix
+
+    def load(self):
+        """Carga los embeddings guardados (una sola vez) y registra sus pares similares."""
+        with self._lock:
+            if self._loaded:
+                return
+            rows = self._sql_service().get_skill_embeddings()
+            if rows:
+                # Si conviven dimensiones distintas (cambio de modelo), sólo vale la más reciente
+                dim = max(rows, key=lambda row: row.updated_at or "").dim
+                rows = [row for row in rows if row.dim == dim]
+                names = [row.name for row in rows]
+                vectors = np.stack([np.frombuffer(row.vector, dtype=np.float32) for row in rows])
+                pairs = self._add(names, vectors)
+                logger.info("Embeddings de skills cargados: %d (%d pares similares)", len(names), pairs)
+            # Sólo tras leer la tabla: si la lectura falla se reintenta en la próxima llamada
+            self._loaded = True
+
+    def ensure(self, skills: Iterable[str], embed: Callable[[List[str]], Optional[List[List[float]]]]) -> int:
+        """
+        Embebe y guarda las skills que todavía no tienen embedding.
+
+        Args:
+            skills: Skills de un documento (sin normalizar).
+            embed: Función que devuelve un embedding por texto (ej: NLPService.generate_embeddings).
+
+        Returns:
+            Número de skills nuevas embebidas.
+        """
+        self.load()
+        names = list(dict.fromkeys(
+            normalize_skill(skill) for skill in skills if skill and skill.strip()
+        ))
+        names = [name for name in names if name not in self._known]
+        if not names:
+            return 0
+
+        embeddings = embed(names)
+        if embeddings is None or len(embeddings) != len(names):
+            logger.warning("⚠️ No se pudieron generar los embeddings de %d skills", len(names))
+            return 0
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms > 0, norms, 1.0)
+
+        with self._lock:
+            # Otro sync pudo añadir alguna de estas skills mientras se embebían
+            fresh = [i for i, name in enumerate(names) if name not in self._known]
+            if not fresh:
+                return 0
+            names = [names[i] for i in fresh]
+            vectors = vectors[fresh]
+            self._sql_service().save_skill_embeddings(
+                {name: vector.tobytes() for name, vector in zip(names, vectors)}, vectors.shape[1]
+            )
+            pairs = self._add(names, vectors)
+        logger.debug("Skills embebidas: %d nuevas, %d pares similares", len(names), pairs)
+        return len(names)
+
+    def _add(self, names: List[str], vectors: np.ndarray) -> int:
+        """Añade filas a la matriz y registra los pares similares nuevos (con el lock tomado)."""
+        if self._matrix is not None and self._matrix.shape[1] != vectors.shape[1]:
+            # Cambió el modelo de embeddings: las similitudes anteriores no son comparables
+            logger.warning("⚠️ Dimensión de embeddings de skills distinta (%d != %d): se descartan los anteriores",
+                           vectors.shape[1], self._matrix.shape[1])
+            self._skill_ids, self._known, self._matrix = [], set(), None
+            self._vocabulary.clear_similar()
+
+        new_ids = [self._vocabulary.skill_id(name) for name in names]
+        offset = len(self._skill_ids)
+        # Crecimiento amortizado: copiar toda la matriz en cada ensure() haría la
+        # sincronización cuadrática en el número de skills
+        self._ensure_capacity(offset + len(new_ids), vectors.shape[1])
+        self._matrix[offset:offset + len(new_ids)] = vectors
+        matrix = self._matrix[:offset + len(new_ids)]
+
+        # Similitud de las filas nuevas contra todas (incluidas las nuevas), por bloques
+        # para no materializar una matriz nuevas × total completa al cargar
+        all_ids = self._skill_ids + new_ids
+        pairs = []
+        for start in range(0, len(new_ids), SIMILARITY_BLOCK_ROWS):
+            similarities = vectors[start:start + SIMILARITY_BLOCK_ROWS] @ matrix.T
+            rows, cols = np.nonzero(similarities >= self.threshold)
+            pairs.extend(
+                (new_ids[start + row], all_ids[col]) for row, col in zip(rows.tolist(), cols.tolist())
+                if col != offset + start + row
+            )
+        if pairs:
+            self._vocabulary.add_similar(pairs)
+
+        self._skill_ids = all_ids
+        self._known.update(names)
+        return len(pairs)
+
+    def get_statistics(self) -> dict:
+        return {"skills": len(self._skill_ids), "threshold": self.threshold}
+
+
+# Instancia compartida: sync embebe las skills nuevas y el EntityStore la carga
+# antes del primer scoring
+skill_embedding_index = SkillEmbeddingIndex()
@@ -4,8 +4,8 @@ Complementa ChromaDB con metadata estructurada.
 """
 
 from sqlalchemy import create_engine, func
-from sqlalchemy.orm import sessionmaker
-from ..models.db_models import Base, Teacher, Skill, Course, MatchingResult, teacher_skills, course_requirements
+from sqlalchemy.orm import sessionmaker, scoped_session
+from ..models.db_models import Base, Teacher, Skill, Course, MatchingResult, EntityProfile, SyllabusRequirement, SkillEmbedding, teacher_skills, course_requirements
 from typing import List, Dict, Tuple, Optional
 from datetime import datetime
 import os
@@ -19,15 +19,17 @@ class SQLDatabaseService:
     
     def __init__(self):
         """Inicializa la conexión a SQLite."""
-        # Base de datos SQLite en la misma carpeta que ChromaDB
-        db_path = os.path.join(os.path.dirname(__file__), '..', '..', 'metadata.db')
+        # Base de datos SQLite en la misma carpeta que ChromaDB (SQL_DB_PATH para otra ubicación)
+        db_path = os.getenv("SQL_DB_PATH") or os.path.join(os.path.dirname(__file__), '..', '..', 'metadata.db')
         db_url = f'sqlite:///{os.path.abspath(db_path)}'
         
         self.engine = create_engine(db_url, echo=False)  # echo=True para debug
         Base.metadata.create_all(self.engine)
         
-        Session = sessionmaker(bind=self.engine)
-        self.session = Session()
+        # Una sesión por hilo: la instancia se comparte entre los handlers async,
+        # los hilos del threadpool (p. ej. el generador NDJSON del batch) y sync,
+        # y una Session de SQLAlchemy no es thread-safe
+        self.session = scoped_session(sessionmaker(bind=self.engine))
         
         print(f"✅ SQL Database inicializada: {db_url}")
     
@@ -156,6 +158,71 @@ class SQLDatabaseService:
         """Obtiene todos los cursos."""
         return self.session.query(Course).all()
     
+    # ==================== ENTITY PROFILES ====================
+    
+    def save_entity_profile(self, embedding_id: str, collection: str, name: str, entities: Dict):
+        """
+        Guarda (o reemplaza) las entidades tipadas de un documento.
+        
+        Args:
+            embedding_id: ID del embedding en ChromaDB
+            collection: 'cvs' o 'syllabi'
+            name: Nombre del docente o del sílabo
+            entities: Entidades ya normalizadas (listas y números, sin aplanar)
+        """
+        self.session.merge(EntityProfile(
+            embedding_id=embedding_id,
+            collection=collection,
+            name=name,
+            entities=entities,
+            updated_at=datetime.now().isoformat()
+        ))
+        self.session.commit()
+    
+    def get_entity_profiles(self, collection: str) -> List[EntityProfile]:
+        """Obtiene las entidades de todos los documentos de una colección."""
+        return self.session.query(EntityProfile).filter_by(collection=collection).all()
+    
+    # ==================== SYLLABUS REQUIREMENTS ====================
+    
+    def save_syllabus_requirements(self, embedding_id: str, requirements: Dict):
+        """
+        Guarda (o reemplaza) el perfil de requisitos de un sílabo.
+        
+        Args:
+            embedding_id: ID del sílabo en ChromaDB
+            requirements: Perfil de profiles.build_requirement_profile
+        """
+        self.session.merge(SyllabusRequirement(
+            embedding_id=embedding_id,
+            updated_at=datetime.now().isoformat(),
+            **requirements
+        ))
+        self.session.commit()
+    
+    def get_syllabus_requirements(self) -> Dict[str, Dict]:
+        """Perfiles de requisitos de todos los sílabos: {embedding_id: perfil}."""
+        return {row.embedding_id: row.to_dict() for row in self.session.query(SyllabusRequirement).all()}
+    
+    # ==================== SKILL EMBEDDINGS ====================
+    
+    def save_skill_embeddings(self, embeddings: Dict[str, bytes], dim: int):
+        """
+        Guarda (o reemplaza) los embeddings de varias skills.
+        
+        Args:
+            embeddings: {skill normalizada: vector float32 en bytes}
+            dim: Dimensión de los vectores
+        """
+        updated_at = datetime.now().isoformat()
+        for name, vector in embeddings.items():
+            self.session.merge(SkillEmbedding(name=name, dim=dim, vector=vector, updated_at=updated_at))
+        self.session.commit()
+    
+    def get_skill_embeddings(self) -> List[SkillEmbedding]:
+        """Obtiene todos los embeddings de skills guardados."""
+        return self.session.query(SkillEmbedding).all()
+    
     # ==================== MATCHING ====================
     
     def find_teachers_by_skills(self, required_skill_names: List[str], 
@@ -313,5 +380,5 @@ class SQLDatabaseService:
             return 'other'
     
     def close(self):
-        """Cierra la conexión a la base de datos."""
-        self.session.close()
+        """Cierra la sesión del hilo actual."""
+        self.session.remove()
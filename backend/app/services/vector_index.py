@@ -0,0 +1,217 @@
+"""
+Índice vectorial exacto en memoria (fuerza bruta con NumPy).
+
+Con unos pocos miles de CVs de 384 dimensiones todo el corpus ocupa pocos MB,
+así que una búsqueda exacta con una sola multiplicación matriz-vector (BLAS)
+más `argpartition` es más rápida que pasar por HNSW + SQLite de ChromaDB.
+El índice es un espejo de las colecciones de ChromaDB: se carga al iniciar y
+se actualiza en cada `add_embedding` durante la sincronización.
+"""
+
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+
+class VectorIndex:
+    """
+    Matriz contigua de embeddings normalizados (float32) con búsqueda top-k por coseno.
+    """
+
+    def __init__(self, dimension: Optional[int] = None, initial_capacity: int = 1024):
+        """
+        Args:
+            dimension: Dimensión de los vectores. Si es None se toma del primer vector insertado.
+            initial_capacity: Filas reservadas inicialmente en la matriz.
+        """
+        self.dimension = dimension
+        self.ids: List[str] = []
+        self.metadatas: List[Dict] = []
+        self._positions: Dict[str, int] = {}
+        self._matrix = np.empty((initial_capacity, dimension or 0), dtype=np.float32)
+        self._lock = Lock()
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """Vista (sin copia) de las filas ocupadas de la matriz."""
+        return self._matrix[:len(self.ids)]
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        """Normaliza filas a norma 1.0 (las filas nulas se dejan igual)."""
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def _ensure_capacity(self, rows: int):
+        """Reserva espacio para al menos `rows` filas, duplicando la capacidad si hace falta."""
+        if self._matrix.shape[1] != self.dimension:
+            self._matrix = np.empty((max(rows, self._matrix.shape[0]), self.dimension), dtype=np.float32)
+        if rows > self._matrix.shape[0]:
+            new_matrix = np.empty((max(rows, self._matrix.shape[0] * 2), self.dimension), dtype=np.float32)
+            new_matrix[:len(self.ids)] = self._matrix[:len(self.ids)]
+            self._matrix = new_matrix
+
+    def load_from_collection(self, collection, batch_size: int = 1000):
+        """
+        Carga (o recarga) todos los embeddings de una colección de ChromaDB.
+
+        Args:
+            collection: Colección de ChromaDB a reflejar.
+            batch_size: Número de documentos leídos por página.
+        """
+        ids, embeddings, metadatas = [], [], []
+        offset = 0
+        while True:
+            page = collection.get(include=["embeddings", "metadatas"], limit=batch_size, offset=offset)
+            page_ids = page.get('ids') or []
+            if not page_ids:
+                break
+            ids.extend(page_ids)
+            embeddings.extend(page['embeddings'])
+            metadatas.extend(page['metadatas'])
+            offset += len(page_ids)
+
+        with self._lock:
+            self.ids = []
+            self.metadatas = []
+            self._positions = {}
+            if ids:
+                vectors = self._normalize(np.asarray(embeddings, dtype=np.float32))
+                self.dimension = vectors.shape[1]
+                self._matrix = np.ascontiguousarray(vectors)
+                self.ids = list(ids)
+                self.metadatas = list(metadatas)
+                self._positions = {doc_id: i for i, doc_id in enumerate(self.ids)}
+            self.loaded = True
+
+    def upsert(self, doc_id: str, embedding, metadata: Dict):
+        """Inserta o reemplaza un embedding."""
+        vector = self._normalize(np.asarray(embedding, dtype=np.float32))
+        with self._lock:
+            if self.dimension is None:
+                self.dimension = vector.shape[0]
+            position = self._positions.get(doc_id)
+            if position is None:
+                position = len(self.ids)
+                self._ensure_capacity(position + 1)
+                self.ids.append(doc_id)
+                self.metadatas.append(metadata)
+                self._positions[doc_id] = position
+            else:
+                self.metadatas[position] = metadata
+            self._matrix[position] = vector
+
+    def remove(self, doc_id: str):
+        """Elimina un embedding moviendo la última fila a su posición."""
+        with self._lock:
+            position = self._positions.pop(doc_id, None)
+            if position is None:
+                return
+            last = len(self.ids) - 1
+            if position != last:
+                self._matrix[position] = self._matrix[last]
+                self.ids[position] = self.ids[last]
+                self.metadatas[position] = self.metadatas[last]
+                self._positions[self.ids[position]] = position
+            self.ids.pop()
+            self.metadatas.pop()
+
+    def clear(self):
+        """Vacía el índice (se volverá a cargar desde ChromaDB)."""
+        with self._lock:
+            self.ids = []
+            self.metadatas = []
+            self._positions = {}
+            self.loaded = False
+
+    def get_embedding(self, doc_id: str) -> Optional[np.ndarray]:
+        """Devuelve el vector normalizado de un documento, o None si no existe."""
+        position = self._positions.get(doc_id)
+        return None if position is None else self._matrix[position]
+
+    @staticmethod
+    def _top_k(similarities: np.ndarray, n_results: int) -> np.ndarray:
+        """Índices de los n_results mayores valores de cada fila, ordenados de mayor a menor."""
+        n = similarities.shape[-1]
+        if n_results < n:
+            candidates = np.argpartition(-similarities, n_results - 1, axis=-1)[..., :n_results]
+        else:
+            candidates = np.broadcast_to(np.arange(n), similarities.shape[:-1] + (n,))
+        order = np.argsort(-np.take_along_axis(similarities, candidates, axis=-1), axis=-1, kind='stable')
+        return np.take_along_axis(candidates, order, axis=-1)
+
+    def search(self, query_embedding, n_results: int = 5,
+               ids: Optional[List[str]] = None) -> Tuple[List[str], List[Dict], List[float]]:
+        """
+        Busca los N documentos más similares (coseno) a un embedding de consulta.
+
+        Args:
+            ids: Si se indica, restringe la búsqueda a esos documentos.
+
+        Returns:
+            Tupla (ids, metadatos, similitudes coseno) ordenada de mayor a menor similitud.
+        """
+        if ids is None:
+            return self.search_batch([query_embedding], n_results)[0]
+
+        with self._lock:
+            positions = np.array([self._positions[doc_id] for doc_id in ids if doc_id in self._positions],
+                                 dtype=np.int64)
+            if len(positions) == 0 or n_results <= 0:
+                return [], [], []
+
+            query = self._normalize(np.asarray([query_embedding], dtype=np.float32))
+            similarities = query @ self._matrix[positions].T
+            top = self._top_k(similarities, min(n_results, len(positions)))[0]
+            selected = positions[top]
+            return (
+                [self.ids[i] for i in selected],
+                [self.metadatas[i] for i in selected],
+                similarities[0, top].tolist()
+            )
+
+    def search_batch(self, query_embeddings, n_results: int = 5) -> List[Tuple[List[str], List[Dict], List[float]]]:
+        """
+        Busca los N documentos más similares para varias consultas con un solo producto de matrices.
+
+        Returns:
+            Una tupla (ids, metadatos, similitudes coseno) por consulta.
+        """
+        with self._lock:
+            size = len(self.ids)
+            if size == 0 or n_results <= 0:
+                return [([], [], []) for _ in query_embeddings]
+
+            queries = self._normalize(np.asarray(query_embeddings, dtype=np.float32))
+            similarities = queries @ self._matrix[:size].T
+            top = self._top_k(similarities, min(n_results, size))
+
+            results = []
+            for row, indices in enumerate(top):
+                results.append((
+                    [self.ids[i] for i in indices],
+                    [self.metadatas[i] for i in indices],
+                    similarities[row, indices].tolist()
+                ))
+            return results
+
+
+# Índices compartidos por nombre de colección, para que todas las instancias de
+# DatabaseService (sync, recomendaciones, ...) vean el mismo espejo en memoria.
+_indexes: Dict[str, VectorIndex] = {}
+_indexes_lock = Lock()
+
+
+def get_vector_index(collection_name: str) -> VectorIndex:
+    """Devuelve el índice compartido de una colección, creándolo si no existe."""
+    with _indexes_lock:
+        index = _indexes.get(collection_name)
+        if index is None:
+            index = VectorIndex()
+            _indexes[collection_name] = index
+        return index
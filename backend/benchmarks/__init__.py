@@ -0,0 +1,5 @@
+"""
+Benchmarks de rendimiento del backend.
+
+Cada módulo se ejecuta desde la carpeta `backend/` con `python -m benchmarks.<modulo>`.
+"""
@@ -0,0 +1,115 @@
+"""
+Benchmark: embeddings de documento completo vs embeddings por fragmentos.
+
+Mide el throughput de ingesta (docs/s) de:
+  - generate_embedding (una llamada por documento, truncado por el modelo)
+  - generate_chunk_embeddings (fragmentos solapados, una llamada por documento)
+  - generate_chunk_embeddings_batch (fragmentos de todos los documentos en un solo encode)
+y la latencia de consulta de la búsqueda 'pooled' (colección principal) frente
+a 'max-sim' sobre los fragmentos, en una base ChromaDB temporal.
+
+Requiere el modelo de sentence-transformers.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_chunked_embeddings --docs 50 --paragraphs 30
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SKILLS = ["Python", "Java", "SQL", "machine learning", "redes neuronales", "Docker", "React",
+          "estadística", "bases de datos", "Kubernetes", "análisis de datos", "PostgreSQL"]
+TOPICS = ["programación orientada a objetos", "ingeniería de software", "minería de datos",
+          "sistemas distribuidos", "visión por computadora", "seguridad informática"]
+
+
+def _long_cv(rng: random.Random, paragraphs: int) -> str:
+    lines = ["Docente universitario con experiencia en desarrollo de software."]
+    for _ in range(paragraphs):
+        lines.append(
+            f"Dictó el curso de {rng.choice(TOPICS)} utilizando {rng.choice(SKILLS)} y "
+            f"{rng.choice(SKILLS)}. Publicó un artículo sobre {rng.choice(TOPICS)} aplicando "
+            f"{rng.choice(SKILLS)} en proyectos de investigación."
+        )
+    return "\n".join(lines)
+
+
+def _p50(values):
+    return sorted(values)[len(values) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--docs', type=int, default=50)
+    parser.add_argument('--paragraphs', type=int, default=30)
+    parser.add_argument('--queries', type=int, default=30)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    from app.services.nlp_service import NLPService
+
+    rng = random.Random(args.seed)
+    texts = [_long_cv(rng, args.paragraphs) for _ in range(args.docs)]
+    nlp_service = NLPService()
+    if not nlp_service.model:
+        print("❌ Modelo NLP no disponible.")
+        return
+
+    nlp_service.generate_embedding(texts[0])  # calentamiento
+
+    start = time.perf_counter()
+    whole = [nlp_service.generate_embedding(text) for text in texts]
+    whole_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for text in texts:
+        nlp_service.generate_chunk_embeddings(text)
+    chunked_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    chunked = nlp_service.generate_chunk_embeddings_batch(texts)
+    batched_s = time.perf_counter() - start
+
+    n_chunks = sum(len(c) for c in chunked)
+    print(f"Documentos: {args.docs}, fragmentos: {n_chunks} ({n_chunks / args.docs:.1f} por documento)")
+    print(f"  Documento completo (truncado): {args.docs / whole_s:8.2f} docs/s")
+    print(f"  Fragmentos, por documento:     {args.docs / chunked_s:8.2f} docs/s")
+    print(f"  Fragmentos, en lote:           {args.docs / batched_s:8.2f} docs/s "
+          f"({n_chunks / batched_s:.1f} fragmentos/s)")
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["CHROMA_DB_PATH"] = directory
+        from app.services.database_service import DatabaseService
+        db_service = DatabaseService()
+
+        for i, chunk_embeddings in enumerate(chunked):
+            doc_id = f"cv_{i}"
+            pooled = nlp_service.pool_embeddings(chunk_embeddings, "mean")
+            db_service.add_embedding("cvs", pooled, doc_id, {"name": doc_id})
+            db_service.add_chunk_embeddings("cvs", doc_id, chunk_embeddings)
+
+        queries = [whole[rng.randrange(len(whole))] for _ in range(args.queries)]
+        pooled_ms, maxsim_ms = [], []
+        for query in queries:
+            start = time.perf_counter()
+            db_service.search_similar("cvs", query, n_results=args.k)
+            pooled_ms.append((time.perf_counter() - start) * 1000)
+
+            start = time.perf_counter()
+            db_service.search_similar_chunked("cvs", query, n_results=args.k)
+            maxsim_ms.append((time.perf_counter() - start) * 1000)
+
+    print(f"\nLatencia de consulta (k = {args.k}, p50):")
+    print(f"  Pooled (colección principal): {_p50(pooled_ms):8.2f} ms")
+    print(f"  Max-sim (fragmentos):         {_p50(maxsim_ms):8.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
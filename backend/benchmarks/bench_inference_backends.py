@@ -0,0 +1,91 @@
+"""
+Benchmark: throughput de embeddings con PyTorch vs ONNX Runtime (fp32 e int8).
+
+Mide textos/s para lotes de distinto tamaño y la memoria residente del proceso
+tras cargar cada backend.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_inference_backends --texts 256 --batch-sizes 1 16 64 --threads 4
+"""
+
+import argparse
+import gc
+import os
+import random
+import resource
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.inference_backends import OnnxSentenceEncoder
+
+MODEL_NAME = 'paraphrase-multilingual-MiniLM-L12-v2'
+
+FRASES = [
+    "Docente con experiencia en programación orientada a objetos y Java.",
+    "Curso de bases de datos relacionales con PostgreSQL y modelado entidad-relación.",
+    "Investigador en machine learning, redes neuronales y visión por computadora.",
+    "Ingeniera de software especializada en desarrollo web con React y Node.js.",
+    "Sílabo de estadística aplicada: probabilidad, inferencia y regresión lineal.",
+]
+
+
+def _texts(n: int, rng: random.Random) -> list[str]:
+    return [" ".join(rng.choice(FRASES) for _ in range(rng.randint(1, 6))) for _ in range(n)]
+
+
+def _max_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _throughput(encoder, texts: list[str], batch_size: int) -> float:
+    encoder.encode(texts[:batch_size], batch_size=batch_size)  # calentamiento
+    start = time.perf_counter()
+    for offset in range(0, len(texts), batch_size):
+        encoder.encode(texts[offset:offset + batch_size], batch_size=batch_size)
+    return len(texts) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--texts', type=int, default=256)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 16, 64])
+    parser.add_argument('--threads', type=int, default=0, help="Hilos intra-op (0 = automático)")
+    parser.add_argument('--backends', nargs='+', default=['torch', 'onnx', 'onnx-int8'])
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    texts = _texts(args.texts, random.Random(args.seed))
+    results = {}
+
+    for backend in args.backends:
+        rss_before = _max_rss_mb()
+        if backend == 'torch':
+            import torch
+            from sentence_transformers import SentenceTransformer
+            if args.threads:
+                torch.set_num_threads(args.threads)
+            encoder = SentenceTransformer(MODEL_NAME, device="cpu")
+        else:
+            encoder = OnnxSentenceEncoder(MODEL_NAME, quantize=(backend == 'onnx-int8'),
+                                          intra_op_threads=args.threads)
+        rss_after = _max_rss_mb()
+
+        results[backend] = {bs: _throughput(encoder, texts, bs) for bs in args.batch_sizes}
+        print(f"{backend:>10}: +{rss_after - rss_before:7.1f} MB RSS máx. | " +
+              " | ".join(f"batch {bs}: {tps:7.1f} textos/s" for bs, tps in results[backend].items()))
+        del encoder
+        gc.collect()
+
+    if 'torch' in results:
+        print("\nAceleración respecto a PyTorch:")
+        for backend, by_batch in results.items():
+            if backend == 'torch':
+                continue
+            print(f"  {backend:>10}: " + " | ".join(
+                f"batch {bs}: {tps / results['torch'][bs]:.2f}x" for bs, tps in by_batch.items()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""
+Benchmark de extremo a extremo de la ingesta (sync_documents).
+
+Genera un corpus sintético de CVs y sílabos en PDF (ver synthetic_corpus.py),
+lo sirve con FakeDriveService y ejecuta la sincronización real contra ChromaDB
+y SQLite en una carpeta temporal. Reporta documentos/segundo por etapa de
+process_file (download, pdf_parse, embed, ner, skill_embed, chroma_write,
+sql_write), a partir del histograma ingest_stage_seconds, y el throughput total.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_ingest --sizes 100 1000 10000 --pages 2
+    python -m benchmarks.bench_ingest --sizes 100 --json resultados.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+# app.routes.sync se importa en bench_size: crea las bases al importarse, y
+# para entonces ya apuntan a la carpeta temporal de main()
+from app.models.sync_models import SyncRequest
+from app.services.database_service import DatabaseService
+from app.services.sql_database_service import SQLDatabaseService
+from app.services.metrics import INGEST_STAGE_SECONDS, METRICS_ENABLED
+from app.services.entity_store import entity_store
+
+from benchmarks.synthetic_corpus import generate_corpus
+from benchmarks.fake_drive import FakeDriveService
+
+STAGES = ["download", "pdf_parse", "embed", "ner", "skill_embed", "chroma_write", "sql_write"]
+
+
+def _stage_snapshot() -> dict:
+    """{(colección, etapa): (documentos, segundos)} del histograma de etapas."""
+    return {key: (sum(counts), total) for key, (counts, total) in dict(INGEST_STAGE_SECONDS._values).items()}
+
+
+def bench_size(workdir: str, n: int, cv_ratio: float, pages: int, latency_ms: float, seed: int) -> dict:
+    n_cvs = int(round(n * cv_ratio))
+    n_syllabi = n - n_cvs
+
+    start = time.perf_counter()
+    corpus = generate_corpus(n_cvs, n_syllabi, pages=pages, seed=seed)
+    generate_s = time.perf_counter() - start
+
+    # Bases nuevas para cada tamaño
+    run_dir = os.path.join(workdir, f"run_{n}")
+    os.environ["CHROMA_DB_PATH"] = os.path.join(run_dir, "chroma_db")
+    os.environ["SQL_DB_PATH"] = os.path.join(run_dir, "metadata.db")
+    os.makedirs(run_dir, exist_ok=True)
+    from app.routes import sync
+    sync.db_service = DatabaseService()
+    sync.sql_db_service = SQLDatabaseService()
+    entity_store.bind(sync.sql_db_service)
+    sync.drive_service = FakeDriveService(corpus, latency_ms=latency_ms)
+
+    before = _stage_snapshot()
+    start = time.perf_counter()
+    result = asyncio.run(sync.sync_documents(SyncRequest(
+        cv_folder_id=corpus.cv_folder_id,
+        syllabus_folder_id=corpus.syllabus_folder_id,
+    )))
+    total_s = time.perf_counter() - start
+    after = _stage_snapshot()
+
+    stages = {}
+    for (collection, stage), (count, seconds) in after.items():
+        prev_count, prev_seconds = before.get((collection, stage), (0, 0.0))
+        count, seconds = count - prev_count, seconds - prev_seconds
+        if count:
+            stages.setdefault(collection, {})[stage] = {
+                'docs': count,
+                'seconds': seconds,
+                'docs_per_s': count / seconds if seconds > 0 else float('inf'),
+            }
+
+    sync.sql_db_service.session.close()
+    shutil.rmtree(run_dir, ignore_errors=True)
+
+    processed = result['processed_cvs'] + result['processed_syllabi']
+    return {
+        'n': n,
+        'cvs': n_cvs,
+        'syllabi': n_syllabi,
+        'corpus_mb': corpus.total_bytes / 1e6,
+        'generate_s': generate_s,
+        'processed_cvs': result['processed_cvs'],
+        'processed_syllabi': result['processed_syllabi'],
+        'total_s': total_s,
+        'docs_per_s': processed / total_s if total_s > 0 else 0.0,
+        'stages': stages,
+    }
+
+
+def _print_result(r: dict):
+    print(f"\n=== N = {r['n']} ({r['cvs']} CVs, {r['syllabi']} sílabos, {r['corpus_mb']:.1f} MB) ===")
+    print(f"Procesados: {r['processed_cvs']} CVs, {r['processed_syllabi']} sílabos "
+          f"en {r['total_s']:.1f}s -> {r['docs_per_s']:.1f} docs/s")
+    print(f"{'colección':>10} | " + " | ".join(f"{stage:>12}" for stage in STAGES))
+    print("-" * (13 + 15 * len(STAGES)))
+    for collection, stages in sorted(r['stages'].items()):
+        cells = [
+            f"{stages[stage]['docs_per_s']:>8.1f} d/s" if stage in stages else f"{'-':>12}"
+            for stage in STAGES
+        ]
+        print(f"{collection:>10} | " + " | ".join(cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--cv-ratio', type=float, default=0.5, help="Fracción del corpus que son CVs")
+    parser.add_argument('--pages', type=int, default=1, help="Páginas por PDF")
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="Latencia simulada por llamada a Drive")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', help="Guarda los resultados en este archivo")
+    args = parser.parse_args()
+
+    if not METRICS_ENABLED:
+        parser.error("El benchmark usa el histograma ingest_stage_seconds: ejecutar con METRICS_ENABLED=1")
+
+    workdir = tempfile.mkdtemp(prefix="bench_ingest_")
+    results = []
+    try:
+        for n in args.sizes:
+            r = bench_size(workdir, n, args.cv_ratio, args.pages, args.latency_ms, args.seed)
+            _print_result(r)
+            results.append(r)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResultados guardados en {args.json}")
+
+
+if __name__ == '__main__':
+    main()
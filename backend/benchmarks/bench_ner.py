@@ -0,0 +1,291 @@
+"""
+Micro-benchmarks de los extractores NER y del matching avanzado, con línea base
+y reporte de regresiones.
+
+Casos (entradas sintéticas fijas, ver synthetic_corpus.py):
+
+    intelligent_ner.skills_cv         IntelligentNERService.extract_skills_intelligently (CV)
+    intelligent_ner.skills_syllabus   IntelligentNERService.extract_skills_intelligently (sílabo)
+    ner.entities_cv                   NERService.extract_entities_from_cv
+    ner.entities_syllabus             NERService.extract_entities_from_syllabus
+    matching.advanced_match           AdvancedMatchingService.calculate_advanced_match (dicts de entidades)
+    matching.advanced_match_profiles  AdvancedMatchingService.calculate_advanced_match (perfiles ya construidos)
+    matching.advanced_match_batch     AdvancedMatchingService.calculate_advanced_match_batch (200 candidatos, top 10)
+
+Para cada caso se mide, al estilo de pytest-benchmark, el tiempo por llamada
+(min / mediana / media / desviación sobre varias rondas calibradas) y, en una
+ejecución aparte bajo tracemalloc, el pico de memoria y los bloques asignados.
+
+Con --save-baseline los resultados se guardan como línea base; en las
+ejecuciones siguientes se comparan contra ella y el proceso termina con código
+1 si la mediana o el pico de memoria de algún caso empeora más que el umbral,
+para poder usarlo como puerta en CI. Las líneas base dependen de la máquina:
+se guarda la plataforma y se avisa si no coincide.
+
+Los casos que necesitan spaCy y el modelo es_core_news_sm se marcan como
+omitidos si no están instalados (sin modelo los servicios devuelven un
+resultado degradado cuyo tiempo no es comparable).
+
+Uso (desde backend/):
+    python -m benchmarks.bench_ner --save-baseline
+    python -m benchmarks.bench_ner --threshold 0.10 --json actual.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_corpus import cv_lines, syllabus_lines
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "bench_ner.json")
+
+
+class SkipCase(Exception):
+    """El caso no se puede medir en este entorno."""
+
+
+# --- Entradas fijas -----------------------------------------------------------
+
+def _inputs(pages: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    cv_text = "\n".join(cv_lines(rng, "María García Torres", pages))
+    syllabus_text = "\n".join(syllabus_lines(rng, "Estructuras de Datos", "Ciclo III", pages))
+    cv_entities = {
+        'technical_skills': ["python", "java", "sql", "docker", "machine learning", "estructuras de datos",
+                             "algoritmos", "git", "linux", "pandas", "numpy", "scrum"],
+        'experience_years': 8,
+        'education': ["maestría en ciencias de la computación", "ingeniero de sistemas"],
+        'languages': ["español", "inglés"],
+    }
+    syllabus_entities = {
+        'required_skills': ["estructuras de datos", "algoritmos", "python", "java", "complejidad", "grafos"],
+        'course_topics': ["estructuras de datos", "árboles", "grafos", "ordenamiento"],
+    }
+    return {'cv_text': cv_text, 'syllabus_text': syllabus_text,
+            'cv_entities': cv_entities, 'syllabus_entities': syllabus_entities}
+
+
+# --- Casos --------------------------------------------------------------------
+
+def _spacy_service(module_name: str, class_name: str):
+    try:
+        module = __import__(f"app.services.{module_name}", fromlist=[class_name])
+    except ImportError as e:
+        raise SkipCase(str(e))
+    service = getattr(module, class_name)()
+    if not service.nlp:
+        raise SkipCase("modelo de spaCy 'es_core_news_sm' no disponible")
+    return service
+
+
+def build_cases(inputs: dict) -> dict:
+    """{nombre: función de preparación que devuelve el callable a medir (o lanza SkipCase)}."""
+
+    def intelligent_ner(document_type: str):
+        def setup():
+            service = _spacy_service("intelligent_ner_service", "IntelligentNERService")
+            text = inputs['cv_text'] if document_type == 'cv' else inputs['syllabus_text']
+            return lambda: service.extract_skills_intelligently(text, document_type)
+        return setup
+
+    def ner(kind: str):
+        def setup():
+            service = _spacy_service("ner_service", "NERService")
+            if kind == 'cv':
+                return lambda: service.extract_entities_from_cv(inputs['cv_text'])
+            return lambda: service.extract_entities_from_syllabus(inputs['syllabus_text'])
+        return setup
+
+    def advanced_match():
+        from app.services.advanced_matching_service import AdvancedMatchingService
+        service = AdvancedMatchingService()
+        return lambda: service.calculate_advanced_match(inputs['cv_entities'], inputs['syllabus_entities'], 0.72)
+
+    def advanced_match_profiles():
+        from app.services.advanced_matching_service import AdvancedMatchingService
+        from app.services.profiles import TeacherProfile, SyllabusProfile
+        service = AdvancedMatchingService()
+        teacher = TeacherProfile.from_entities(inputs['cv_entities'])
+        syllabus = SyllabusProfile.from_entities(inputs['syllabus_entities'])
+        return lambda: service.calculate_advanced_match(teacher, syllabus, 0.72)
+
+    def advanced_match_batch():
+        from app.services.advanced_matching_service import AdvancedMatchingService
+        from app.services.profiles import TeacherProfile, SyllabusProfile
+        service = AdvancedMatchingService()
+        rng = random.Random(0)
+        skills = inputs['cv_entities']['technical_skills'] + inputs['syllabus_entities']['required_skills']
+        candidates = [
+            TeacherProfile(f"cv-{i}", f"Docente {i}", dict(
+                inputs['cv_entities'], technical_skills=rng.sample(skills, 8), experience_years=rng.randint(0, 20)
+            ))
+            for i in range(200)
+        ]
+        similarities = [rng.random() for _ in candidates]
+        syllabus = SyllabusProfile.from_entities(inputs['syllabus_entities'])
+        return lambda: service.calculate_advanced_match_batch(syllabus, candidates, similarities, top_k=10)
+
+    return {
+        'intelligent_ner.skills_cv': intelligent_ner('cv'),
+        'intelligent_ner.skills_syllabus': intelligent_ner('syllabus'),
+        'ner.entities_cv': ner('cv'),
+        'ner.entities_syllabus': ner('syllabus'),
+        'matching.advanced_match': advanced_match,
+        'matching.advanced_match_profiles': advanced_match_profiles,
+        'matching.advanced_match_batch': advanced_match_batch,
+    }
+
+
+# --- Medición -----------------------------------------------------------------
+
+def _calibrate(fn, min_round_s: float) -> int:
+    """Número de llamadas por ronda para que una ronda dure al menos min_round_s."""
+    iterations = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        if time.perf_counter() - start >= min_round_s or iterations >= 1_000_000:
+            return iterations
+        iterations *= 2
+
+
+def measure(fn, rounds: int, min_round_s: float) -> dict:
+    """Tiempo por llamada (µs) sobre `rounds` rondas y memoria de una llamada."""
+    fn()  # calentamiento (cachés, imports perezosos)
+    iterations = _calibrate(fn, min_round_s)
+    per_call = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        per_call.append((time.perf_counter() - start) / iterations * 1e6)
+
+    tracemalloc.start()
+    try:
+        before_current, _ = tracemalloc.get_traced_memory()
+        snapshot_before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+        snapshot_after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    allocated_blocks = sum(max(0, stat.count_diff) for stat in snapshot_after.compare_to(snapshot_before, 'lineno'))
+
+    return {
+        'iterations': iterations,
+        'rounds': rounds,
+        'min_us': min(per_call),
+        'median_us': statistics.median(per_call),
+        'mean_us': statistics.mean(per_call),
+        'stddev_us': statistics.stdev(per_call) if len(per_call) > 1 else 0.0,
+        'peak_kb': max(0, peak - before_current) / 1024,
+        'allocated_blocks': allocated_blocks,
+    }
+
+
+def _machine() -> dict:
+    return {'platform': platform.platform(), 'python': platform.python_version(), 'processor': platform.processor()}
+
+
+def compare(results: dict, baseline: dict, threshold: float, mem_threshold: float) -> list:
+    """Casos que empeoran más que el umbral respecto a la línea base."""
+    regressions = []
+    print(f"\n{'caso':<34} | {'mediana':>10} | {'base':>10} | {'Δ tiempo':>9} | {'Δ pico':>8}")
+    print("-" * 84)
+    for name, current in results['cases'].items():
+        base = baseline.get('cases', {}).get(name)
+        if 'skipped' in current or base is None or 'skipped' in base:
+            continue
+        time_delta = current['median_us'] / base['median_us'] - 1 if base['median_us'] else 0.0
+        mem_delta = current['peak_kb'] / base['peak_kb'] - 1 if base['peak_kb'] else 0.0
+        flags = []
+        if time_delta > threshold:
+            flags.append("TIEMPO")
+        if mem_delta > mem_threshold:
+            flags.append("MEMORIA")
+        print(f"{name:<34} | {current['median_us']:>8.1f}µs | {base['median_us']:>8.1f}µs | "
+              f"{time_delta:>+8.1%} | {mem_delta:>+7.1%} {' '.join(flags)}")
+        if flags:
+            regressions.append({'case': name, 'time_delta': time_delta, 'mem_delta': mem_delta, 'flags': flags})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cases', nargs='+', help="Subconjunto de casos (por defecto, todos)")
+    parser.add_argument('--pages', type=int, default=2, help="Páginas de los documentos de entrada")
+    parser.add_argument('--rounds', type=int, default=10)
+    parser.add_argument('--min-round-ms', type=float, default=100.0, help="Duración mínima de una ronda")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help="Guarda los resultados como línea base")
+    parser.add_argument('--threshold', type=float, default=0.15, help="Regresión máxima tolerada en la mediana")
+    parser.add_argument('--mem-threshold', type=float, default=0.25, help="Regresión máxima tolerada en el pico de memoria")
+    parser.add_argument('--json', help="Guarda los resultados en este archivo")
+    args = parser.parse_args()
+
+    inputs = _inputs(args.pages, args.seed)
+    cases = build_cases(inputs)
+    selected = args.cases or list(cases)
+    unknown = set(selected) - set(cases)
+    if unknown:
+        parser.error(f"Casos desconocidos: {', '.join(sorted(unknown))}")
+
+    results = {'machine': _machine(), 'config': {'pages': args.pages, 'seed': args.seed}, 'cases': {}}
+    print(f"{'caso':<34} | {'min':>10} | {'mediana':>10} | {'desv.':>9} | {'pico':>9} | {'bloques':>7}")
+    print("-" * 94)
+    for name in selected:
+        try:
+            fn = cases[name]()
+        except SkipCase as e:
+            results['cases'][name] = {'skipped': str(e)}
+            print(f"{name:<34} | omitido: {e}")
+            continue
+        r = measure(fn, args.rounds, args.min_round_ms / 1000)
+        results['cases'][name] = r
+        print(f"{name:<34} | {r['min_us']:>8.1f}µs | {r['median_us']:>8.1f}µs | {r['stddev_us']:>7.1f}µs | "
+              f"{r['peak_kb']:>6.1f} KB | {r['allocated_blocks']:>7}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResultados guardados en {args.json}")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nLínea base guardada en {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"\nSin línea base en {args.baseline} (usar --save-baseline para crearla).")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get('machine') != results['machine']:
+        print("\n⚠️ La línea base se tomó en otra máquina o versión de Python; las diferencias de tiempo no son fiables.")
+    if baseline.get('config') != results['config']:
+        print("\n⚠️ La línea base usa otras entradas (--pages/--seed); se comparan igualmente.")
+
+    regressions = compare(results, baseline, args.threshold, args.mem_threshold)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regresión(es) por encima del umbral "
+              f"(tiempo {args.threshold:.0%}, memoria {args.mem_threshold:.0%}).")
+        sys.exit(1)
+    print("\n✅ Sin regresiones respecto a la línea base.")
+
+
+if __name__ == '__main__':
+    main()
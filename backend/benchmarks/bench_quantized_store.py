@@ -0,0 +1,97 @@
+"""
+Benchmark: recall@10 y memoria del almacén cuantizado (int8 / float16).
+
+Genera un corpus sintético agrupado (como los embeddings reales, muchos CVs
+parecidos entre sí), calcula el top-10 exacto en float32 y lo compara con:
+  - la primera pasada cuantizada sola
+  - la primera pasada + re-puntuación exacta de la lista corta (oversample)
+
+Uso (desde backend/):
+    python -m benchmarks.bench_quantized_store --sizes 1000 10000 --oversample 4
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.quantized_store import QuantizedEmbeddingStore, rescore_exact
+
+
+def _clustered_corpus(n: int, dim: int, n_clusters: int, spread: float, rng: np.random.Generator) -> np.ndarray:
+    centers = rng.standard_normal((n_clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, n_clusters, n)
+    vectors = centers[labels] + spread * rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def bench(n: int, dim: int, k: int, n_queries: int, oversample: int, dtype: str, rng: np.random.Generator) -> dict:
+    corpus = _clustered_corpus(n, dim, n_clusters=max(4, n // 100), spread=0.6, rng=rng)
+    queries = _clustered_corpus(n_queries, dim, n_clusters=4, spread=0.6, rng=rng)
+    ids = [f"doc_{i}" for i in range(n)]
+    positions = {doc_id: i for i, doc_id in enumerate(ids)}
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = QuantizedEmbeddingStore(directory, "bench", dtype)
+        for doc_id, vector in zip(ids, corpus):
+            store.upsert(doc_id, vector)
+        store.flush()
+
+        recall_first_pass, recall_rescored, latencies = [], [], []
+        for query in queries:
+            exact_top = set(np.argsort(-(corpus @ query))[:k])
+
+            start = time.perf_counter()
+            candidate_ids, _ = store.search(query, k * oversample)
+            candidate_vectors = corpus[[positions[c] for c in candidate_ids]]
+            ranked = rescore_exact(query, candidate_ids, candidate_vectors, k)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+            first_pass = {positions[c] for c in candidate_ids[:k]}
+            rescored = {positions[candidate_ids[i]] for i, _ in ranked}
+            recall_first_pass.append(len(first_pass & exact_top) / k)
+            recall_rescored.append(len(rescored & exact_top) / k)
+
+        store_bytes = store.nbytes
+
+    return {
+        'n': n,
+        'dtype': dtype,
+        'float64_list_mb': n * dim * 8 / 1e6,
+        'store_mb': store_bytes / 1e6,
+        'recall_first_pass': statistics.mean(recall_first_pass),
+        'recall_rescored': statistics.mean(recall_rescored),
+        'latency_p50_ms': sorted(latencies)[len(latencies) // 2],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--dim', type=int, default=384)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--queries', type=int, default=100)
+    parser.add_argument('--oversample', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'N':>7} | {'dtype':>7} | {'float64 MB':>10} | {'store MB':>8} | "
+          f"{'recall@k 1ª':>11} | {'recall@k rescore':>16} | {'p50':>8}")
+    print("-" * 88)
+    for n in args.sizes:
+        for dtype in ("int8", "float16"):
+            r = bench(n, args.dim, args.k, args.queries, args.oversample, dtype, rng)
+            print(f"{r['n']:>7} | {r['dtype']:>7} | {r['float64_list_mb']:>10.2f} | {r['store_mb']:>8.2f} | "
+                  f"{r['recall_first_pass']:>11.3f} | {r['recall_rescored']:>16.3f} | {r['latency_p50_ms']:>6.2f}ms")
+    print(f"\n(k = {args.k}, oversample = {args.oversample})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,289 @@
+"""
+Benchmark de latencia de los endpoints de recomendaciones.
+
+Puebla ChromaDB y SQLite (en una carpeta temporal) con N docentes y M cursos
+sintéticos y lanza requests concurrentes contra:
+
+    POST /api/recommendations/generate
+    POST /api/recommendations/generate-hybrid
+    GET  /api/recommendations/{syllabus_id}
+
+a través de la app ASGI en proceso (httpx.ASGITransport), con C requests en
+vuelo a la vez. Reporta p50/p95/p99, media y throughput por endpoint en JSON,
+para comparar entre commits (--baseline imprime la variación respecto a un
+JSON anterior).
+
+Los embeddings son sintéticos pero coherentes con las skills: cada skill tiene
+un vector aleatorio y el embedding de un documento es la suma normalizada de
+los vectores de sus skills más ruido, así la búsqueda vectorial y el filtro SQL
+seleccionan candidatos parecidos a los de datos reales.
+
+Con --cache cold (por defecto) la caché de recomendaciones no guarda resultados
+y cada request recorre el pipeline completo; con --cache warm se mide el
+camino cacheado.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_recommendations --teachers 1000 --courses 200 --concurrency 1 8
+    python -m benchmarks.bench_recommendations --json actual.json --baseline anterior.json
+    python -m benchmarks.bench_recommendations --endpoints generate --n-candidates 500 --n-rerank 100
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import httpx
+from fastapi import FastAPI
+
+# app.routes.recommendations se importa dentro de las funciones: crea las bases
+# al importarse, y main() las apunta antes a una carpeta temporal
+from app.services.recommendation_cache import recommendation_cache
+from app.services.entity_store import entity_store
+
+from benchmarks.synthetic_corpus import SKILLS, COURSES, CYCLES, FIRST_NAMES, LAST_NAMES
+
+ENDPOINTS = ["generate", "hybrid", "syllabus"]
+
+
+def _percentile(sorted_values: list, q: float) -> float:
+    """Percentil por rango más cercano."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def populate(n_teachers: int, n_courses: int, dim: int, seed: int) -> list:
+    """
+    Inserta docentes y cursos sintéticos en ChromaDB y SQL, igual que process_file.
+
+    Returns:
+        Lista de cursos [{'id', 'cycle', 'course'}] para construir los requests.
+    """
+    from app.routes import recommendations
+
+    rng = random.Random(seed)
+    np_rng = np.random.default_rng(seed)
+    skills = [skill.lower() for skill in SKILLS]
+    skill_vectors = {skill: np_rng.standard_normal(dim).astype(np.float32) for skill in skills}
+
+    def embed(doc_skills):
+        vector = sum(skill_vectors[skill] for skill in doc_skills) + np_rng.standard_normal(dim).astype(np.float32)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+    db_service = recommendations.db_service
+    sql_db_service = recommendations.sql_db_service
+    entity_store.bind(sql_db_service)
+
+    for i in range(n_teachers):
+        teacher_skills = rng.sample(skills, rng.randint(6, 14))
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {i:06d}"
+        entities = {
+            'technical_skills': teacher_skills,
+            'experience_years': rng.randint(1, 25),
+            'education': ["maestría en ciencias de la computación"],
+            'languages': ["español", "inglés"],
+        }
+        file_id = f"cv-{i:06d}"
+        embedding = embed(teacher_skills)
+        db_service.add_embedding("cvs", embedding, file_id, {
+            "name": name, "filename": f"{name}.pdf", "raw_text": "", "entities": entities,
+        })
+        entity_store.put("cvs", file_id, name, entities, filename=f"{name}.pdf", embedding=embedding)
+        sql_db_service.add_teacher(name=name, embedding_id=file_id, skills_list=teacher_skills,
+                                   experience_years=entities['experience_years'])
+
+    courses = []
+    for i in range(n_courses):
+        cycle = CYCLES[i % len(CYCLES)]
+        course = f"{COURSES[(i // len(CYCLES)) % len(COURSES)]} {i:06d}"
+        required_skills = rng.sample(skills, rng.randint(4, 9))
+        entities = {'required_skills': required_skills, 'course_topics': required_skills[:3]}
+        file_id = f"syllabus-{i:06d}"
+        embedding = embed(required_skills)
+        db_service.add_embedding("syllabi", embedding, file_id, {
+            "name": f"Silabo {course}", "filename": f"Silabo {course}.pdf", "raw_text": "",
+            "entities": entities, "cycle": cycle, "course": course,
+        })
+        entity_store.put("syllabi", file_id, f"Silabo {course}", entities,
+                         filename=f"Silabo {course}.pdf", embedding=embedding)
+        sql_db_service.add_course(name=course, cycle=cycle, embedding_id=file_id, required_skills=required_skills)
+        courses.append({'id': file_id, 'cycle': cycle, 'course': course})
+
+    db_service.flush_vector_indexes()
+    return courses
+
+
+def _request_for(endpoint: str, course: dict, cascade: dict) -> tuple:
+    if endpoint == "syllabus":
+        query = "&".join(f"{key}={value}" for key, value in cascade.items())
+        return "GET", f"/api/recommendations/{course['id']}" + (f"?{query}" if query else ""), None
+    body = {
+        "cycle_name": course['cycle'],
+        "course_name": course['course'],
+        "cv_folder_id": "bench",
+        "syllabus_folder_id": "bench",
+        **cascade,
+    }
+    path = "/api/recommendations/generate" if endpoint == "generate" else "/api/recommendations/generate-hybrid"
+    return "POST", path, body
+
+
+async def run_load(app: FastAPI, endpoint: str, courses: list, n_requests: int,
+                   concurrency: int, seed: int, cascade: dict = None) -> dict:
+    """Lanza n_requests con `concurrency` workers y devuelve las estadísticas de latencia."""
+    rng = random.Random(seed)
+    queue: asyncio.Queue = asyncio.Queue()
+    for _ in range(n_requests):
+        queue.put_nowait(_request_for(endpoint, rng.choice(courses), cascade or {}))
+
+    latencies, errors = [], []
+
+    async def worker(client: httpx.AsyncClient):
+        while True:
+            try:
+                method, path, body = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            start = time.perf_counter()
+            response = await client.request(method, path, json=body)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code != 200:
+                errors.append(response.status_code)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'requests': n_requests,
+        'errors': len(errors),
+        'error_codes': sorted(set(errors)),
+        'mean_ms': sum(latencies) / len(latencies) if latencies else 0.0,
+        'p50_ms': _percentile(latencies, 50),
+        'p95_ms': _percentile(latencies, 95),
+        'p99_ms': _percentile(latencies, 99),
+        'max_ms': latencies[-1] if latencies else 0.0,
+        'throughput_rps': n_requests / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def _print_comparison(results: dict, baseline: dict):
+    print(f"\nComparación con {baseline.get('commit', '?')} (p50 / p95, negativo = más rápido):")
+    previous = {(r['endpoint'], r['concurrency']): r for r in baseline.get('results', [])}
+    for r in results['results']:
+        old = previous.get((r['endpoint'], r['concurrency']))
+        if old is None:
+            continue
+        deltas = [
+            f"{(r[key] - old[key]) / old[key] * 100:+.1f}%" if old[key] else "n/a"
+            for key in ('p50_ms', 'p95_ms')
+        ]
+        print(f"  {r['endpoint']:>8} c={r['concurrency']:<3} p50 {deltas[0]:>8}  p95 {deltas[1]:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--teachers', type=int, default=1000)
+    parser.add_argument('--courses', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=200, help="Requests por endpoint y nivel de concurrencia")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8])
+    parser.add_argument('--endpoints', nargs='+', default=ENDPOINTS, choices=ENDPOINTS)
+    parser.add_argument('--cache', choices=['cold', 'warm'], default='cold')
+    parser.add_argument('--n-candidates', type=int, help="N de la cascada (generate y syllabus)")
+    parser.add_argument('--n-rerank', type=int, help="M de la cascada")
+    parser.add_argument('--top-k', type=int, help="k de la cascada")
+    parser.add_argument('--dim', type=int, default=384)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', help="Guarda los resultados en este archivo")
+    parser.add_argument('--baseline', help="JSON de una ejecución anterior para comparar")
+    args = parser.parse_args()
+    cascade = {key: value for key, value in (
+        ('n_candidates', args.n_candidates), ('n_rerank', args.n_rerank), ('top_k', args.top_k)
+    ) if value is not None}
+
+    # Las bases se crean al importar las rutas: apuntarlas siempre a una carpeta
+    # temporal (aunque el entorno ya defina otras) para no escribir datos
+    # sintéticos en las bases reales
+    workdir = tempfile.mkdtemp(prefix="bench_recommendations_")
+    os.environ["CHROMA_DB_PATH"] = os.path.join(workdir, "chroma_db")
+    os.environ["SQL_DB_PATH"] = os.path.join(workdir, "metadata.db")
+    recommendations = None
+    try:
+        from app.routes import recommendations
+
+        start = time.perf_counter()
+        courses = populate(args.teachers, args.courses, args.dim, args.seed)
+        populate_s = time.perf_counter() - start
+        print(f"Datos: {args.teachers} docentes, {args.courses} cursos ({populate_s:.1f}s)")
+
+        app = FastAPI()
+        app.include_router(recommendations.router, prefix="/api")
+
+        if args.cache == 'cold':
+            # La caché acepta el resultado y lo descarta en el acto
+            recommendation_cache.max_entries = 0
+        else:
+            for endpoint in args.endpoints:
+                asyncio.run(run_load(app, endpoint, courses, len(courses), 1, args.seed, cascade))
+
+        results = []
+        print(f"\n{'endpoint':>8} | {'c':>3} | {'p50':>9} | {'p95':>9} | {'p99':>9} | {'req/s':>8} | errores")
+        print("-" * 72)
+        for endpoint in args.endpoints:
+            for concurrency in args.concurrency:
+                r = asyncio.run(run_load(app, endpoint, courses, args.requests, concurrency, args.seed, cascade))
+                r.update(endpoint=endpoint, concurrency=concurrency)
+                results.append(r)
+                print(f"{endpoint:>8} | {concurrency:>3} | {r['p50_ms']:>7.2f}ms | {r['p95_ms']:>7.2f}ms | "
+                      f"{r['p99_ms']:>7.2f}ms | {r['throughput_rps']:>8.1f} | {r['errors']}")
+    finally:
+        if recommendations is not None:
+            recommendations.sql_db_service.session.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        'commit': _git_commit(),
+        'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'config': {
+            'teachers': args.teachers, 'courses': args.courses, 'requests': args.requests,
+            'cache': args.cache, 'dim': args.dim, 'seed': args.seed, 'cascade': cascade,
+        },
+        'results': results,
+    }
+    if args.baseline:
+        with open(args.baseline) as f:
+            _print_comparison(report, json.load(f))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResultados guardados en {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+"""
+Benchmark: índice exacto en memoria (VectorIndex) vs búsqueda HNSW de ChromaDB.
+
+Genera N vectores aleatorios normalizados de 384 dimensiones, los inserta en
+ambos backends y mide la latencia de consultas top-k individuales y en lote.
+
+Uso (desde backend/):
+    python -m benchmarks.bench_vector_index --sizes 1000 10000 100000
+"""
+
+import argparse
+import statistics
+import sys
+import os
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.vector_index import VectorIndex
+from app.services.database_service import HNSW_CONFIG
+
+
+def _random_vectors(n: int, dim: int, rng: np.random.Generator) -> np.ndarray:
+    vectors = rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _measure(fn, repeats: int) -> dict:
+    """Ejecuta fn `repeats` veces y devuelve estadísticas de latencia en ms."""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        'mean_ms': statistics.mean(timings),
+        'p50_ms': timings[len(timings) // 2],
+        'p95_ms': timings[int(len(timings) * 0.95) - 1],
+    }
+
+
+def bench_size(n: int, dim: int, k: int, n_queries: int, batch_size: int, rng: np.random.Generator) -> dict:
+    corpus = _random_vectors(n, dim, rng)
+    queries = _random_vectors(n_queries, dim, rng)
+    ids = [f"doc_{i}" for i in range(n)]
+    metadatas = [{"name": doc_id} for doc_id in ids]
+
+    # --- VectorIndex ---
+    index = VectorIndex()
+    start = time.perf_counter()
+    for doc_id, vector, metadata in zip(ids, corpus, metadatas):
+        index.upsert(doc_id, vector, metadata)
+    index_build_s = time.perf_counter() - start
+
+    query_iter = iter(np.tile(queries, (2, 1)))
+    numpy_single = _measure(lambda: index.search(next(query_iter), k), n_queries)
+    numpy_batch = _measure(lambda: index.search_batch(queries[:batch_size], k), max(1, n_queries // batch_size))
+
+    # --- ChromaDB (HNSW en espacio coseno, en memoria) ---
+    import chromadb
+    client = chromadb.EphemeralClient()
+    collection_name = f"bench_{n}"
+    try:
+        client.delete_collection(collection_name)
+    except Exception:
+        pass
+    collection = client.create_collection(collection_name, metadata=HNSW_CONFIG)
+    start = time.perf_counter()
+    for offset in range(0, n, 5000):
+        collection.add(
+            ids=ids[offset:offset + 5000],
+            embeddings=corpus[offset:offset + 5000].tolist(),
+            metadatas=metadatas[offset:offset + 5000]
+        )
+    chroma_build_s = time.perf_counter() - start
+
+    query_lists = queries.tolist()
+    query_iter = iter(query_lists * 2)
+    chroma_single = _measure(
+        lambda: collection.query(query_embeddings=[next(query_iter)], n_results=k,
+                                 include=["metadatas", "distances"]),
+        n_queries
+    )
+    chroma_batch = _measure(
+        lambda: collection.query(query_embeddings=query_lists[:batch_size], n_results=k,
+                                 include=["metadatas", "distances"]),
+        max(1, n_queries // batch_size)
+    )
+
+    # Recall@k de HNSW respecto al resultado exacto
+    exact = index.search_batch(queries, k)
+    approx = collection.query(query_embeddings=query_lists, n_results=k, include=[])
+    recall = statistics.mean(
+        len(set(exact_ids) & set(approx_ids)) / k
+        for (exact_ids, _, _), approx_ids in zip(exact, approx['ids'])
+    )
+    client.delete_collection(collection_name)
+
+    return {
+        'n': n,
+        'index_memory_mb': index.matrix.nbytes / 1e6,
+        'numpy_build_s': index_build_s,
+        'chroma_build_s': chroma_build_s,
+        'numpy_single': numpy_single,
+        'chroma_single': chroma_single,
+        'numpy_batch': numpy_batch,
+        'chroma_batch': chroma_batch,
+        'chroma_recall_at_k': recall,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--dim', type=int, default=384)
+    parser.add_argument('--k', type=int, default=20)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+
+    print(f"{'N':>8} | {'mem MB':>7} | {'numpy p50':>10} | {'chroma p50':>10} | "
+          f"{'numpy batch':>11} | {'chroma batch':>12} | {'HNSW recall':>11}")
+    print("-" * 90)
+    for n in args.sizes:
+        r = bench_size(n, args.dim, args.k, args.queries, args.batch_size, rng)
+        print(f"{r['n']:>8} | {r['index_memory_mb']:>7.1f} | "
+              f"{r['numpy_single']['p50_ms']:>8.3f}ms | {r['chroma_single']['p50_ms']:>8.3f}ms | "
+              f"{r['numpy_batch']['mean_ms']:>9.3f}ms | {r['chroma_batch']['mean_ms']:>10.3f}ms | "
+              f"{r['chroma_recall_at_k']:>11.3f}")
+    print(f"\n(batch = {args.batch_size} consultas por llamada, k = {args.k})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""
+DriveService local para benchmarks y pruebas: sirve un SyntheticCorpus en
+memoria con la misma interfaz que app.services.drive_service.DriveService.
+"""
+
+import time
+from typing import Dict, List, Optional
+
+from .synthetic_corpus import SyntheticCorpus, FOLDER_MIME
+
+
+class FakeDriveService:
+    """
+    Sustituto de DriveService sin credenciales ni red.
+
+    Args:
+        corpus: Corpus sintético a servir.
+        latency_ms: Latencia artificial por llamada (0 = sin latencia), para
+            simular el coste de red de Drive si se quiere.
+    """
+
+    def __init__(self, corpus: SyntheticCorpus, latency_ms: float = 0.0):
+        self.corpus = corpus
+        self.latency = latency_ms / 1000.0
+        self.service = True
+        self.CV_FOLDER_ID = corpus.cv_folder_id
+        self.SYLLABUS_FOLDER_ID = corpus.syllabus_folder_id
+
+    def _wait(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def list_files_in_folder(self, folder_id: str) -> list:
+        self._wait()
+        return [dict(item) for item in self.corpus.folders.get(folder_id, [])]
+
+    def download_file(self, file_id: str) -> Optional[bytes]:
+        self._wait()
+        return self.corpus.files.get(file_id)
+
+    def get_folder_structure(self, folder_id: str) -> list:
+        def recurse_folder(current_folder_id) -> List[Dict]:
+            children = []
+            for item in self.list_files_in_folder(current_folder_id):
+                node = {
+                    "id": item['id'],
+                    "name": item['name'],
+                    "type": 'folder' if item['mimeType'] == FOLDER_MIME else 'file'
+                }
+                if node['type'] == 'folder':
+                    node['children'] = recurse_folder(item['id'])
+                children.append(node)
+            return children
+
+        return recurse_folder(folder_id)
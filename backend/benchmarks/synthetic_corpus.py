@@ -0,0 +1,278 @@
+"""
+Corpus sintético para benchmarks: CVs y sílabos en español como PDFs.
+
+Genera documentos con la forma que espera la sincronización:
+
+    CVs/                      -> PDFs de docentes
+    Silabos/
+        Ciclo I/
+            <Curso>/
+                silabo/       -> PDF del sílabo
+        Ciclo II/
+            ...
+
+Los PDFs se escriben a mano (PDF 1.4, Helvetica, WinAnsiEncoding) para no
+depender de librerías de generación; PyPDF2 los lee como cualquier otro PDF
+con texto. El contenido es determinista para una misma semilla.
+
+Uso (desde backend/) para volcar un corpus a disco:
+    python -m benchmarks.synthetic_corpus --cvs 100 --syllabi 100 --pages 2 --out /tmp/corpus
+"""
+
+import argparse
+import os
+import random
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List
+
+FOLDER_MIME = "application/vnd.google-apps.folder"
+PDF_MIME = "application/pdf"
+
+FIRST_NAMES = ["María", "José", "Lucía", "Carlos", "Ana", "Jorge", "Rosa", "Luis", "Carmen", "Miguel",
+               "Sofía", "Diego", "Valeria", "Andrés", "Elena", "Raúl", "Patricia", "Óscar", "Julia", "Iván"]
+LAST_NAMES = ["García", "Rodríguez", "Pérez", "Sánchez", "Ramírez", "Torres", "Flores", "Rivera", "Gómez",
+              "Díaz", "Vargas", "Castillo", "Núñez", "Rojas", "Mendoza", "Quispe", "Huamán", "Chávez"]
+
+SKILLS = [
+    "Python", "Java", "JavaScript", "TypeScript", "C++", "SQL", "PostgreSQL", "MySQL", "MongoDB", "Redis",
+    "Docker", "Kubernetes", "AWS", "Azure", "Linux", "Git", "React", "Angular", "Vue", "Node.js",
+    "Django", "FastAPI", "Spring Boot", "TensorFlow", "PyTorch", "Scikit-learn", "Pandas", "NumPy",
+    "Machine Learning", "Deep Learning", "Procesamiento de Lenguaje Natural", "Visión por Computadora",
+    "Estructuras de Datos", "Algoritmos", "Bases de Datos", "Redes de Computadoras", "Seguridad Informática",
+    "Ingeniería de Software", "Arquitectura de Software", "Sistemas Operativos", "Computación en la Nube",
+    "Metodologías Ágiles", "Scrum", "UML", "Pruebas de Software", "DevOps", "Big Data", "Spark",
+    "Estadística", "Cálculo", "Álgebra Lineal", "Matemática Discreta", "Investigación Operativa",
+]
+
+COURSES = [
+    "Introducción a la Programación", "Programación Orientada a Objetos", "Estructuras de Datos",
+    "Algoritmos y Complejidad", "Bases de Datos I", "Bases de Datos II", "Sistemas Operativos",
+    "Redes de Computadoras", "Ingeniería de Software", "Desarrollo Web", "Inteligencia Artificial",
+    "Aprendizaje Automático", "Computación en la Nube", "Seguridad de la Información",
+    "Arquitectura de Computadoras", "Matemática Discreta", "Cálculo I", "Estadística Aplicada",
+    "Gestión de Proyectos de TI", "Minería de Datos",
+]
+
+CYCLES = ["Ciclo I", "Ciclo II", "Ciclo III", "Ciclo IV", "Ciclo V",
+          "Ciclo VI", "Ciclo VII", "Ciclo VIII", "Ciclo IX", "Ciclo X"]
+
+UNIVERSITIES = ["Universidad Nacional de Ingeniería", "Universidad Nacional Mayor de San Marcos",
+                "Pontificia Universidad Católica del Perú", "Universidad de Lima", "Universidad del Pacífico"]
+
+FILLER = [
+    "Participó en proyectos de investigación aplicada con publicaciones en congresos internacionales.",
+    "Coordinó equipos multidisciplinarios y acompañó la formación de estudiantes de pregrado.",
+    "Desarrolló soluciones de software para instituciones públicas y privadas.",
+    "Impartió talleres de actualización docente y seminarios de innovación educativa.",
+    "Diseñó material didáctico y guías de laboratorio para cursos de la especialidad.",
+    "Colaboró en la acreditación de programas académicos y en la mejora del plan de estudios.",
+]
+
+LINES_PER_PAGE = 48
+
+
+# --- PDF mínimo ---------------------------------------------------------------
+
+def _pdf_escape(line: str) -> bytes:
+    encoded = line.encode("cp1252", errors="replace")
+    return encoded.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+def build_pdf(lines: List[str]) -> bytes:
+    """
+    Construye un PDF de texto (una línea por renglón, LINES_PER_PAGE por página).
+
+    Args:
+        lines: Renglones del documento.
+
+    Returns:
+        El PDF en bytes.
+    """
+    pages = [lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)] or [[]]
+    # Objetos: 1 catálogo, 2 árbol de páginas, 3 fuente, luego (página, contenido) por página
+    objects: List[bytes] = [b"", b"", b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"]
+    page_refs = []
+    for page_lines in pages:
+        stream = b"BT /F1 10 Tf 14 TL 50 800 Td\n" + b"".join(
+            b"(" + _pdf_escape(line) + b") Tj T*\n" for line in page_lines) + b"ET"
+        page_number = len(objects) + 1
+        page_refs.append(f"{page_number} 0 R")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_number + 1} 0 R >>".encode())
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n".encode() + stream + b"\nendstream")
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(page_refs)}] /Count {len(page_refs)} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+# --- Contenido ----------------------------------------------------------------
+
+def _pad(lines: List[str], pages: int, rng: random.Random) -> List[str]:
+    """Completa con párrafos de relleno hasta ocupar `pages` páginas."""
+    while len(lines) < pages * LINES_PER_PAGE:
+        lines.append(rng.choice(FILLER))
+    return lines
+
+
+def cv_lines(rng: random.Random, name: str, pages: int = 1) -> List[str]:
+    """Renglones de un CV con datos personales, formación, experiencia y habilidades."""
+    skills = rng.sample(SKILLS, rng.randint(6, 14))
+    years = rng.randint(2, 25)
+    lines = [
+        "CURRICULUM VITAE",
+        name,
+        f"Correo: {name.split()[0].lower()}@universidad.edu.pe",
+        "",
+        "FORMACIÓN ACADÉMICA",
+        f"Maestría en Ciencias de la Computación - {rng.choice(UNIVERSITIES)}",
+        f"Ingeniero de Sistemas - {rng.choice(UNIVERSITIES)}",
+        "",
+        "EXPERIENCIA PROFESIONAL",
+        f"{years} años de experiencia en docencia universitaria y desarrollo de software.",
+        f"Docente del curso {rng.choice(COURSES)} desde {2024 - rng.randint(1, years)}.",
+        f"Desarrollador senior con experiencia en {skills[0]} y {skills[1]}.",
+        "",
+        "HABILIDADES TÉCNICAS",
+        "Conocimientos en: " + ", ".join(skills[:len(skills) // 2]) + ".",
+        "Experiencia en: " + ", ".join(skills[len(skills) // 2:]) + ".",
+        "",
+        "CERTIFICACIONES",
+        f"Certificación profesional en {rng.choice(skills)}.",
+        "",
+    ]
+    return _pad(lines, pages, rng)
+
+
+def syllabus_lines(rng: random.Random, course: str, cycle: str, pages: int = 1) -> List[str]:
+    """Renglones de un sílabo con sumilla, competencias, contenidos y requisitos."""
+    skills = rng.sample(SKILLS, rng.randint(4, 9))
+    lines = [
+        "SÍLABO",
+        f"Curso: {course}",
+        f"{cycle} - Semestre 2024-II",
+        "",
+        "SUMILLA",
+        f"El curso de {course} es de naturaleza teórico-práctica y desarrolla {skills[0]} y {skills[1]}.",
+        "",
+        "COMPETENCIAS",
+        "El estudiante aplica " + ", ".join(skills[:3]) + " en la solución de problemas.",
+        "",
+        "CONTENIDOS",
+    ]
+    lines += [f"Unidad {i + 1}: {skill}" for i, skill in enumerate(skills)]
+    lines += [
+        "",
+        "REQUISITOS DEL DOCENTE",
+        "Se requiere experiencia en " + ", ".join(skills) + ".",
+        "",
+    ]
+    return _pad(lines, pages, rng)
+
+
+# --- Árbol de carpetas --------------------------------------------------------
+
+@dataclass
+class SyntheticCorpus:
+    """
+    Árbol de carpetas en memoria con la estructura de Drive.
+
+    Attributes:
+        folders: {id de carpeta: [items]}; cada item es {'id', 'name', 'mimeType'}.
+        files: {id de archivo: bytes del PDF}.
+    """
+    cv_folder_id: str = "cvs-root"
+    syllabus_folder_id: str = "syllabi-root"
+    folders: Dict[str, List[Dict]] = field(default_factory=dict)
+    files: Dict[str, bytes] = field(default_factory=dict)
+
+    def _add(self, parent_id: str, item_id: str, name: str, mime_type: str):
+        self.folders.setdefault(parent_id, []).append({"id": item_id, "name": name, "mimeType": mime_type})
+        if mime_type == FOLDER_MIME:
+            self.folders.setdefault(item_id, [])
+
+    def add_folder(self, parent_id: str, folder_id: str, name: str):
+        self._add(parent_id, folder_id, name, FOLDER_MIME)
+
+    def add_pdf(self, parent_id: str, file_id: str, name: str, content: bytes):
+        self._add(parent_id, file_id, name, PDF_MIME)
+        self.files[file_id] = content
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(len(content) for content in self.files.values())
+
+
+def generate_corpus(n_cvs: int, n_syllabi: int, pages: int = 1, seed: int = 42) -> SyntheticCorpus:
+    """
+    Genera CVs y sílabos sintéticos en el árbol ciclo/curso/silabo.
+
+    Args:
+        n_cvs: Número de CVs.
+        n_syllabi: Número de sílabos (repartidos entre ciclos y cursos).
+        pages: Páginas por documento (controla el tamaño de los PDFs).
+        seed: Semilla del generador.
+    """
+    rng = random.Random(seed)
+    corpus = SyntheticCorpus()
+    corpus.folders[corpus.cv_folder_id] = []
+    corpus.folders[corpus.syllabus_folder_id] = []
+
+    for i in range(n_cvs):
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {rng.choice(LAST_NAMES)}"
+        corpus.add_pdf(corpus.cv_folder_id, f"cv-{i:06d}", f"{name} {i:06d}.pdf",
+                       build_pdf(cv_lines(rng, name, pages)))
+
+    for i in range(n_syllabi):
+        cycle = CYCLES[i % len(CYCLES)]
+        cycle_id = f"cycle-{i % len(CYCLES)}"
+        if cycle_id not in corpus.folders:
+            corpus.add_folder(corpus.syllabus_folder_id, cycle_id, cycle)
+        # Nombre de curso único: con más sílabos que cursos base se numeran las secciones
+        course = f"{COURSES[(i // len(CYCLES)) % len(COURSES)]} {i:06d}"
+        course_id = f"course-{i:06d}"
+        corpus.add_folder(cycle_id, course_id, course)
+        silabo_id = f"silabo-{i:06d}"
+        corpus.add_folder(course_id, silabo_id, "silabo")
+        corpus.add_pdf(silabo_id, f"syllabus-{i:06d}", f"Silabo {course}.pdf",
+                       build_pdf(syllabus_lines(rng, course, cycle, pages)))
+
+    return corpus
+
+
+def iter_paths(corpus: SyntheticCorpus, folder_id: str, prefix: str = "") -> Iterator[tuple]:
+    """Recorre el árbol devolviendo (ruta relativa, id de archivo) por cada PDF."""
+    for item in corpus.folders.get(folder_id, []):
+        path = os.path.join(prefix, item["name"])
+        if item["mimeType"] == FOLDER_MIME:
+            yield from iter_paths(corpus, item["id"], path)
+        else:
+            yield path, item["id"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera un corpus sintético de CVs y sílabos en PDF")
+    parser.add_argument("--cvs", type=int, default=100)
+    parser.add_argument("--syllabi", type=int, default=100)
+    parser.add_argument("--pages", type=int, default=1, help="Páginas por documento")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", required=True, help="Carpeta de salida")
+    args = parser.parse_args()
+
+    corpus = generate_corpus(args.cvs, args.syllabi, args.pages, args.seed)
+    for root_name, root_id in (("CVs", corpus.cv_folder_id), ("Silabos", corpus.syllabus_folder_id)):
+        for path, file_id in iter_paths(corpus, root_id):
+            full_path = os.path.join(args.out, root_name, path)
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            with open(full_path, "wb") as f:
+                f.write(corpus.files[file_id])
+    print(f"✅ {len(corpus.files)} PDFs ({corpus.total_bytes / 1e6:.1f} MB) escritos en {args.out}")
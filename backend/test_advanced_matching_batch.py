@@ -0,0 +1,113 @@
+"""
+Prueba de paridad entre el scoring escalar y el scoring por lotes de
+AdvancedMatchingService.
+
+calculate_advanced_match_batch debe devolver exactamente los mismos scores
+(y el mismo orden) que llamar a calculate_advanced_match por candidato y
+ordenar con rank_candidates. No necesita bases de datos ni modelos.
+
+Ejecutar desde backend/:
+    python test_advanced_matching_batch.py
+"""
+
+import random
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.advanced_matching_service import AdvancedMatchingService
+from app.services.profiles import TeacherProfile, SyllabusProfile
+
+SKILLS = [
+    "python", "java", "sql", "docker", "machine learning", "deep learning", "learning",
+    "estructuras de datos", "algoritmos", "git", "linux", "pandas", "numpy", "scrum",
+    "c", "c++", "c#", "javascript", "java script", "web development", "databases",
+    "cloud", "aws", "redes", "sistemas operativos", "arquitectura de software",
+]
+EDUCATION = [
+    [], ["Universidad Nacional de Ingeniería"], ["Bachiller en Sistemas"],
+    ["Maestría en Computación", "University of Toronto"], ["Instituto Tecnológico"],
+]
+
+
+def _random_case(rng: random.Random, n_candidates: int):
+    required = rng.sample(SKILLS, rng.randint(0, 8))
+    if required and rng.random() < 0.3:
+        required.append(rng.choice(required))  # Skills repetidas en el sílabo
+    syllabus = SyllabusProfile("syllabus", "Sílabo", {
+        'required_skills': required,
+        'course_topics': rng.sample(["frameworks", "apis", "árboles", "grafos", "devops"], rng.randint(0, 2)),
+    })
+    candidates = [
+        TeacherProfile(f"cv-{i}", f"Docente {i}", {
+            'technical_skills': rng.sample(SKILLS, rng.randint(0, 12)),
+            'experience_years': rng.choice([0, 1, 2, 3, 4, 5, 6, 8, 10, 11, 20]),
+            'education': rng.choice(EDUCATION),
+        })
+        for i in range(n_candidates)
+    ]
+    similarities = [rng.choice([0.0, 1.0, round(rng.random(), 2), rng.random()]) for _ in candidates]
+    return syllabus, candidates, similarities
+
+
+def test_batch_matches_scalar_path():
+    """Mismos scores, explicaciones y orden que el camino escalar."""
+    service = AdvancedMatchingService()
+    rng = random.Random(1234)
+
+    for _ in range(300):
+        syllabus, candidates, similarities = _random_case(rng, rng.randint(1, 40))
+
+        scalar = []
+        for i, (teacher, similarity) in enumerate(zip(candidates, similarities)):
+            result = service.calculate_advanced_match(teacher, syllabus, similarity)
+            result['index'] = i
+            scalar.append(result)
+        scalar = service.rank_candidates(scalar)
+
+        batch = service.calculate_advanced_match_batch(syllabus, candidates, similarities)
+
+        assert [i for i, _ in batch] == [r.pop('index') for r in scalar]
+        assert [r for _, r in batch] == scalar
+
+
+def test_batch_top_k():
+    """top_k devuelve el prefijo del ranking completo."""
+    service = AdvancedMatchingService()
+    syllabus, candidates, similarities = _random_case(random.Random(7), 50)
+
+    full = service.calculate_advanced_match_batch(syllabus, candidates, similarities)
+    top = service.calculate_advanced_match_batch(syllabus, candidates, similarities, top_k=10)
+
+    assert top == full[:10]
+    assert service.calculate_advanced_match_batch(syllabus, [], [], top_k=10) == []
+
+
+def test_skill_weights():
+    """Las skills repetidas en el sílabo pesan más (skill_weights del perfil de requisitos)."""
+    service = AdvancedMatchingService()
+    syllabus = SyllabusProfile("syllabus", "Sílabo", {'required_skills': ["Python", "python", "Java"]})
+    assert dict(zip(syllabus.skill_weight_ids, syllabus.skill_weights.tolist())) == _expected_weights(syllabus)
+
+    python_teacher = TeacherProfile("cv-1", "Docente 1", {'technical_skills': ["python"]})
+    java_teacher = TeacherProfile("cv-2", "Docente 2", {'technical_skills': ["java"]})
+    # python: 2/3 exacta + 2/3 * 0.5 parcial (tope 1); java: 1/3 + 1/3 * 0.5
+    assert service._calculate_skill_compatibility(python_teacher, syllabus) == 1.0
+    assert abs(service._calculate_skill_compatibility(java_teacher, syllabus) - 0.5) < 1e-12
+    batch = service._skill_compatibility_batch(syllabus, [python_teacher, java_teacher])
+    assert batch.tolist() == [
+        service._calculate_skill_compatibility(python_teacher, syllabus),
+        service._calculate_skill_compatibility(java_teacher, syllabus),
+    ]
+
+
+def _expected_weights(syllabus):
+    required = syllabus.required_skill_ids
+    return {skill_id: required.count(skill_id) / len(required) for skill_id in dict.fromkeys(required)}
+
+
+if __name__ == '__main__':
+    test_batch_matches_scalar_path()
+    test_batch_top_k()
+    test_skill_weights()
+    print("✅ Scoring por lotes idéntico al escalar")
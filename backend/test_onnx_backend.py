@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Test de equivalencia del backend ONNX Runtime frente al modelo de PyTorch.
+
+Verifica que los embeddings del modelo exportado a ONNX (y de su versión
+cuantizada a int8) tengan similitud coseno >= 0.99 con los de SentenceTransformer.
+
+Se omite si no están instaladas las dependencias opcionales
+(requirements-onnx.txt) o si el modelo no está disponible (sin red ni caché).
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(__file__))
+
+import numpy as np
+import pytest
+from sentence_transformers import SentenceTransformer
+
+pytest.importorskip("onnxruntime", reason="backend ONNX no instalado (requirements-onnx.txt)")
+pytest.importorskip("onnx", reason="backend ONNX no instalado (requirements-onnx.txt)")
+
+from app.services.inference_backends import OnnxSentenceEncoder
+
+MODEL_NAME = 'paraphrase-multilingual-MiniLM-L12-v2'
+MIN_COSINE = 0.99
+
+TEXTOS = [
+    "Ingeniero de sistemas con experiencia en programación Java, Python y desarrollo web.",
+    "Curso de Programación Orientada a Objetos. Requisitos: Java, Git, Oracle, Scala.",
+    "Especialista en marketing digital y gestión de redes sociales.",
+    "Docente universitario con 10 años de experiencia en bases de datos y machine learning. " * 20,
+    "SQL",
+]
+
+
+def _cosine_rows(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return (a * b).sum(axis=1) / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1))
+
+
+def _check_backend(torch_embeddings: np.ndarray, quantize: bool):
+    nombre = "ONNX int8" if quantize else "ONNX fp32"
+    encoder = OnnxSentenceEncoder(MODEL_NAME, quantize=quantize)
+    onnx_embeddings = encoder.encode(TEXTOS, batch_size=2)
+
+    cosines = _cosine_rows(torch_embeddings, onnx_embeddings)
+    print(f"\n🔍 {nombre}: coseno mínimo {cosines.min():.6f}, medio {cosines.mean():.6f}")
+    assert onnx_embeddings.shape == torch_embeddings.shape
+    assert cosines.min() >= MIN_COSINE, f"{nombre}: coseno {cosines.min():.4f} < {MIN_COSINE}"
+    print(f"✅ {nombre} equivalente al modelo de PyTorch")
+
+
+def test_onnx_equivalence():
+    """Compara ONNX fp32 e int8 contra la salida de PyTorch."""
+    print("🔍 Iniciando test de equivalencia ONNX vs PyTorch...")
+    try:
+        model = SentenceTransformer(MODEL_NAME)
+    except OSError as e:
+        pytest.skip(f"Modelo {MODEL_NAME} no disponible: {e}")
+    torch_embeddings = model.encode(TEXTOS, convert_to_numpy=True)
+
+    _check_backend(torch_embeddings, quantize=False)
+    _check_backend(torch_embeddings, quantize=True)
+
+
+if __name__ == "__main__":
+    test_onnx_equivalence()
@@ -0,0 +1,217 @@
+"""
+Prueba de invalidación de la caché de recomendaciones.
+
+Sincroniza CVs y sílabos con process_file (sync) y process_document_sync
+(auto-sync) sobre bases temporales, y comprueba que:
+- un acierto de caché devuelve el mismo payload que el cálculo original;
+- un CV nuevo descarta todos los resultados (y conserva los alias);
+- un sílabo nuevo o modificado descarta sus resultados y todos los alias.
+
+Drive, la extracción de PDF, los embeddings y el NER se sustituyen por
+dobles deterministas: lo que se prueba es la escritura en las bases y la
+invalidación, no la calidad del matching.
+
+Ejecutar desde backend/:
+    python -m pytest test_recommendation_cache.py
+"""
+
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+pytest.importorskip("googleapiclient", reason="dependencias de Google Drive no instaladas")
+pytest.importorskip("spacy", reason="spaCy no instalado")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.services.recommendation_cache import recommendation_cache
+from app.services.entity_store import entity_store
+from app.services.skill_embeddings import skill_embedding_index
+
+# Las rutas crean las bases al importarse: apuntarlas a una carpeta temporal
+# sólo mientras se importan, para no afectar a otros tests
+_WORKDIR = tempfile.mkdtemp(prefix="test_recommendation_cache_")
+_ENV = {"CHROMA_DB_PATH": os.path.join(_WORKDIR, "chroma_db"), "SQL_DB_PATH": os.path.join(_WORKDIR, "metadata.db")}
+_saved_env = {key: os.environ.get(key) for key in _ENV}
+os.environ.update(_ENV)
+try:
+    from app.routes import sync, auto_sync, recommendations
+finally:
+    for key, value in _saved_env.items():
+        if value is None:
+            os.environ.pop(key, None)
+        else:
+            os.environ[key] = value
+
+DIM = 32
+
+
+def _vector(text: str) -> list:
+    """Embedding determinista y normalizado a partir del texto."""
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+    vector = np.random.default_rng(seed).standard_normal(DIM)
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+class FakeDrive:
+    CV_FOLDER_ID = "cvs"
+    SYLLABUS_FOLDER_ID = "syllabi"
+
+    def __init__(self):
+        self.files = {}
+
+    def download_file(self, file_id: str):
+        return self.files.get(file_id)
+
+
+class FakePDF:
+    @staticmethod
+    def extract_text_from_pdf(content: bytes) -> str:
+        return content.decode("utf-8")
+
+
+class FakeEmbeddings:
+    pool_embeddings = staticmethod(lambda chunks, mode="mean": None)
+
+    def generate_embedding(self, text: str):
+        return _vector(text)
+
+    def generate_embeddings(self, texts: list):
+        return [_vector(text) for text in texts]
+
+
+class FakeNER:
+    """Toma las skills de la línea 'skills: a, b, c' del texto."""
+
+    @staticmethod
+    def _skills(text: str) -> list:
+        for line in text.splitlines():
+            if line.startswith("skills:"):
+                return [skill.strip() for skill in line[len("skills:"):].split(",") if skill.strip()]
+        return []
+
+    def extract_entities_from_cv(self, text: str) -> dict:
+        return {'technical_skills': self._skills(text), 'experience_years': 5,
+                'education': [], 'languages': ["español"]}
+
+    def extract_entities_from_syllabus(self, text: str) -> dict:
+        return {'required_skills': self._skills(text), 'course_topics': []}
+
+
+drive = FakeDrive()
+sync.drive_service = auto_sync.drive_service = drive
+sync.pdf_service = auto_sync.pdf_service = FakePDF()
+sync.nlp_service = auto_sync.nlp_service = FakeEmbeddings()
+sync.intelligent_ner_service = auto_sync.ner_service = FakeNER()
+# Sin fragmentos: el embedding del documento sale de generate_embedding
+sync.EMBEDDING_CHUNKING = auto_sync.EMBEDDING_CHUNKING = False
+
+app = FastAPI()
+app.include_router(recommendations.router, prefix="/api")
+client = TestClient(app)
+
+COURSES = {
+    "syllabus-1": ("Ciclo 1", "Algoritmos", "python, algoritmos, estructuras de datos"),
+    "syllabus-2": ("Ciclo 2", "Bases de Datos", "sql, bases de datos, python"),
+}
+
+
+def _sync_cv(file_id: str, skills: str):
+    drive.files[file_id] = f"CV {file_id}\nskills: {skills}".encode("utf-8")
+    assert sync.process_file(file_id, f"Docente {file_id}.pdf", "cvs")
+
+
+def _sync_syllabus(file_id: str, cycle: str, course: str, skills: str):
+    drive.files[file_id] = f"Sílabo {course}\nskills: {skills}".encode("utf-8")
+    assert sync.process_file(file_id, f"Silabo {course}.pdf", "syllabi", cycle, course)
+
+
+def _generate(syllabus_id: str) -> dict:
+    cycle, course, _ = COURSES[syllabus_id]
+    response = client.post("/api/recommendations/generate", json={
+        "cycle_name": cycle, "course_name": course,
+        "cv_folder_id": "cvs", "syllabus_folder_id": "syllabi",
+    })
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _entries_for(syllabus_id: str) -> int:
+    return len(recommendation_cache._entries_by_syllabus.get(syllabus_id, ()))
+
+
+@pytest.fixture(scope="module", autouse=True)
+def corpus():
+    entity_store.bind(sync.sql_db_service)
+    skill_embedding_index.bind(sync.sql_db_service)
+    for syllabus_id, (cycle, course, skills) in COURSES.items():
+        _sync_syllabus(syllabus_id, cycle, course, skills)
+    _sync_cv("cv-1", "python, algoritmos, git")
+    _sync_cv("cv-2", "sql, bases de datos, java")
+    _sync_cv("cv-3", "python, sql, docker")
+    recommendation_cache.clear()
+    yield
+    recommendation_cache.clear()
+    for module in (sync, recommendations):
+        module.sql_db_service.session.close()
+    shutil.rmtree(_WORKDIR, ignore_errors=True)
+
+
+def test_hit_returns_same_payload_as_miss():
+    stats = recommendation_cache.get_statistics()
+    miss = _generate("syllabus-1")
+    hit = _generate("syllabus-1")
+    after = recommendation_cache.get_statistics()
+    assert miss["recommendations"], "el ranking de prueba no debería estar vacío"
+    assert hit == miss
+    assert after["hits"] == stats["hits"] + 1
+
+
+def test_sync_cv_invalidates_all_results():
+    _generate("syllabus-1")
+    _generate("syllabus-2")
+    assert _entries_for("syllabus-1") and _entries_for("syllabus-2")
+
+    _sync_cv("cv-4", "python, estructuras de datos")
+
+    assert recommendation_cache.get_statistics()["entries"] == 0
+    # Los alias (ciclo, curso) -> sílabo siguen siendo válidos
+    assert recommendation_cache.resolve_alias("Ciclo 1", "Algoritmos") == "syllabus-1"
+    # El CV nuevo aparece al recalcular
+    assert "Docente cv-4.pdf" in {r["cv_filename"] for r in _generate("syllabus-1")["recommendations"]}
+
+
+def test_sync_syllabus_invalidates_its_results_and_aliases():
+    _generate("syllabus-1")
+    _generate("syllabus-2")
+
+    cycle, course, _ = COURSES["syllabus-1"]
+    _sync_syllabus("syllabus-1", cycle, course, "python, algoritmos, git")
+
+    assert _entries_for("syllabus-1") == 0
+    assert _entries_for("syllabus-2") > 0
+    assert recommendation_cache.get_statistics()["aliases"] == 0
+
+
+def test_auto_sync_invalidates():
+    _generate("syllabus-1")
+    _generate("syllabus-2")
+
+    drive.files["cv-auto"] = b"CV auto\nskills: python, sql"
+    assert auto_sync.process_document_sync({'id': "cv-auto", 'name': "Docente auto.pdf"}, "cvs")
+    assert recommendation_cache.get_statistics()["entries"] == 0
+    assert recommendation_cache.resolve_alias("Ciclo 1", "Algoritmos") == "syllabus-1"
+
+    _generate("syllabus-1")
+    drive.files["syllabus-auto"] = b"Silabo auto\nskills: redes, linux"
+    assert auto_sync.process_document_sync({'id': "syllabus-auto", 'name': "Silabo auto.pdf"}, "syllabi")
+    assert _entries_for("syllabus-1") > 0
+    assert recommendation_cache.get_statistics()["aliases"] == 0
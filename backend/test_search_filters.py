@@ -0,0 +1,156 @@
+"""
+Prueba de los filtros estructurados de la búsqueda vectorial.
+
+Compila filtros con compile_filters y busca con DatabaseService sobre un
+ChromaDB temporal (PersistentClient en una carpeta temporal). Comprueba que:
+- el top-k filtrado devuelve una página completa aunque los documentos más
+  parecidos a la consulta no cumplan el filtro;
+- los filtros de skills ($contains), experiencia mínima y texto
+  (where_document) seleccionan los documentos correctos;
+- los documentos guardados sin campos filtrables se completan la primera vez
+  que se filtra la colección (_ensure_filter_metadata);
+- un filtro desconocido se rechaza: ValueError en el servicio, 422 en la ruta.
+
+Los embeddings son vectores aleatorios deterministas: no hace falta el modelo.
+
+Ejecutar desde backend/:
+    python -m pytest test_search_filters.py
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.services.search_filters import compile_filters, FILTER_FIELDS_VERSION, FILTER_VERSION_KEY
+
+# Los servicios crean las bases al instanciarse: apuntarlas a una carpeta
+# temporal sólo mientras se crean, para no afectar a otros tests
+_WORKDIR = tempfile.mkdtemp(prefix="test_search_filters_")
+_ENV = {"CHROMA_DB_PATH": os.path.join(_WORKDIR, "chroma_db"), "SQL_DB_PATH": os.path.join(_WORKDIR, "metadata.db")}
+_saved_env = {key: os.environ.get(key) for key in _ENV}
+os.environ.update(_ENV)
+try:
+    from app.routes import search
+finally:
+    for key, value in _saved_env.items():
+        if value is None:
+            os.environ.pop(key, None)
+        else:
+            os.environ[key] = value
+
+db_service = search.db_service
+
+DIM = 16
+rng = np.random.default_rng(7)
+QUERY = rng.standard_normal(DIM)
+QUERY /= np.linalg.norm(QUERY)
+
+
+def _near_query(noise: float) -> list:
+    vector = QUERY + noise * rng.standard_normal(DIM)
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+def _add_cv(doc_id: str, skills: list, experience: int, text: str, noise: float):
+    metadata = {
+        "name": doc_id,
+        "filename": f"{doc_id}.pdf",
+        "raw_text": text[:1000],
+        "entities": {"technical_skills": skills, "experience_years": experience, "education": [], "languages": []},
+    }
+    db_service.add_embedding("cvs", _near_query(noise), doc_id, metadata, document=text)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def corpus():
+    # Los 20 CVs más parecidos a la consulta no tienen 'rust' ni 'kubernetes'
+    for i in range(20):
+        _add_cv(f"near-{i}", ["python", "sql"], 2, "Docente de bases de datos.", noise=0.1)
+    # Los que cumplen los filtros quedan lejos de la consulta
+    for i in range(8):
+        _add_cv(f"rust-{i}", ["Rust", "linux"], 3 + i, "Sistemas embebidos y kubernetes en producción.", noise=2.0)
+    yield
+    shutil.rmtree(_WORKDIR, ignore_errors=True)
+
+
+def _search(n_results: int, filters: dict) -> list:
+    found = db_service.search_similar("cvs", QUERY.tolist(), n_results=n_results, return_ids=True, filters=filters)
+    assert found is not None
+    return found[0]
+
+
+def test_compile_filters():
+    where, where_document = compile_filters("cvs", {
+        "skills_any": ["Python", "Java"], "skills_all": ["SQL"], "min_experience": 3,
+        "department": ["Sistemas "], "text": " docker ", "max_experience": None,
+    })
+    assert where == {"$and": [
+        {"$or": [{"skills": {"$contains": "python"}}, {"skills": {"$contains": "java"}}]},
+        {"skills": {"$contains": "sql"}},
+        {"experience_years": {"$gte": 3}},
+        {"department": "sistemas"},
+    ]}
+    assert where_document == {"$contains": "docker"}
+
+    assert compile_filters("cvs", None) == (None, None)
+    assert compile_filters("syllabi", {"min_experience": 2}) == ({"required_experience": {"$gte": 2}}, None)
+    with pytest.raises(ValueError):
+        compile_filters("cvs", {"level": "basic"})  # 'level' sólo existe en sílabos
+
+
+def test_skills_filter_returns_full_page():
+    ids = _search(5, {"skills_any": ["rust"]})
+    assert len(ids) == 5
+    assert all(doc_id.startswith("rust-") for doc_id in ids)
+
+
+def test_min_experience_filter():
+    ids = _search(10, {"skills_all": ["rust", "linux"], "min_experience": 8})
+    assert sorted(ids) == ["rust-5", "rust-6", "rust-7"]
+
+
+def test_text_filter():
+    ids = _search(4, {"text": "kubernetes"})
+    assert len(ids) == 4
+    assert all(doc_id.startswith("rust-") for doc_id in ids)
+
+
+def test_legacy_documents_are_backfilled():
+    # Documento guardado antes de los campos filtrables: sólo metadatos aplanados
+    metadata = {
+        "name": "legacy", "raw_text": "CV antiguo",
+        "entities": {"technical_skills": ["Rust"], "experience_years": 20},
+    }
+    db_service.cv_collection.upsert(
+        ids=["legacy"], embeddings=[_near_query(2.0)],
+        metadatas=[db_service._flatten_metadata(metadata)], documents=["CV antiguo"],
+    )
+    db_service._filter_ready.discard("cvs")
+
+    assert _search(10, {"min_experience": 15}) == ["legacy"]
+    stored = db_service.cv_collection.get(ids=["legacy"], include=["metadatas", "documents"])
+    assert stored["metadatas"][0][FILTER_VERSION_KEY] == FILTER_FIELDS_VERSION
+    assert stored["metadatas"][0]["skills"] == ["rust"]
+    assert stored["documents"][0] == "CV antiguo"
+    assert "legacy" in _search(20, {"skills_any": ["rust"]})
+
+
+def test_unknown_filter_is_rejected():
+    with pytest.raises(ValueError):
+        db_service.search_similar("cvs", QUERY.tolist(), n_results=5, filters={"salary": 1000})
+
+    app = FastAPI()
+    app.include_router(search.router, prefix="/api")
+    response = TestClient(app).post("/api/search/teachers", json={
+        "query": "docente", "filters": {"salary": 1000},
+    })
+    assert response.status_code == 422